@@ -0,0 +1,19 @@
+# Generated by Django 4.2.2 on 2026-10-18 15:05
+
+import apps.common.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('brands', '0002_alter_brand_options'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='brand',
+            name='id',
+            field=models.UUIDField(default=apps.common.models.generate_id, editable=False, primary_key=True, serialize=False, unique=True),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
+from django.dispatch import receiver
 
 from apps.common import models as base_models
+from apps.common.cache import ResponseCache
 
 
 class Brand(base_models.BaseModel):
@@ -11,3 +13,11 @@ class Brand(base_models.BaseModel):
 
     class Meta:
         ordering = ("created_at",)
+
+
+# SIGNALS
+# ---------------------------------------------------
+@receiver(models.signals.post_save, sender=Brand)
+@receiver(models.signals.post_delete, sender=Brand)
+def invalidate_catalog_cache(sender, **kwargs):
+    ResponseCache.invalidate("catalog")
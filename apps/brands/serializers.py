@@ -1,5 +1,7 @@
 from rest_framework import serializers
 
+from apps.common.serializers import ValuesSerializer
+
 from .models import Brand
 
 
@@ -7,3 +9,7 @@ class BrandSerializer(serializers.ModelSerializer):
     class Meta:
         model = Brand
         fields = ["id", "name"]
+
+
+class BrandValuesSerializer(ValuesSerializer):
+    serializer_class = BrandSerializer
@@ -1,14 +1,26 @@
 from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.viewsets import ModelViewSet
 
+from apps.common.cache import CachedResponseMixin
+from apps.common.views import NonAtomicReadsMixin, QueryPlanMixin, ValuesListMixin
+
 from .models import Brand
-from .serializers import BrandSerializer
+from .serializers import BrandSerializer, BrandValuesSerializer
 
 
-class BrandView(ModelViewSet):
+class BrandView(
+    NonAtomicReadsMixin,
+    CachedResponseMixin,
+    QueryPlanMixin,
+    ValuesListMixin,
+    ModelViewSet,
+):
     queryset = Brand.objects.all()
     serializer_class = BrandSerializer
+    values_serializer_class = BrandValuesSerializer
     permission_classes = [AllowAny]
+    cache_namespace = "catalog"
+    use_replica = True
 
     http_method_names = [m for m in ModelViewSet.http_method_names if m not in ["put"]]
 
@@ -0,0 +1,155 @@
+import json
+import secrets
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+from apps.cart.models import CartItem, ShoppingCart
+from apps.cart.serializers import CartItemSerializer, ShoppingCartSerializer
+from apps.common.queries import QueryPlan
+from apps.products.models import Product
+from apps.products.serializers import ProductSerializer
+
+
+class CacheGuestCartStore:
+    """
+    Guest carts in the cache, keyed by an anonymous token the client sends
+    back in the X-Cart-Token header. A token is handed out with the first
+    write.
+    """
+
+    header = "X-Cart-Token"
+    prefix = "guest-cart"
+
+    def _key(self, token):
+        return f"{self.prefix}:{token}"
+
+    def load(self, request):
+        """(token, {product id: quantity}) of the request's guest cart"""
+        token = request.headers.get(self.header)
+        lines = cache.get(self._key(token)) if token else None
+        if lines is None:
+            return None, {}
+        return token, lines
+
+    def save(self, response, token, lines):
+        token = token or secrets.token_urlsafe(24)
+        cache.set(self._key(token), lines, settings.GUEST_CART_TIMEOUT)
+        response[self.header] = token
+
+    def clear(self, response, token):
+        cache.delete(self._key(token))
+
+
+class SignedCookieGuestCartStore:
+    """
+    Guest carts kept by the client in a signed cookie, nothing is stored on
+    the server. The cookie is the token.
+    """
+
+    cookie = "guest_cart"
+    salt = "apps.cart.guest"
+
+    def load(self, request):
+        value = request.get_signed_cookie(
+            self.cookie,
+            default=None,
+            salt=self.salt,
+            max_age=settings.GUEST_CART_TIMEOUT,
+        )
+        try:
+            lines = json.loads(value) if value else None
+        except ValueError:
+            lines = None
+        if not isinstance(lines, dict):
+            return None, {}
+        return self.cookie, lines
+
+    def save(self, response, token, lines):
+        response.set_signed_cookie(
+            self.cookie,
+            json.dumps(lines, separators=(",", ":")),
+            salt=self.salt,
+            max_age=settings.GUEST_CART_TIMEOUT,
+            secure=settings.SESSION_COOKIE_SECURE,
+            httponly=True,
+            samesite="Lax",
+        )
+
+    def clear(self, response, token):
+        response.delete_cookie(self.cookie, samesite="Lax")
+
+
+class GuestCart:
+    """
+    Carts of anonymous users, held in the GUEST_CART_STORE as
+    {product id: quantity} and merged into the user's ShoppingCart on login.
+    Only product reads reach the database until then.
+    """
+
+    @staticmethod
+    def store():
+        return import_string(settings.GUEST_CART_STORE)()
+
+    @classmethod
+    def load(cls, request):
+        return cls.store().load(request)
+
+    @classmethod
+    def save(cls, response, token, lines):
+        cls.store().save(response, token, lines)
+
+    @classmethod
+    def items(cls, lines):
+        """Unsaved CartItems of `lines`, priced at the current product prices"""
+        products = (
+            QueryPlan.for_serializer(ProductSerializer)
+            .apply(Product.objects.all())
+            .in_bulk(list(lines))
+        )
+        items = []
+        for product_id, quantity in lines.items():
+            product = products.get(uuid.UUID(product_id))
+            # products deleted since they were added drop out
+            if product is not None:
+                items.append(
+                    CartItem(
+                        id=None,
+                        product=product,
+                        quantity=quantity,
+                        price=product.price * quantity,
+                    )
+                )
+        return items
+
+    @classmethod
+    def to_representation(cls, lines):
+        """`lines` in the shape of ShoppingCartSerializer"""
+        items = cls.items(lines)
+        fields = ShoppingCartSerializer().fields
+        return {
+            "id": None,
+            "user": None,
+            "subtotal": fields["subtotal"].to_representation(
+                sum(item.price for item in items)
+            ),
+            "item_count": sum(item.quantity for item in items),
+            "items": CartItemSerializer(items, many=True).data,
+        }
+
+    @classmethod
+    def merge(cls, request, response, user):
+        """Move the request's guest cart into the cart of `user`"""
+        token, lines = cls.load(request)
+        if not lines:
+            return
+        prices = dict(
+            Product.objects.filter(pk__in=list(lines)).values_list("id", "price")
+        )
+        cart, _ = ShoppingCart.objects.get_or_create(user=user)
+        CartItem.bulk_upsert(
+            cart, {product: lines[str(product)] for product in prices}, prices
+        )
+        cls.store().clear(response, token)
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.2 on 2026-10-18 15:05
+
+import apps.common.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0007_alter_cartitem_options_alter_shoppingcart_options'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='cartitem',
+            name='id',
+            field=models.UUIDField(default=apps.common.models.generate_id, editable=False, primary_key=True, serialize=False, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='shoppingcart',
+            name='id',
+            field=models.UUIDField(default=apps.common.models.generate_id, editable=False, primary_key=True, serialize=False, unique=True),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.2 on 2026-10-18 15:46
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def drop_duplicate_lines(apps, schema_editor):
+    # add_to_cart sets the quantity, so the last updated line is the one to keep
+    CartItem = apps.get_model('cart', 'CartItem')
+    duplicated = (
+        CartItem.objects.values('cart', 'product')
+        .annotate(lines=Count('id'))
+        .filter(lines__gt=1)
+        .order_by()
+    )
+    for group in duplicated:
+        ids = CartItem.objects.filter(
+            cart=group['cart'], product=group['product']
+        ).order_by('-updated_at').values_list('id', flat=True)
+        CartItem.objects.filter(id__in=list(ids[1:])).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0008_time_ordered_ids'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_lines, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='cartitem',
+            constraint=models.UniqueConstraint(fields=('cart', 'product'), name='unique_cart_product'),
+        ),
+    ]
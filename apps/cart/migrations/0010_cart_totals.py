@@ -0,0 +1,50 @@
+# Generated by Django 4.2.2 on 2026-10-18 15:51
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Round
+
+
+def backfill_totals(apps, schema_editor):
+    CartItem = apps.get_model('cart', 'CartItem')
+    Product = apps.get_model('products', 'Product')
+    ShoppingCart = apps.get_model('cart', 'ShoppingCart')
+
+    # lines may hold a price from before a product price change
+    price = Product.objects.filter(pk=OuterRef('product')).values('price')
+    CartItem.objects.update(price=Round(F('quantity') * Subquery(price), 2))
+
+    lines = CartItem.objects.filter(cart=OuterRef('pk')).order_by().values('cart')
+    ShoppingCart.objects.update(
+        subtotal=Coalesce(
+            Subquery(lines.annotate(total=Sum('price')).values('total')),
+            Value(Decimal(0)),
+            output_field=models.DecimalField(max_digits=12, decimal_places=2),
+        ),
+        item_count=Coalesce(
+            Subquery(lines.annotate(total=Sum('quantity')).values('total')), Value(0)
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0009_unique_cart_product'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shoppingcart',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='shoppingcart',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.RunPython(backfill_totals, migrations.RunPython.noop),
+    ]
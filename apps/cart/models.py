@@ -1,12 +1,26 @@
-from django.db import models
+from contextlib import contextmanager
+from contextvars import ContextVar
+from decimal import Decimal
+
+from django.db import connection, models, transaction
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Round
+from django.dispatch import receiver
+from django.utils import timezone
 
 from apps.common import models as base_models
 from apps.products.models import Product
 from apps.users.models import User
 
+# set while the caller recalculates the cart totals itself, see bulk_upsert
+recalculating = ContextVar("recalculating", default=False)
+
 
 class ShoppingCart(base_models.BaseModel):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
+    # totals of the lines, maintained by the CartItem signals below
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    item_count = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return f"{self.user.username} Cart"
@@ -14,6 +28,52 @@ class ShoppingCart(base_models.BaseModel):
     class Meta:
         ordering = ("created_at",)
 
+    @classmethod
+    @contextmanager
+    def locked(cls, **lookup):
+        """
+        Yield the id of the cart matching `lookup`, or None, with the cart row
+        locked until the transaction ends. Writes of its lines and
+        recalculations of its totals then run one after another: without the
+        lock, a recalculation waiting on the row would still sum the lines of
+        its older snapshot.
+
+        SQLite has no row locks and runs one writer at a time. Reading before
+        writing in one transaction only makes concurrent writers deadlock
+        there, so the block runs as it is.
+        """
+        carts = cls.objects.filter(**lookup).values_list("pk", flat=True)
+        if not connection.features.has_select_for_update:
+            yield carts.first()
+            return
+        with transaction.atomic(savepoint=False):
+            yield carts.select_for_update().first()
+
+    @classmethod
+    def apply_line(cls, cart_id, price, quantity):
+        """Move a cart's totals by a line's price and quantity, in one UPDATE"""
+        return cls.objects.filter(pk=cart_id).update(
+            subtotal=F("subtotal") + price, item_count=F("item_count") + quantity
+        )
+
+    @classmethod
+    def recalculate(cls, carts):
+        """
+        Recompute the totals of `carts`, ids or a queryset of them, from their
+        lines in one UPDATE. Used after writes that bypass the signals.
+        """
+        lines = CartItem.objects.filter(cart=OuterRef("pk")).order_by().values("cart")
+        subtotal = lines.annotate(total=Sum("price")).values("total")
+        item_count = lines.annotate(total=Sum("quantity")).values("total")
+        return cls.objects.filter(pk__in=carts).update(
+            subtotal=Coalesce(
+                Subquery(subtotal),
+                Value(Decimal(0)),
+                output_field=cls._meta.get_field("subtotal"),
+            ),
+            item_count=Coalesce(Subquery(item_count), Value(0)),
+        )
+
 
 class CartItem(base_models.BaseModel):
     cart = models.ForeignKey(
@@ -29,3 +89,167 @@ class CartItem(base_models.BaseModel):
 
     class Meta:
         ordering = ("created_at",)
+        constraints = [
+            models.UniqueConstraint(
+                fields=["cart", "product"], name="unique_cart_product"
+            )
+        ]
+
+    @classmethod
+    def for_user(cls, user):
+        """
+        Lines in the cart of `user`. The cart is joined on its primary key and
+        filtered on its unique user column, so a line is one indexed lookup.
+        """
+        return cls.objects.filter(cart__user=user)
+
+    @classmethod
+    def upsert(cls, user_id, product_id, quantity):
+        """
+        Set the quantity of a product in a user's cart, adding the line if it
+        is missing, in one INSERT ... ON CONFLICT. The price is recomputed from
+        the product's current price in SQL, then the cart totals are
+        recalculated, all under the cart's lock.
+
+        Returns the id of the line, or None when the user has no cart yet.
+        """
+        opts = cls._meta
+        now = timezone.now()
+        with ShoppingCart.locked(user_id=user_id) as cart_id:
+            if cart_id is None:
+                return None
+            params = [
+                opts.pk.get_db_prep_value(base_models.generate_id(), connection),
+                opts.get_field("created_at").get_db_prep_value(now, connection),
+                opts.get_field("updated_at").get_db_prep_value(now, connection),
+                opts.get_field("cart").get_db_prep_value(cart_id, connection),
+                quantity,
+                quantity,
+                opts.get_field("product").get_db_prep_value(product_id, connection),
+            ]
+            with connection.cursor() as cursor:
+                # the WHERE clause keeps SQLite from reading ON CONFLICT as a join
+                cursor.execute(
+                    f"INSERT INTO {opts.db_table} "
+                    "(id, created_at, updated_at, is_active, cart_id, product_id, "
+                    "quantity, price) "
+                    "SELECT %s, %s, %s, TRUE, %s, p.id, %s, ROUND(p.price * %s, 2) "
+                    f"FROM {Product._meta.db_table} p WHERE p.id = %s "
+                    "ON CONFLICT (cart_id, product_id) DO UPDATE "
+                    "SET quantity = EXCLUDED.quantity, price = EXCLUDED.price, "
+                    "updated_at = EXCLUDED.updated_at "
+                    "RETURNING id",
+                    params,
+                )
+                row = cursor.fetchone()
+            ShoppingCart.recalculate([cart_id])
+        return opts.pk.to_python(row[0])
+
+    @classmethod
+    def bulk_upsert(cls, cart, quantities, prices, removed=()):
+        """
+        Set the quantity of several products in a cart with one INSERT ... ON
+        CONFLICT, priced from `prices`, delete the lines of the `removed`
+        products, then recalculate the cart totals
+        """
+        with ShoppingCart.locked(pk=cart.pk):
+            if removed:
+                token = recalculating.set(True)
+                try:
+                    cart.items.filter(product_id__in=removed).delete()
+                finally:
+                    recalculating.reset(token)
+            cls.objects.bulk_create(
+                [
+                    cls(
+                        cart=cart,
+                        product_id=product,
+                        quantity=quantity,
+                        price=prices[product] * quantity,
+                    )
+                    for product, quantity in quantities.items()
+                ],
+                update_conflicts=True,
+                unique_fields=["cart", "product"],
+                update_fields=["quantity", "price", "updated_at"],
+            )
+            ShoppingCart.recalculate([cart.pk])
+
+    @classmethod
+    def reprice(cls, product_id, price):
+        """Follow a new product price in its cart lines and their carts' totals"""
+        lines = cls.objects.filter(product_id=product_id)
+        if lines.update(price=Round(F("quantity") * Value(price), 2)):
+            ShoppingCart.recalculate(lines.values("cart"))
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remember the stored line so saves can move the cart totals
+        if not instance.get_deferred_fields() & {"cart_id", "price", "quantity"}:
+            instance._stored_line = instance.line_totals()
+        return instance
+
+    def line_totals(self):
+        return self.cart_id, self.price or Decimal(0), self.quantity
+
+
+# SIGNALS
+# ---------------------------------------------------
+@receiver(models.signals.post_save, sender=CartItem)
+def add_line_to_cart(sender, instance, created, raw=False, **kwargs):
+    stored = None if created else getattr(instance, "_stored_line", None)
+    current = instance.line_totals()
+    if raw or stored == current:
+        return
+
+    cart_id, price, quantity = current
+    if not created and stored is None:
+        # loaded with deferred fields or built by hand, what the row held
+        # before is unknown
+        ShoppingCart.recalculate([cart_id])
+        instance._stored_line = current
+        return
+    if stored and stored[0] == cart_id:
+        price, quantity = price - stored[1], quantity - stored[2]
+    elif stored:
+        ShoppingCart.apply_line(stored[0], -stored[1], -stored[2])
+    ShoppingCart.apply_line(cart_id, price, quantity)
+    instance._stored_line = current
+
+
+@receiver(models.signals.post_delete, sender=CartItem)
+def remove_line_from_cart(sender, instance, origin=None, **kwargs):
+    if recalculating.get():
+        return
+    deleted = origin.model if isinstance(origin, models.QuerySet) else type(origin)
+    # lines only cascade from their cart, which needs no totals then, or from
+    # their product, whose carts recalculate_product_carts updates at once
+    if origin is not None and deleted is not CartItem:
+        return
+    stored = getattr(instance, "_stored_line", None) or instance.line_totals()
+    cart_id, price, quantity = stored
+    ShoppingCart.apply_line(cart_id, -price, -quantity)
+
+
+@receiver(models.signals.post_save, sender=Product)
+def reprice_cart_lines(sender, instance, created, raw=False, **kwargs):
+    price = instance.__dict__.get("price")
+    if created or raw or price is None:
+        return
+    if price != getattr(instance, "_stored_price", None):
+        CartItem.reprice(instance.pk, price)
+        instance._stored_price = price
+
+
+@receiver(models.signals.pre_delete, sender=Product)
+def collect_product_carts(sender, instance, **kwargs):
+    instance._cart_ids = list(
+        CartItem.objects.filter(product=instance).values_list("cart_id", flat=True)
+    )
+
+
+@receiver(models.signals.post_delete, sender=Product)
+def recalculate_product_carts(sender, instance, **kwargs):
+    if getattr(instance, "_cart_ids", None):
+        ShoppingCart.recalculate(instance._cart_ids)
@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework import serializers
 
 from apps.cart.models import CartItem, ShoppingCart
@@ -18,7 +19,7 @@ class ShoppingCartSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = ShoppingCart
-        fields = ["id", "user", "items"]
+        fields = ["id", "user", "subtotal", "item_count", "items"]
 
 
 class AddToCartSerializer(serializers.ModelSerializer):
@@ -28,3 +29,81 @@ class AddToCartSerializer(serializers.ModelSerializer):
     class Meta:
         model = CartItem
         fields = ["id", "product", "quantity"]
+
+
+class CartOperationSerializer(serializers.Serializer):
+    ADD = "add"
+    UPDATE = "update"
+    REMOVE = "remove"
+
+    op = serializers.ChoiceField(choices=[ADD, UPDATE, REMOVE])
+    product = serializers.UUIDField()
+    quantity = serializers.IntegerField(min_value=1, default=1)
+
+
+class BatchCartSerializer(serializers.Serializer):
+    """
+    Operations applied in order to a cart, keyed by product: `add` sets the
+    quantity of a line like /cart/add/, `update` only changes lines already in
+    the cart and `remove` drops a line.
+
+        cart = serializer.save(cart=cart)
+    """
+
+    operations = serializers.ListField(
+        child=CartOperationSerializer(),
+        min_length=1,
+        max_length=settings.CART_BATCH_LIMIT,
+    )
+
+    def validate_operations(self, operations):
+        ids = {operation["product"] for operation in operations}
+        self.prices = dict(
+            Product.objects.filter(pk__in=ids).values_list("id", "price")
+        )
+        missing = ids - set(self.prices)
+        if missing:
+            raise serializers.ValidationError(
+                f"Invalid products: {', '.join(sorted(map(str, missing)))}"
+            )
+        return operations
+
+    @staticmethod
+    def fold(operations, in_cart):
+        """
+        {product: quantity} left by `operations`, None for removed lines.
+        `in_cart` holds the products the cart has lines for.
+        """
+        quantities = {}
+        for operation in operations:
+            product = operation["product"]
+            # a line exists if an earlier operation left one or the cart has it
+            if operation["op"] == CartOperationSerializer.REMOVE:
+                quantities[product] = None
+            elif operation["op"] == CartOperationSerializer.ADD or (
+                quantities.get(product, product in in_cart)
+            ):
+                quantities[product] = operation["quantity"]
+        return quantities
+
+    def create(self, validated_data):
+        cart = validated_data["cart"]
+        operations = validated_data["operations"]
+
+        in_cart = set()
+        if any(op["op"] == CartOperationSerializer.UPDATE for op in operations):
+            in_cart = set(
+                cart.items.filter(product_id__in=self.prices).values_list(
+                    "product_id", flat=True
+                )
+            )
+        quantities = self.fold(operations, in_cart)
+
+        removed = [product for product, quantity in quantities.items() if not quantity]
+        CartItem.bulk_upsert(
+            cart,
+            {product: quantity for product, quantity in quantities.items() if quantity},
+            self.prices,
+            removed=removed,
+        )
+        return cart
@@ -0,0 +1,24 @@
+import factory
+from factory.django import DjangoModelFactory
+
+from apps.cart.models import CartItem, ShoppingCart
+from apps.products.tests.factories import ProductFactory
+from apps.users.tests.factories import UserFactory
+
+
+class ShoppingCartFactory(DjangoModelFactory):
+    user = factory.SubFactory(UserFactory)
+
+    class Meta:
+        model = ShoppingCart
+        django_get_or_create = ("user",)
+
+
+class CartItemFactory(DjangoModelFactory):
+    cart = factory.SubFactory(ShoppingCartFactory)
+    product = factory.SubFactory(ProductFactory)
+    quantity = 1
+    price = factory.LazyAttribute(lambda o: o.product.price * o.quantity)
+
+    class Meta:
+        model = CartItem
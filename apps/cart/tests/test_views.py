@@ -0,0 +1,495 @@
+import threading
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls.base import reverse
+from rest_framework import status
+
+from apps.cart.models import CartItem, ShoppingCart
+
+pytestmark = pytest.mark.django_db
+
+
+class TestAddToCart:
+    url = reverse("api:Shopping_cart-add-to-cart")
+
+    def test_first_add_creates_cart(self, api_client_auth, user, product):
+        client = api_client_auth(user)
+
+        resp = client.post(self.url, {"product": product.id, "quantity": 3})
+
+        assert resp.status_code == status.HTTP_201_CREATED
+        item = CartItem.objects.get()
+        assert item.cart == ShoppingCart.objects.get(user=user)
+        assert resp.json()["id"] == str(item.id)
+        assert resp.json()["quantity"] == 3
+        assert Decimal(resp.json()["price"]) == product.price * 3
+
+    def test_add_updates_line(self, api_client_auth, user, product):
+        client = api_client_auth(user)
+        first = client.post(self.url, {"product": product.id, "quantity": 1}).json()
+        product.price = Decimal("12.50")
+        product.save()
+
+        resp = client.post(self.url, {"product": product.id, "quantity": 2})
+
+        item = CartItem.objects.get()
+        assert resp.json()["id"] == first["id"] == str(item.id)
+        assert item.quantity == 2
+        assert item.price == Decimal("25.00")
+
+    def test_unknown_product(self, api_client_auth, user):
+        resp = api_client_auth(user).post(
+            self.url, {"product": "00000000-0000-0000-0000-000000000000"}
+        )
+
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+        assert not CartItem.objects.exists()
+
+    def test_query_count(self, api_client_auth, cart_item, django_assert_num_queries):
+        client = api_client_auth(cart_item.cart.user)
+
+        # savepoint, product lookup, cart lock, upsert, cart totals, the line,
+        # the product images, release
+        with django_assert_num_queries(8):
+            resp = client.post(self.url, {"product": cart_item.product.id})
+
+        assert resp.status_code == status.HTTP_201_CREATED
+
+
+class TestBatch:
+    url = reverse("api:Shopping_cart-batch")
+
+    def test_operations_apply_in_order(
+        self, api_client_auth, shopping_cart, cart_item_factory, product_factory
+    ):
+        kept, dropped = cart_item_factory.create_batch(2, cart=shopping_cart)
+        new, readded = product_factory.create_batch(2)
+        operations = [
+            {"op": "update", "product": kept.product_id, "quantity": 4},
+            {"op": "remove", "product": dropped.product_id},
+            {"op": "add", "product": new.id, "quantity": 2},
+            {"op": "update", "product": new.id, "quantity": 3},
+            {"op": "add", "product": readded.id},
+            {"op": "remove", "product": readded.id},
+            {"op": "update", "product": readded.id, "quantity": 5},
+        ]
+
+        resp = api_client_auth(shopping_cart.user).post(
+            self.url, {"operations": operations}, format="json"
+        )
+
+        assert resp.status_code == status.HTTP_200_OK
+        items = {item["product"]["id"]: item for item in resp.json()["items"]}
+        assert {pk: item["quantity"] for pk, item in items.items()} == {
+            str(kept.product_id): 4,
+            str(new.id): 3,
+        }
+        assert items[str(kept.product_id)]["id"] == str(kept.id)
+        assert Decimal(items[str(new.id)]["price"]) == new.price * 3
+        assert resp.json()["item_count"] == 7
+        assert (
+            Decimal(resp.json()["subtotal"]) == kept.product.price * 4 + new.price * 3
+        )
+
+    def test_unknown_product_rejects_batch(self, api_client_auth, user, product):
+        operations = [
+            {"op": "add", "product": product.id},
+            {"op": "add", "product": "00000000-0000-0000-0000-000000000000"},
+        ]
+
+        resp = api_client_auth(user).post(
+            self.url, {"operations": operations}, format="json"
+        )
+
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+        assert "operations" in resp.json()
+        assert not CartItem.objects.exists()
+
+    def test_query_count(
+        self, api_client_auth, shopping_cart, product_factory, django_assert_num_queries
+    ):
+        operations = [
+            {"op": "add", "product": product.id}
+            for product in product_factory.create_batch(20)
+        ]
+        client = api_client_auth(shopping_cart.user)
+
+        # savepoint, products, cart, cart lock, upsert, cart totals, then the
+        # cart, its lines with their products and their images, release
+        with django_assert_num_queries(10):
+            resp = client.post(self.url, {"operations": operations}, format="json")
+
+        assert len(resp.json()["items"]) == 20
+
+    def test_removals_skip_per_line_totals(
+        self, api_client_auth, shopping_cart, product_factory, cart_item_factory
+    ):
+        kept, *dropped = [
+            cart_item_factory(cart=shopping_cart, product=product)
+            for product in product_factory.create_batch(6)
+        ]
+        operations = [{"op": "remove", "product": line.product_id} for line in dropped]
+        client = api_client_auth(shopping_cart.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            resp = client.post(self.url, {"operations": operations}, format="json")
+
+        assert resp.json()["item_count"] == kept.quantity
+        assert Decimal(resp.json()["subtotal"]) == kept.price
+        # the cart totals are recalculated once
+        updates = [q for q in queries.captured_queries if "UPDATE" in q["sql"]]
+        assert len(updates) == 1
+
+
+class TestCartItemLookup:
+    def retrieve_url(self, item):
+        return reverse("api:Shopping_cart-retrieve-cartitem", args=[item.id])
+
+    def remove_url(self, item):
+        return reverse("api:Shopping_cart-remove-from-cart", args=[item.id])
+
+    def test_retrieve_own_item(
+        self, api_client_auth, cart_item, django_assert_num_queries
+    ):
+        client = api_client_auth(cart_item.cart.user)
+
+        # the line with its product, the product images
+        with django_assert_num_queries(2):
+            resp = client.get(self.retrieve_url(cart_item))
+
+        assert resp.status_code == status.HTTP_202_ACCEPTED
+        assert resp.json()["id"] == str(cart_item.id)
+
+    def test_remove_own_item(self, api_client_auth, cart_item):
+        cart = cart_item.cart
+
+        resp = api_client_auth(cart.user).delete(self.remove_url(cart_item))
+
+        assert resp.status_code == status.HTTP_204_NO_CONTENT
+        assert not CartItem.objects.exists()
+        cart.refresh_from_db()
+        assert cart.item_count == 0
+
+    def test_other_users_item_is_not_found(
+        self, api_client_auth, user_factory, cart_item
+    ):
+        client = api_client_auth(user_factory(username="other", email="o@example.com"))
+
+        retrieved = client.get(self.retrieve_url(cart_item))
+        removed = client.delete(self.remove_url(cart_item))
+
+        assert retrieved.status_code == status.HTTP_404_NOT_FOUND
+        assert removed.status_code == status.HTTP_404_NOT_FOUND
+        assert CartItem.objects.filter(pk=cart_item.pk).exists()
+
+
+class TestCartTotals:
+    def totals(self, cart):
+        cart.refresh_from_db()
+        return cart.subtotal, cart.item_count
+
+    def test_lines_move_totals(
+        self, shopping_cart, shopping_cart_factory, product_factory
+    ):
+        first, second = product_factory.create_batch(2, price=Decimal("2.50"))
+        line = CartItem.objects.create(
+            cart=shopping_cart, product=first, quantity=2, price=Decimal("5.00")
+        )
+        CartItem.objects.create(
+            cart=shopping_cart, product=second, quantity=1, price=Decimal("2.50")
+        )
+        assert self.totals(shopping_cart) == (Decimal("7.50"), 3)
+
+        line = CartItem.objects.get(pk=line.pk)
+        line.quantity, line.price = 4, Decimal("10.00")
+        line.save()
+        assert self.totals(shopping_cart) == (Decimal("12.50"), 5)
+
+        other = shopping_cart_factory()
+        line.cart = other
+        line.save()
+        assert self.totals(shopping_cart) == (Decimal("2.50"), 1)
+        assert self.totals(other) == (Decimal("10.00"), 4)
+
+        line.delete()
+        assert self.totals(other) == (Decimal("0.00"), 0)
+
+    def test_price_change_reprices_carts(
+        self, shopping_cart_factory, cart_item_factory, product_factory
+    ):
+        product, other = product_factory.create_batch(2, price=Decimal("3.00"))
+        carts = shopping_cart_factory.create_batch(2)
+        for quantity, cart in enumerate(carts, start=1):
+            cart_item_factory(cart=cart, product=product, quantity=quantity)
+            cart_item_factory(cart=cart, product=other)
+
+        product.price = Decimal("4.00")
+        product.save()
+
+        assert CartItem.objects.get(cart=carts[1], product=product).price == 8
+        assert self.totals(carts[0]) == (Decimal("7.00"), 2)
+        assert self.totals(carts[1]) == (Decimal("11.00"), 3)
+
+    def test_unchanged_price_skips_carts(self, cart_item):
+        product = type(cart_item.product).objects.get(pk=cart_item.product_id)
+        product.name = "renamed"
+
+        with CaptureQueriesContext(connection) as queries:
+            product.save()
+
+        assert queries.captured_queries
+        assert not any("cart" in query["sql"] for query in queries.captured_queries)
+
+    def test_save_without_stored_line_recalculates(self, cart_item):
+        cart = cart_item.cart
+        total = self.totals(cart)
+
+        deferred = CartItem.objects.defer("price").get(pk=cart_item.pk)
+        deferred.save()
+        by_hand = CartItem(
+            id=cart_item.id,
+            cart=cart,
+            product=cart_item.product,
+            quantity=cart_item.quantity,
+            price=cart_item.price,
+            created_at=cart_item.created_at,
+        )
+        # an existing row, as when built from data that carries its pk
+        by_hand._state.adding = False
+        by_hand.save()
+
+        assert self.totals(cart) == total
+
+    def test_product_delete_recalculates_carts(
+        self, shopping_cart_factory, cart_item_factory, product_factory
+    ):
+        product, other = product_factory.create_batch(2, price=Decimal("3.00"))
+        carts = shopping_cart_factory.create_batch(3)
+        for cart in carts:
+            cart_item_factory(cart=cart, product=product, quantity=2)
+            cart_item_factory(cart=cart, product=other)
+
+        with CaptureQueriesContext(connection) as queries:
+            product.delete()
+
+        for cart in carts:
+            assert self.totals(cart) == (Decimal("3.00"), 1)
+        # no totals update per deleted line
+        assert sum("UPDATE" in q["sql"] for q in queries.captured_queries) == 1
+
+    def test_cart_delete_skips_totals(
+        self, shopping_cart, product_factory, cart_item_factory
+    ):
+        for product in product_factory.create_batch(20):
+            cart_item_factory(cart=shopping_cart, product=product)
+
+        with CaptureQueriesContext(connection) as queries:
+            ShoppingCart.objects.filter(pk=shopping_cart.pk).delete()
+
+        assert not ShoppingCart.objects.exists()
+        assert not any("UPDATE" in q["sql"] for q in queries.captured_queries)
+
+    def test_cart_response_reads_totals(self, api_client_auth, cart_item_factory):
+        line = cart_item_factory(quantity=3)
+
+        resp = api_client_auth(line.cart.user).get(reverse("api:Shopping_cart-list"))
+
+        cart = resp.json()["results"][0]
+        assert cart["item_count"] == 3
+        assert Decimal(cart["subtotal"]) == line.price
+
+
+class TestGuestCart:
+    add_url = reverse("api:Shopping_cart-add-to-cart")
+    batch_url = reverse("api:Shopping_cart-batch")
+    list_url = reverse("api:Shopping_cart-list")
+    login_url = reverse("api:token-obtain")
+
+    def test_guest_cart_stays_out_of_the_database(self, api_client, product_factory):
+        first, second = product_factory.create_batch(2)
+
+        resp = api_client.post(self.add_url, {"product": first.id, "quantity": 2})
+
+        assert resp.status_code == status.HTTP_201_CREATED
+        assert resp.json()["id"] is None
+        assert resp.json()["quantity"] == 2
+        token = resp["X-Cart-Token"]
+
+        operations = [
+            {"op": "add", "product": second.id},
+            {"op": "update", "product": first.id, "quantity": 5},
+        ]
+        resp = api_client.post(
+            self.batch_url,
+            {"operations": operations},
+            format="json",
+            HTTP_X_CART_TOKEN=token,
+        )
+        assert resp["X-Cart-Token"] == token
+
+        cart = api_client.get(self.list_url, HTTP_X_CART_TOKEN=token).json()
+        cart = cart["results"][0]
+        assert cart == resp.json()
+        assert [(i["product"]["id"], i["quantity"]) for i in cart["items"]] == [
+            (str(first.id), 5),
+            (str(second.id), 1),
+        ]
+        assert cart["item_count"] == 6
+        assert Decimal(cart["subtotal"]) == first.price * 5 + second.price
+        assert not ShoppingCart.objects.exists()
+        assert not CartItem.objects.exists()
+
+    def test_unknown_token_starts_a_cart(self, api_client, product):
+        resp = api_client.post(
+            self.add_url, {"product": product.id}, HTTP_X_CART_TOKEN="made-up"
+        )
+
+        assert resp["X-Cart-Token"] != "made-up"
+        cart = api_client.get(self.list_url, HTTP_X_CART_TOKEN="made-up").json()
+        assert cart["results"][0]["items"] == []
+
+    def test_guest_cart_size_is_capped(self, api_client, product_factory, settings):
+        settings.CART_BATCH_LIMIT = 2
+        operations = [
+            {"op": "add", "product": product.id}
+            for product in product_factory.create_batch(3)
+        ]
+
+        resp = api_client.post(
+            self.batch_url, {"operations": operations[:2]}, format="json"
+        )
+        token = resp["X-Cart-Token"]
+        resp = api_client.post(
+            self.batch_url,
+            {"operations": operations[2:]},
+            format="json",
+            HTTP_X_CART_TOKEN=token,
+        )
+
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_login_merges_guest_cart(
+        self,
+        api_client,
+        user,
+        test_password,
+        cart_item_factory,
+        product_factory,
+    ):
+        kept = cart_item_factory(cart__user=user, quantity=1)
+        overwritten = cart_item_factory(cart=kept.cart, quantity=1)
+        new = product_factory()
+        operations = [
+            {"op": "add", "product": overwritten.product_id, "quantity": 3},
+            {"op": "add", "product": new.id, "quantity": 2},
+        ]
+        token = api_client.post(
+            self.batch_url, {"operations": operations}, format="json"
+        )["X-Cart-Token"]
+
+        resp = api_client.post(
+            self.login_url,
+            {"email": user.email, "password": test_password},
+            HTTP_X_CART_TOKEN=token,
+        )
+
+        assert resp.status_code == status.HTTP_200_OK
+        lines = {line.product_id: line.quantity for line in CartItem.objects.all()}
+        assert lines == {kept.product_id: 1, overwritten.product_id: 3, new.id: 2}
+        kept.cart.refresh_from_db()
+        assert kept.cart.item_count == 6
+        # the guest cart is gone
+        cart = api_client.get(self.list_url, HTTP_X_CART_TOKEN=token).json()
+        assert cart["results"][0]["items"] == []
+
+    def test_signed_cookie_store(
+        self, api_client, user, test_password, product, settings
+    ):
+        settings.GUEST_CART_STORE = "apps.cart.guest.SignedCookieGuestCartStore"
+
+        resp = api_client.post(self.add_url, {"product": product.id, "quantity": 4})
+
+        assert "X-Cart-Token" not in resp
+        assert resp.cookies["guest_cart"]["httponly"]
+        cart = api_client.get(self.list_url).json()["results"][0]
+        assert cart["item_count"] == 4
+
+        api_client.cookies["guest_cart"] = "tampered"
+        assert api_client.get(self.list_url).json()["results"][0]["items"] == []
+
+        api_client.post(self.add_url, {"product": product.id, "quantity": 4})
+        resp = api_client.post(
+            self.login_url, {"email": user.email, "password": test_password}
+        )
+
+        assert resp.cookies["guest_cart"].value == ""
+        assert CartItem.objects.get(cart__user=user).quantity == 4
+
+
+class TestUpsert:
+    def test_missing_cart(self, user, product):
+        assert CartItem.upsert(user.pk, product.pk, 1) is None
+        assert not CartItem.objects.exists()
+
+    def test_cart_is_locked_before_the_line_write(
+        self, shopping_cart, product, monkeypatch
+    ):
+        # take the row lock path, minus the FOR UPDATE SQLite can't parse
+        locks = []
+        monkeypatch.setattr(connection.features, "has_select_for_update", True)
+        monkeypatch.setattr(
+            connection.ops,
+            "for_update_sql",
+            lambda *args, **kwargs: locks.append(1) or "",
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            CartItem.upsert(shopping_cart.user_id, product.pk, 2)
+
+        statements = [q["sql"].split()[0] for q in queries.captured_queries]
+        assert locks == [1]
+        assert statements == ["SELECT", "INSERT", "UPDATE"]
+        shopping_cart.refresh_from_db()
+        assert shopping_cart.item_count == 2
+
+    @pytest.mark.django_db(transaction=True)
+    def test_parallel_upserts_keep_one_line(self, shopping_cart, product_factory):
+        """
+        Each upsert runs in its own connection, in autocommit like a request
+        on Postgres. SQLite cannot run concurrent write transactions that
+        read first, so the requests themselves are not raced here.
+        """
+        products = product_factory.create_batch(2)
+        user_id = shopping_cart.user_id
+        workers = 8
+        barrier = threading.Barrier(workers)
+        ids = []
+
+        def add(product, quantity):
+            try:
+                barrier.wait()
+                ids.append((product.pk, CartItem.upsert(user_id, product.pk, quantity)))
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=add, args=(products[i % 2], i + 1))
+            for i in range(workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        lines = {line.product_id: line for line in CartItem.objects.all()}
+        assert len(ids) == workers
+        assert set(lines) == {p.pk for p in products}
+        assert all(item_id == lines[pk].id for pk, item_id in ids)
+        shopping_cart.refresh_from_db()
+        assert shopping_cart.item_count == sum(line.quantity for line in lines.values())
+        for product in products:
+            line = lines[product.pk]
+            assert line.price == product.price * line.quantity
@@ -1,18 +1,35 @@
 from rest_framework import status
+from uuid import UUID
+
+from django.conf import settings
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
+from apps.cart.guest import GuestCart
 from apps.cart.models import CartItem, ShoppingCart
 from apps.cart.serializers import (
     AddToCartSerializer,
+    BatchCartSerializer,
     CartItemSerializer,
+    CartOperationSerializer,
     ShoppingCartSerializer,
 )
+from apps.common.queries import QueryPlan
+from apps.common.views import NonAtomicReadsMixin, QueryPlanMixin
+
 
+class ShoppingCartViewSet(NonAtomicReadsMixin, QueryPlanMixin, ModelViewSet):
+    """
+    The cart of the requesting user. Anonymous users can list, add and batch
+    against a guest cart, see apps.cart.guest, which is merged into their
+    cart when they log in.
+    """
 
-class ShoppingCartViewSet(ModelViewSet):
     serializer_class = ShoppingCartSerializer
+    guest_actions = ["list", "add_to_cart", "batch"]
 
     http_method_names = [
         m for m in ModelViewSet.http_method_names if m not in ["put", "patch"]
@@ -21,9 +38,7 @@ class ShoppingCartViewSet(ModelViewSet):
     def get_queryset(self):
         user = self.request.user
         if user.is_authenticated:
-            return ShoppingCart.objects.filter(user=self.request.user).prefetch_related(
-                "items__product", "items__product__brand", "items__product__category"
-            )
+            return ShoppingCart.objects.filter(user=self.request.user)
         return ShoppingCart.objects.none()
 
     def get_object(self):
@@ -32,11 +47,40 @@ class ShoppingCartViewSet(ModelViewSet):
             obj, created = ShoppingCart.objects.get_or_create(user=self.request.user)
             return obj
 
+    def get_permissions(self):
+        if self.action in self.guest_actions and not self.request.user.is_authenticated:
+            return [AllowAny()]
+        return super().get_permissions()
+
     def get_serializer_class(self):
         if self.action == "add_to_cart":
             self.serializer_class = AddToCartSerializer
+        if self.action == "batch":
+            self.serializer_class = BatchCartSerializer
         return super().get_serializer_class()
 
+    def list(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return super().list(request, *args, **kwargs)
+        _, lines = GuestCart.load(request)
+        page = self.paginate_queryset([GuestCart.to_representation(lines)])
+        return self.get_paginated_response(page)
+
+    def update_guest_cart(self, request, operations):
+        """(token, lines) of the request's guest cart after batch `operations`"""
+        token, lines = GuestCart.load(request)
+        quantities = BatchCartSerializer.fold(operations, {UUID(pk) for pk in lines})
+        for product, quantity in quantities.items():
+            if quantity:
+                lines[str(product)] = quantity
+            else:
+                lines.pop(str(product), None)
+        if len(lines) > settings.CART_BATCH_LIMIT:
+            raise ValidationError(
+                f"A guest cart holds at most {settings.CART_BATCH_LIMIT} products"
+            )
+        return token, lines
+
     @action(detail=False, methods=["post"], url_path="add")
     def add_to_cart(self, request):
         serializer = AddToCartSerializer(data=request.data)
@@ -45,43 +89,86 @@ class ShoppingCartViewSet(ModelViewSet):
         product = serializer.validated_data.get("product")
         quantity = serializer.validated_data.get("quantity")
 
-        cart = self.get_object()
-
-        cart_item, _ = CartItem.objects.get_or_create(cart=cart, product=product)
-        cart_item.quantity = quantity
-        cart_item.price = product.price * quantity
-        cart_item.save()
+        if not request.user.is_authenticated:
+            operation = {
+                "op": CartOperationSerializer.ADD,
+                "product": product.pk,
+                "quantity": quantity,
+            }
+            token, lines = self.update_guest_cart(request, [operation])
+            (item,) = GuestCart.items({str(product.pk): quantity})
+            response = Response(
+                CartItemSerializer(item).data, status=status.HTTP_201_CREATED
+            )
+            GuestCart.save(response, token, lines)
+            return response
+
+        user = request.user
+        item_id = CartItem.upsert(user.pk, product.pk, quantity)
+        if item_id is None:
+            # first item of the user, the cart has to exist before the line
+            ShoppingCart.objects.get_or_create(user=user)
+            item_id = CartItem.upsert(user.pk, product.pk, quantity)
+
+        queryset = QueryPlan.for_serializer(CartItemSerializer).apply(
+            CartItem.objects.all()
+        )
+        cart_item = queryset.get(id=item_id)
 
         response_data = CartItemSerializer(cart_item)
         return Response(response_data.data, status=status.HTTP_201_CREATED)
 
+    @action(detail=False, methods=["post"], url_path="batch")
+    def batch(self, request):
+        """
+        Apply a list of add, update and remove operations to the cart in one
+        transaction and return the resulting cart
+        """
+        serializer = BatchCartSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        if not request.user.is_authenticated:
+            token, lines = self.update_guest_cart(
+                request, serializer.validated_data["operations"]
+            )
+            response = Response(GuestCart.to_representation(lines))
+            GuestCart.save(response, token, lines)
+            return response
+
+        cart, _ = ShoppingCart.objects.get_or_create(user=request.user)
+        serializer.save(cart=cart)
+
+        queryset = QueryPlan.for_serializer(ShoppingCartSerializer).apply(
+            ShoppingCart.objects.all()
+        )
+        response_data = ShoppingCartSerializer(queryset.get(pk=cart.pk))
+        return Response(response_data.data, status=status.HTTP_200_OK)
+
     @action(detail=False, methods=["get"], url_path="cartitem/(?P<item_id>[^/.]+)")
     def retrieve_cartitem(self, request, item_id=None):
+        queryset = QueryPlan.for_serializer(CartItemSerializer).apply(
+            CartItem.for_user(request.user)
+        )
         try:
-            cart_item = CartItem.objects.select_related("product").get(id=item_id)
+            cart_item = queryset.get(id=item_id)
 
         except CartItem.DoesNotExist:
             return Response(
                 {"detail": "Item not found"}, status=status.HTTP_404_NOT_FOUND
             )
 
-        except CartItem.MultipleObjectsReturned:
-            return Response({"detail": "Multiple Items found"})
-
         response_data = CartItemSerializer(cart_item)
         return Response(response_data.data, status=status.HTTP_202_ACCEPTED)
 
     @action(detail=False, methods=["delete"], url_path="remove/(?P<item_id>[^/.]+)")
     def remove_from_cart(self, request, item_id=None):
         try:
-            cart_item = CartItem.objects.get(id=item_id)
+            cart_item = CartItem.for_user(request.user).get(id=item_id)
 
         except CartItem.DoesNotExist:
             return Response(
                 {"detail": "Item not found."}, status=status.HTTP_404_NOT_FOUND
             )
-        except CartItem.MultipleObjectsReturned:
-            return Response({"detail": "Multiple items found"})
 
         cart_item.delete()
 
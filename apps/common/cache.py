@@ -0,0 +1,144 @@
+import hashlib
+import time
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+from .routers import read_alias
+
+
+class ResponseCache:
+    """
+    Versioned cache for read-only API responses.
+
+    Every cached response is keyed on a namespace version. Bumping the version
+    invalidates all responses of the namespace at once without deleting keys,
+    stale entries are left to expire.
+    """
+
+    prefix = "response-cache"
+
+    @classmethod
+    def _key(cls, namespace, name):
+        return f"{cls.prefix}:{namespace}:{name}"
+
+    @classmethod
+    def get_version(cls, namespace):
+        key = cls._key(namespace, "version")
+        version = cache.get(key)
+        if version is None:
+            # start from a timestamp so entries of an evicted version are not reused
+            cache.add(key, time.time_ns(), timeout=None)
+            version = cache.get(key)
+        return version
+
+    @classmethod
+    def invalidate(cls, namespace):
+        """
+        Bump the namespace version once the current transaction commits. A
+        read between the write and its commit still sees the old rows, and
+        would cache them under a version bumped earlier.
+        """
+        transaction.on_commit(partial(cls._bump, namespace))
+
+    @classmethod
+    def _bump(cls, namespace):
+        key = cls._key(namespace, "version")
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+        if settings.REPLICA_DATABASE:
+            cache.set(
+                cls._key(namespace, "bumped"), True, settings.REPLICA_PIN_SECONDS
+            )
+
+    @classmethod
+    def may_store(cls, namespace):
+        """
+        Whether a response just rendered for `namespace` can be cached. A
+        response read from the replica within REPLICA_PIN_SECONDS of a bump may
+        predate the write behind it, and would be served to everyone until it
+        expired.
+        """
+        if read_alias.get() is None:
+            return True
+        return not cache.get(cls._key(namespace, "bumped"))
+
+    @classmethod
+    def make_key(cls, namespace, request):
+        params = sorted(
+            (k, v) for k, values in request.query_params.lists() for v in values
+        )
+        digest = hashlib.md5(
+            f"{request.path}?{params}".encode(), usedforsecurity=False
+        ).hexdigest()
+        return cls._key(namespace, f"v{cls.get_version(namespace)}:{digest}")
+
+    @classmethod
+    def _count(cls, namespace, name):
+        key = cls._key(namespace, name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # first count, unless another request just started it
+            if not cache.add(key, 1, timeout=None):
+                cache.incr(key)
+
+    @classmethod
+    def record_hit(cls, namespace):
+        cls._count(namespace, "hits")
+
+    @classmethod
+    def record_miss(cls, namespace):
+        cls._count(namespace, "misses")
+
+    @classmethod
+    def stats(cls, namespace):
+        keys = {name: cls._key(namespace, name) for name in ("hits", "misses")}
+        values = cache.get_many(keys.values())
+        return {name: values.get(key, 0) for name, key in keys.items()}
+
+
+class CachedResponseMixin:
+    """
+    Serve `list` and `retrieve` from ResponseCache.
+
+    Set `cache_namespace` on the viewset and call `ResponseCache.invalidate`
+    with the same namespace whenever the underlying data changes.
+    """
+
+    cache_namespace = None
+    cache_timeout = None
+
+    def get_cache_timeout(self):
+        if self.cache_timeout is not None:
+            return self.cache_timeout
+        return settings.RESPONSE_CACHE_TIMEOUT
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        namespace = self.cache_namespace
+        key = ResponseCache.make_key(namespace, request)
+
+        data = cache.get(key)
+        if data is not None:
+            ResponseCache.record_hit(namespace)
+            response = Response(data)
+            response["X-Cache"] = "HIT"
+            return response
+
+        ResponseCache.record_miss(namespace)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200 and ResponseCache.may_store(namespace):
+            cache.set(key, response.data, timeout=self.get_cache_timeout())
+        response["X-Cache"] = "MISS"
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
@@ -1,6 +1,15 @@
+import logging
+from datetime import timedelta
+from itertools import groupby
+
 from anymail.message import AnymailMessage
 from django.conf import settings
-from django.core.mail import EmailMessage
+from django.db import transaction
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+logger = logging.getLogger(__name__)
 
 
 def send_email(subject, message, recipient, fail_silently=False):
@@ -14,22 +23,118 @@ def send_email(subject, message, recipient, fail_silently=False):
     return msg.send(fail_silently=fail_silently)
 
 
-def send_email_template(
-    email, template_id: str, dynamic_template_data: dict = None, fail_silently=True
-):
+def send_email_template(email, template_id: str, dynamic_template_data: dict = None):
     """
     Helper to send emails system wide.
     Special consideration made for sendgrid's dynamic templating.
 
+    The email is written to the outbox in the current transaction and delivered
+    later by the `send_queued_emails` worker, so requests never wait on the ESP.
+
     https://docs.sendgrid.com/ui/sending-email/how-to-send-an-email-with-dynamic-transactional-templates
     """
+    return EmailOutbox.objects.create(
+        email=email,
+        template_id=template_id,
+        merge_data=dynamic_template_data or {},
+    )
+
+
+def deliver_email_template(recipients: list, template_id: str, merge_data: dict):
+    """
+    Send one template to many recipients, each with its own merge data.
+    `merge_data` needs an entry for every recipient.
+    """
     msg = AnymailMessage(
         from_email=settings.FROM_EMAIL,
-        to=[email],
+        to=recipients,
     )
     msg.template_id = template_id
+    # always set, even empty: merge data is what makes the ESP send each
+    # recipient their own message instead of one with everyone in To
+    msg.merge_data = merge_data
 
-    if dynamic_template_data:
-        msg.merge_data = dynamic_template_data
+    return msg.send(fail_silently=False)
 
-    return msg.send(fail_silently=fail_silently)
+
+def split_recipients(entries, size):
+    """
+    Group outbox rows into messages of at most `size` recipients.
+    A recipient appears once per message as merge data is keyed by address.
+    """
+    messages = []
+    for entry in entries:
+        for message in messages:
+            if len(message) < size and entry.email not in message:
+                message[entry.email] = entry
+                break
+        else:
+            messages.append({entry.email: entry})
+    return [list(message.values()) for message in messages]
+
+
+def retry_delay(attempts):
+    delay = settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, settings.EMAIL_OUTBOX_MAX_RETRY_DELAY))
+
+
+def deliver_queued_emails(batch_size=None):
+    """
+    Deliver one batch of due outbox rows, grouping rows that share a template
+    into multi-recipient sends. Failed sends are retried with exponential
+    backoff until EMAIL_OUTBOX_MAX_ATTEMPTS.
+
+    Returns:
+        sent, failed: number of rows delivered and rows that failed this round
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    now = timezone.now()
+
+    with transaction.atomic():
+        entries = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status=EmailOutbox.Status.PENDING, next_attempt_at__lte=now)
+            .order_by("template_id", "created_at")[:batch_size]
+        )
+
+        delivered, retried = [], []
+        for template_id, group in groupby(entries, key=lambda e: e.template_id):
+            for message in split_recipients(
+                group, settings.EMAIL_OUTBOX_MAX_RECIPIENTS
+            ):
+                merge_data = {
+                    entry.email: entry.merge_data.get(entry.email, {})
+                    for entry in message
+                }
+                try:
+                    deliver_email_template(
+                        [entry.email for entry in message], template_id, merge_data
+                    )
+                except Exception as e:
+                    logger.error(f"Error sending {template_id} emails: {e}")
+                    for entry in message:
+                        entry.attempts += 1
+                        entry.last_error = str(e)
+                        entry.next_attempt_at = now + retry_delay(entry.attempts)
+                        if entry.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+                            entry.status = EmailOutbox.Status.FAILED
+                    retried += message
+                else:
+                    for entry in message:
+                        entry.status = EmailOutbox.Status.SENT
+                        entry.sent_at = now
+                        entry.attempts += 1
+                    delivered += message
+
+        # bulk_update skips auto_now
+        for entry in entries:
+            entry.updated_at = now
+        EmailOutbox.objects.bulk_update(
+            delivered, ["status", "sent_at", "attempts", "updated_at"]
+        )
+        EmailOutbox.objects.bulk_update(
+            retried,
+            ["status", "attempts", "last_error", "next_attempt_at", "updated_at"],
+        )
+
+    return len(delivered), len(retried)
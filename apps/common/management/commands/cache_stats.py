@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from apps.common.cache import ResponseCache
+
+
+class Command(BaseCommand):
+    help = "Report hit/miss counters of the response cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument("namespaces", nargs="*", default=["catalog"])
+
+    def handle(self, *args, **options):
+        for namespace in options["namespaces"]:
+            stats = ResponseCache.stats(namespace)
+            total = stats["hits"] + stats["misses"]
+            ratio = stats["hits"] / total if total else 0
+            self.stdout.write(
+                f"{namespace}: {stats['hits']} hits, {stats['misses']} misses "
+                f"({ratio:.1%} hit rate)"
+            )
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.common.email import deliver_queued_emails
+
+
+class Command(BaseCommand):
+    help = "Deliver queued template emails from the outbox"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument(
+            "--loop", action="store_true", help="Keep polling the outbox"
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds to wait when the outbox is empty, with --loop",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = deliver_queued_emails(options["batch_size"])
+            if sent or failed:
+                self.stdout.write(f"Sent {sent} email(s), {failed} failed")
+            if not options["loop"]:
+                break
+            if not (sent or failed):
+                time.sleep(options["interval"])
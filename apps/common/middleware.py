@@ -0,0 +1,128 @@
+import hashlib
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from .routers import read_alias
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCounter:
+    """Execute wrapper counting queries and the time spent running them"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+class QueryTimingMiddleware:
+    """
+    Record query count, database time and total view time of sampled requests.
+
+    Figures are returned in a `Server-Timing` header and logged as one
+    key=value line per request, keyed by the resolved view name.
+    QUERY_TIMING_SAMPLE_RATE controls the share of requests measured.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.QUERY_TIMING_SAMPLE_RATE:
+            return self.get_response(request)
+
+        counter = QueryCounter()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(counter))
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        match = request.resolver_match
+        route = match.view_name if match else "unresolved"
+        db_ms = counter.duration * 1000
+        view_ms = duration * 1000
+
+        response["Server-Timing"] = (
+            f'db;dur={db_ms:.1f};desc="{counter.count} queries", '
+            f"view;dur={view_ms:.1f}"
+        )
+        logger.info(
+            "route=%s method=%s status=%s queries=%d db_ms=%.1f view_ms=%.1f",
+            route,
+            request.method,
+            response.status_code,
+            counter.count,
+            db_ms,
+            view_ms,
+        )
+        return response
+
+
+class ReplicaMiddleware:
+    """
+    Serve safe requests to views with `use_replica = True` from the
+    REPLICA_DATABASE alias.
+
+    A client that made a successful write is pinned to the primary for
+    REPLICA_PIN_SECONDS so it reads its own writes despite replication lag.
+    Clients are told apart by their Authorization header or session cookie.
+    Other clients are protected by ResponseCache.may_store, which keeps
+    replica reads out of the shared response cache for as long after a write.
+    """
+
+    safe_methods = ("GET", "HEAD", "OPTIONS")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    @staticmethod
+    def pin_key(request):
+        credential = request.META.get("HTTP_AUTHORIZATION") or request.COOKIES.get(
+            settings.SESSION_COOKIE_NAME
+        )
+        if not credential:
+            return None
+        return "replica:pin:" + hashlib.sha256(credential.encode()).hexdigest()
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        finally:
+            token = getattr(request, "_read_alias_token", None)
+            if token is not None:
+                read_alias.reset(token)
+
+        if request.method not in self.safe_methods and response.status_code < 400:
+            key = self.pin_key(request)
+            if key:
+                cache.set(key, True, settings.REPLICA_PIN_SECONDS)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        alias = settings.REPLICA_DATABASE
+        if not alias or request.method not in self.safe_methods:
+            return None
+        if not getattr(getattr(view_func, "cls", None), "use_replica", False):
+            return None
+
+        key = self.pin_key(request)
+        if key and cache.get(key):
+            return None
+        request._read_alias_token = read_alias.set(alias)
+        return None
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.2 on 2026-10-18 15:08
+
+import apps.common.models
+import django.core.serializers.json
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailOutbox',
+            fields=[
+                ('id', models.UUIDField(default=apps.common.models.generate_id, editable=False, primary_key=True, serialize=False, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='created_at')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='updated at')),
+                ('is_active', models.BooleanField(default=True)),
+                ('email', models.EmailField(max_length=254)),
+                ('template_id', models.CharField(max_length=100)),
+                ('merge_data', models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('status', models.CharField(choices=[('PE', 'Pending'), ('SE', 'Sent'), ('FA', 'Failed')], default='PE', max_length=2)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+            ],
+            options={
+                'verbose_name_plural': 'email outbox',
+                'ordering': ('created_at',),
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='common_emai_status_257e11_idx')],
+            },
+        ),
+    ]
@@ -1,12 +1,44 @@
+import os
+import time
 import uuid
 
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 
+def uuid7():
+    """
+    Time-ordered UUID (RFC 9562 version 7).
+
+    48 bits of unix milliseconds, 12 bits of sub-millisecond time and 62
+    random bits, so ids generated later sort after earlier ones.
+    """
+    nanoseconds = time.time_ns()
+    millis, remainder = divmod(nanoseconds, 1_000_000)
+    sub_millis = remainder * 4096 // 1_000_000
+    rand = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+
+    value = (millis & ((1 << 48) - 1)) << 80
+    value |= 0x7 << 76
+    value |= sub_millis << 64
+    value |= 0b10 << 62
+    value |= rand
+    return uuid.UUID(int=value)
+
+
+def generate_id():
+    """Primary key default for every model, see TIME_ORDERED_IDS"""
+    if settings.TIME_ORDERED_IDS:
+        return uuid7()
+    return uuid.uuid4()
+
+
 class BaseModel(models.Model):
     id = models.UUIDField(
-        default=uuid.uuid4, editable=False, unique=True, primary_key=True
+        default=generate_id, editable=False, unique=True, primary_key=True
     )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("created_at"))
     updated_at = models.DateTimeField(auto_now=True, verbose_name=_("updated at"))
@@ -30,3 +62,36 @@ class BaseModel(models.Model):
         if self.is_active:
             self.is_active = False
             self.save(update_fields=["is_active", "updated_at"] if self.pk else None)
+
+
+class EmailOutbox(BaseModel):
+    """
+    Template email waiting to be delivered by the `send_queued_emails` worker.
+
+    Rows are written in the caller's transaction, so an email is only queued if
+    the request that triggered it commits.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "PE", _("Pending")
+        SENT = "SE", _("Sent")
+        FAILED = "FA", _("Failed")
+
+    email = models.EmailField()
+    template_id = models.CharField(max_length=100)
+    merge_data = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    status = models.CharField(
+        max_length=2, choices=Status.choices, default=Status.PENDING
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ("created_at",)
+        verbose_name_plural = "email outbox"
+        indexes = [models.Index(fields=["status", "next_attempt_at"])]
+
+    def __str__(self):
+        return f"{self.template_id} to {self.email}"
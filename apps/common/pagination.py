@@ -1,4 +1,14 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.db.models import Q, QuerySet
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
 
 
 class DefaultPagination(PageNumberPagination):
@@ -11,3 +21,140 @@ class LargePagination(PageNumberPagination):
     page_size = 1000
     page_size_query_param = "page_size"
     max_page_size = 10000
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Keyset (seek) pagination over `ordering`, opt-in per request.
+
+    Requests with a `cursor` query param (empty for the first page) are paged
+    with a WHERE clause on the last row seen instead of COUNT(*) and OFFSET, so
+    deep pages cost the same as the first one. Requests without it keep the
+    page number behaviour.
+
+    `ordering` must end in a unique field so rows with equal timestamps are
+    neither skipped nor repeated. All fields must sort in the same direction.
+    Keyset pages always follow it, so an `ordering` query param for the
+    OrderingFilter is rejected with a 400 instead of being ignored.
+    """
+
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    ordering = ("created_at", "id")
+    # always page by cursor, even without a cursor query param
+    keyset_only = False
+    invalid_cursor_message = _("Invalid cursor")
+    ordering_message = _("Ordering is not supported with cursor pagination")
+
+    def use_keyset(self, queryset, request):
+        if not isinstance(queryset, QuerySet):
+            return False
+        return self.keyset_only or self.cursor_query_param in request.query_params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.use_keyset(queryset, request)
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view=view)
+
+        if request.query_params.get(api_settings.ORDERING_PARAM):
+            raise ValidationError({api_settings.ORDERING_PARAM: self.ordering_message})
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.fields = [f.lstrip("-") for f in self.ordering]
+        self.descending = self.ordering[0].startswith("-")
+        reverse, position = self.decode_cursor(request, queryset.model)
+
+        # walk backwards for the previous page and flip the rows afterwards
+        backwards = reverse != self.descending
+        prefix = "-" if backwards else ""
+        queryset = queryset.order_by(*[prefix + f for f in self.fields])
+        if position is not None:
+            queryset = queryset.filter(self.seek(position, backwards))
+
+        rows = list(queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.has_next = has_more if not reverse else position is not None
+        self.has_previous = has_more if reverse else position is not None
+        self.rows = rows
+        return rows
+
+    def seek(self, position, backwards):
+        """Rows strictly after position, e.g. a > x OR (a = x AND b > y)"""
+        lookup = "lt" if backwards else "gt"
+        condition = Q()
+        for i, field in enumerate(self.fields):
+            equal = {name: value for name, value in zip(self.fields[:i], position)}
+            condition |= Q(**equal, **{f"{field}__{lookup}": position[i]})
+        return condition
+
+    def encode_cursor(self, row, reverse):
+        if isinstance(row, dict):
+            position = [str(row[field]) for field in self.fields]
+        else:
+            position = [str(getattr(row, field)) for field in self.fields]
+        token = json.dumps({"r": int(reverse), "p": position})
+        return urlsafe_b64encode(token.encode()).decode()
+
+    def get_cursor_link(self, row, reverse):
+        cursor = self.encode_cursor(row, reverse)
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request, model):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return False, None
+
+        try:
+            token = json.loads(urlsafe_b64decode(cursor.encode()).decode())
+            position = [
+                model._meta.get_field(field).to_python(value)
+                for field, value in zip(self.fields, token["p"])
+            ]
+            if len(position) != len(self.fields):
+                raise ValueError
+            return bool(token["r"]), position
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if not self.has_next or not self.rows:
+            return None
+        return self.get_cursor_link(self.rows[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.keyset:
+            return super().get_previous_link()
+        if not self.has_previous:
+            return None
+        if not self.rows:
+            return replace_query_param(self.base_url, self.cursor_query_param, "")
+        return self.get_cursor_link(self.rows[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+
+class OrderDatePagination(KeysetPagination):
+    page_size = 20
+    ordering = ("-order_date", "-id")
+    keyset_only = True
@@ -0,0 +1,38 @@
+import codecs
+import io
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+from .renderers import ORJSONRenderer, orjson
+
+# orjson reads integers outside 64 bits as floats. Digits are mapped to "0"
+# so a run of 19 is a substring search, much faster than a regex.
+DIGITS = bytes.maketrans(b"123456789", b"000000000")
+LONG_NUMBER = b"0" * 19
+
+
+class ORJSONParser(JSONParser):
+    """
+    JSONParser backed by orjson when it is installed.
+
+    Bodies orjson rejects, that are not UTF-8 or that may hold integers
+    outside 64 bits are parsed by JSONParser, so errors and lenient inputs
+    (e.g. NaN when STRICT_JSON is off) behave exactly as before.
+    """
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or codecs.lookup(encoding).name != "utf-8":
+            return super().parse(stream, media_type, parser_context)
+
+        data = stream.read()
+        if LONG_NUMBER in data.translate(DIGITS):
+            return super().parse(io.BytesIO(data), media_type, parser_context)
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return super().parse(io.BytesIO(data), media_type, parser_context)
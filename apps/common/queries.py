@@ -0,0 +1,159 @@
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+
+class QueryPlan:
+    """
+    Joins, prefetches and columns a serializer reads from its model.
+
+    Dotted sources through forward foreign keys and nested serializers on them
+    become `select_related` joins, nested `many=True` serializers and other
+    to-many relations become prefetches with a plan of their own, and a
+    related primary key only needs its foreign key column.
+
+    The columns are only restricted with `only()` when every field resolves to
+    a model field. A method field, a property or a `*` source may read
+    anything, so the model is then loaded in full. Relations such fields read
+    are declared in `Meta.select_related` and `Meta.prefetch_related` of the
+    serializer.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.select = []
+        self.prefetch = {}
+        self.columns = set()
+        self.complete = True
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def for_serializer(cls, serializer_class, model=None):
+        serializer = serializer_class()
+        plan = cls(model or serializer.Meta.model)
+        plan.add_serializer(serializer, prefix="", model=plan.model)
+        return plan
+
+    def add_serializer(self, serializer, prefix, model):
+        # relations read by method fields, declared on the serializer's Meta
+        meta = getattr(serializer, "Meta", None)
+        for path in getattr(meta, "select_related", ()):
+            self.join(prefix + path)
+            self.complete = False
+        for path in getattr(meta, "prefetch_related", ()):
+            self.prefetch.setdefault(prefix + path, None)
+            self.complete = False
+
+        for field in serializer.fields.values():
+            if field.write_only:
+                continue
+            if field.source == "*" or isinstance(
+                field, serializers.SerializerMethodField
+            ):
+                self.complete = False
+                continue
+            self.add_field(field, field.source.split("."), prefix, model)
+
+    def add_field(self, field, parts, prefix, model):
+        try:
+            model_field = model._meta.get_field(parts[0])
+        except FieldDoesNotExist:
+            # a property or method of the model
+            self.complete = False
+            return
+
+        path = prefix + parts[0]
+        last = len(parts) == 1
+        if not model_field.is_relation:
+            if last:
+                self.columns.add(path)
+            else:
+                self.complete = False
+            return
+
+        if model_field.many_to_many or model_field.one_to_many:
+            if not last:
+                self.complete = False
+                self.prefetch.setdefault(path, None)
+                return
+            child = getattr(field, "child", None) or getattr(
+                field, "child_relation", None
+            )
+            if isinstance(child, serializers.ModelSerializer):
+                self.prefetch[path] = self.for_related(type(child), model_field)
+            else:
+                self.prefetch.setdefault(path, None)
+            return
+
+        # forward foreign key or a one to one relation
+        if model_field.concrete:
+            self.columns.add(path)
+        if last and isinstance(field, serializers.RelatedField):
+            if not field.use_pk_only_optimization():
+                self.join(path)
+                self.complete = False
+            return
+        self.join(path)
+        related = model_field.related_model
+        if last:
+            if isinstance(field, serializers.ModelSerializer):
+                self.add_serializer(field, path + "__", related)
+            else:
+                self.complete = False
+            return
+        self.add_field(field, parts[1:], path + "__", related)
+
+    def for_related(self, serializer_class, relation):
+        plan = QueryPlan.for_serializer(serializer_class, relation.related_model)
+        if relation.one_to_many and plan.complete:
+            # rows are matched to their parent on the foreign key
+            plan = plan.copy()
+            plan.columns.add(relation.field.name)
+        return plan
+
+    def copy(self):
+        plan = QueryPlan(self.model)
+        plan.select = list(self.select)
+        plan.prefetch = dict(self.prefetch)
+        plan.columns = set(self.columns)
+        plan.complete = self.complete
+        return plan
+
+    def join(self, path):
+        if path not in self.select:
+            self.select.append(path)
+
+    def prefetches(self, queryset):
+        seen = {
+            getattr(lookup, "prefetch_to", lookup)
+            for lookup in queryset._prefetch_related_lookups
+        }
+        for path, plan in self.prefetch.items():
+            if path in seen:
+                continue
+            if plan is None:
+                yield path
+            else:
+                yield Prefetch(path, queryset=plan.apply(plan.model.objects.all()))
+
+    def apply(self, queryset, *columns):
+        """
+        `queryset` with the plan's joins, prefetches and columns, plus
+        `columns` read outside the serializer, e.g. by pagination
+        """
+        query = queryset.query
+        # a queryset with its own joins or deferred columns keeps them
+        restrict = (
+            self.complete
+            and query.select_related is False
+            and query.deferred_loading == (frozenset(), True)
+        )
+        if self.select:
+            queryset = queryset.select_related(*self.select)
+        if self.prefetch:
+            queryset = queryset.prefetch_related(*self.prefetches(queryset))
+        if restrict:
+            queryset = queryset.only(*self.columns, *columns)
+        return queryset
@@ -0,0 +1,49 @@
+import re
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# `repr` writes 1e+16 and 1.5e-05 where orjson writes 1e16 and 0.000015.
+# Both patterns start with a literal so the regex engine can skip ahead,
+# matches inside strings only cost a fallback.
+FLOAT_EXPONENT = re.compile(rb"e-?\d+(?:[,\]}]|$)")
+FLOAT_FIXED = re.compile(rb"0\.0000\d*(?:[,\]}]|$)")
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer backed by orjson when it is installed.
+
+    UUID, date and datetime values are encoded by orjson itself, Decimal and
+    other types go through the DRF encoder. The output matches JSONRenderer
+    byte for byte; anything orjson cannot reproduce (indented or ASCII output,
+    integers over 64 bits, non-string keys, floats in exponent notation) is
+    rendered by JSONRenderer instead. Non-finite floats render as null rather
+    than failing.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if orjson is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data, default=self.encoder_class().default, option=orjson.OPT_UTC_Z
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if FLOAT_EXPONENT.search(ret) or FLOAT_FIXED.search(ret):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # same strict javascript subset escaping as JSONRenderer
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
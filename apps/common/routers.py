@@ -0,0 +1,27 @@
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# alias reads are sent to, set by ReplicaMiddleware for the current request
+read_alias = ContextVar("read_alias", default=None)
+
+
+class ReplicaRouter:
+    """
+    Send reads to the replica while ReplicaMiddleware allows it for the
+    current request. Writes always go to the primary, including saves of
+    instances read from the replica.
+    """
+
+    def db_for_read(self, model, **hints):
+        return read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, settings.REPLICA_DATABASE}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
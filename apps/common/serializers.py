@@ -0,0 +1,146 @@
+import decimal
+from types import SimpleNamespace
+
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.encoding import is_protected_type
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+
+def identity(value):
+    return value
+
+
+class ValuesSerializer:
+    """
+    Read-only fast path reproducing a ModelSerializer's output from
+    `.values()` rows, for list endpoints where nothing is written.
+
+    The readable fields of `serializer_class` are inspected once per class and
+    turned into (name, lookup, converter) accessors: `brand.name` becomes the
+    `brand__name` lookup, a related primary key is read from its column and
+    simple fields are converted with a builtin instead of going through
+    `to_representation`. Fields with a `get_<name>(row)` method here are
+    computed from the row instead; list the columns they read in `extra_values`.
+
+        rows = ProductValuesSerializer.values(Product.objects.filter(...))
+        ProductValuesSerializer(rows).data
+    """
+
+    serializer_class = None
+    extra_values = ()
+
+    converters = {
+        serializers.CharField: str,
+        serializers.IntegerField: int,
+        serializers.FloatField: float,
+        serializers.BooleanField: bool,
+        serializers.PrimaryKeyRelatedField: identity,
+    }
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    @classmethod
+    def get_accessors(cls):
+        if "_accessors" not in cls.__dict__:
+            cls._accessors = cls.build_accessors()
+        return cls._accessors
+
+    @classmethod
+    def build_accessors(cls):
+        accessors = []
+        for name, field in cls.serializer_class().fields.items():
+            if field.write_only:
+                continue
+            if hasattr(cls, f"get_{name}"):
+                accessors.append((name, None, getattr(cls, f"get_{name}")))
+                continue
+            if field.source == "*" or isinstance(
+                field, serializers.SerializerMethodField
+            ):
+                raise ImproperlyConfigured(
+                    f"{cls.__name__} needs a get_{name} method for `{name}`"
+                )
+            accessors.append(
+                (name, field.source.replace(".", "__"), cls.get_converter(field))
+            )
+        return accessors
+
+    @classmethod
+    def get_converter(cls, field):
+        if (
+            isinstance(field, serializers.UUIDField)
+            and field.uuid_format == "hex_verbose"
+        ):
+            return str
+        if isinstance(field, serializers.DecimalField):
+            return cls.decimal_converter(field)
+        if isinstance(field, serializers.ModelField):
+            return cls.model_field_converter(field.model_field)
+        converter = cls.converters.get(type(field))
+        if converter is not None:
+            return converter
+        return field.to_representation
+
+    @staticmethod
+    def decimal_converter(field):
+        """DecimalField.to_representation with its quantize context built once"""
+        coerce_to_string = getattr(
+            field, "coerce_to_string", api_settings.COERCE_DECIMAL_TO_STRING
+        )
+        if not coerce_to_string or field.localize or not field.decimal_places:
+            return field.to_representation
+
+        context = decimal.getcontext().copy()
+        if field.max_digits is not None:
+            context.prec = field.max_digits
+        if field.rounding is not None:
+            context.rounding = field.rounding
+        quantum = decimal.Decimal(".1") ** field.decimal_places
+
+        def convert(value):
+            if not isinstance(value, decimal.Decimal):
+                return field.to_representation(value)
+            return f"{value.quantize(quantum, context=context):f}"
+
+        return convert
+
+    @staticmethod
+    def model_field_converter(model_field):
+        """ModelField formats the whole instance, hand it a stand-in"""
+
+        def convert(value):
+            if is_protected_type(value):
+                return value
+            return model_field.value_to_string(
+                SimpleNamespace(**{model_field.attname: value})
+            )
+
+        return convert
+
+    @classmethod
+    def lookups(cls):
+        return [lookup for _, lookup, _ in cls.get_accessors() if lookup] + list(
+            cls.extra_values
+        )
+
+    @classmethod
+    def values(cls, queryset, *extra):
+        """`queryset` as dicts holding every column the output needs"""
+        lookups = dict.fromkeys(cls.lookups() + list(extra))
+        return queryset.prefetch_related(None).values(*lookups)
+
+    def to_representation(self, row):
+        ret = {}
+        for name, lookup, converter in self.get_accessors():
+            if lookup is None:
+                ret[name] = converter(self, row)
+                continue
+            value = row[lookup]
+            ret[name] = None if value is None else converter(value)
+        return ret
+
+    @property
+    def data(self):
+        return [self.to_representation(row) for row in self.rows]
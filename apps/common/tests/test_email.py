@@ -0,0 +1,129 @@
+import json
+from datetime import timedelta
+
+import pytest
+import requests
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.common import email
+from apps.common.email import deliver_queued_emails, send_email_template
+from apps.common.models import EmailOutbox
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def failing_send(monkeypatch):
+    def send(*args, **kwargs):
+        raise ConnectionError("esp unavailable")
+
+    monkeypatch.setattr(email, "deliver_email_template", send)
+
+
+class TestEmailOutbox:
+    def test_send_is_queued(self):
+        send_email_template("a@a.com", "d-1", {"a@a.com": {"code": 1}})
+
+        entry = EmailOutbox.objects.get()
+        assert len(mail.outbox) == 0
+        assert entry.status == EmailOutbox.Status.PENDING
+        assert entry.merge_data == {"a@a.com": {"code": 1}}
+
+    def test_template_is_sent_once_to_all_recipients(self):
+        for i in range(3):
+            send_email_template(f"{i}@a.com", "d-1", {f"{i}@a.com": {"code": i}})
+        send_email_template("x@a.com", "d-2")
+
+        sent, failed = deliver_queued_emails()
+
+        assert (sent, failed) == (4, 0)
+        assert len(mail.outbox) == 2
+        message = next(m for m in mail.outbox if m.template_id == "d-1")
+        assert sorted(message.to) == ["0@a.com", "1@a.com", "2@a.com"]
+        assert message.merge_data["1@a.com"] == {"code": 1}
+        assert not EmailOutbox.objects.exclude(status=EmailOutbox.Status.SENT)
+
+    def test_recipients_are_split(self, settings):
+        settings.EMAIL_OUTBOX_MAX_RECIPIENTS = 2
+        for i in range(3):
+            send_email_template(f"{i}@a.com", "d-1")
+        send_email_template("0@a.com", "d-1")
+
+        deliver_queued_emails()
+
+        assert [len(m.to) for m in mail.outbox] == [2, 2]
+        assert all(len(set(m.to)) == len(m.to) for m in mail.outbox)
+
+    def test_recipients_without_data_are_sent_apart(self, settings, monkeypatch):
+        settings.EMAIL_BACKEND = "anymail.backends.sendgrid.EmailBackend"
+        settings.ANYMAIL = {"SENDGRID_API_KEY": "key"}
+        payloads = []
+
+        def post(session, method, url, **kwargs):
+            payloads.append(json.loads(kwargs["data"]))
+            response = requests.Response()
+            response.status_code = 202
+            return response
+
+        monkeypatch.setattr(requests.Session, "request", post)
+        for i in range(3):
+            send_email_template(f"{i}@a.com", "d-1")
+
+        assert deliver_queued_emails() == (3, 0)
+
+        (payload,) = payloads
+        recipients = [p["to"] for p in payload["personalizations"]]
+        assert recipients == [[{"email": f"{i}@a.com"}] for i in range(3)]
+
+    def test_merge_data_is_keyed_by_recipient(self):
+        send_email_template("a@a.com", "d-1", {"b@a.com": {"code": 1}})
+        send_email_template("b@a.com", "d-1", {"b@a.com": {"code": 2}})
+
+        deliver_queued_emails()
+
+        (message,) = mail.outbox
+        assert message.merge_data == {"a@a.com": {}, "b@a.com": {"code": 2}}
+
+    def test_failed_send_is_retried_with_backoff(self, failing_send, settings):
+        settings.EMAIL_OUTBOX_RETRY_DELAY = 60
+        send_email_template("a@a.com", "d-1")
+
+        assert deliver_queued_emails() == (0, 1)
+        entry = EmailOutbox.objects.get()
+        assert entry.attempts == 1
+        assert entry.status == EmailOutbox.Status.PENDING
+        assert "esp unavailable" in entry.last_error
+        assert entry.next_attempt_at > timezone.now() + timedelta(seconds=50)
+
+        # not due yet
+        assert deliver_queued_emails() == (0, 0)
+
+    def test_retry_delay_is_capped(self, settings):
+        settings.EMAIL_OUTBOX_RETRY_DELAY = 60
+        settings.EMAIL_OUTBOX_MAX_RETRY_DELAY = 300
+
+        assert email.retry_delay(1) == timedelta(seconds=60)
+        assert email.retry_delay(2) == timedelta(seconds=120)
+        assert email.retry_delay(10) == timedelta(seconds=300)
+
+    def test_gives_up_after_max_attempts(self, failing_send, settings):
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+        send_email_template("a@a.com", "d-1")
+
+        for _ in range(2):
+            deliver_queued_emails()
+            EmailOutbox.objects.update(next_attempt_at=timezone.now())
+
+        entry = EmailOutbox.objects.get()
+        assert entry.status == EmailOutbox.Status.FAILED
+        assert deliver_queued_emails() == (0, 0)
+
+    def test_command(self, capsys):
+        send_email_template("a@a.com", "d-1")
+
+        call_command("send_queued_emails")
+
+        assert len(mail.outbox) == 1
+        assert "Sent 1 email(s), 0 failed" in capsys.readouterr().out
@@ -0,0 +1,37 @@
+import logging
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls.base import reverse
+
+pytestmark = pytest.mark.django_db
+
+
+class TestQueryTimingMiddleware:
+    def test_server_timing_header(self, api_client, brand_factory, caplog):
+        brand_factory.create_batch(2)
+
+        with caplog.at_level(logging.INFO, logger="apps.common.middleware"):
+            resp = api_client.get(reverse("api:brand-list"))
+
+        timing = resp["Server-Timing"]
+        assert timing.startswith("db;dur=")
+        assert "queries" in timing
+        assert "view;dur=" in timing
+        assert "route=api:brand-list method=GET status=200" in caplog.text
+
+    def test_counts_queries(self, api_client, product_factory):
+        product_factory.create_batch(3)
+
+        with CaptureQueriesContext(connection) as ctx:
+            resp = api_client.get(reverse("api:products-list"))
+
+        assert f'desc="{len(ctx.captured_queries)} queries"' in resp["Server-Timing"]
+
+    def test_sampling(self, api_client, settings):
+        settings.QUERY_TIMING_SAMPLE_RATE = 0
+
+        resp = api_client.get(reverse("api:brand-list"))
+
+        assert "Server-Timing" not in resp
@@ -0,0 +1,42 @@
+import time
+
+import pytest
+
+from apps.common.models import generate_id, uuid7
+from apps.products.models import Product
+
+pytestmark = pytest.mark.django_db
+
+
+class TestIds:
+    def test_uuid7_layout(self):
+        value = uuid7()
+        millis = value.int >> 80
+
+        assert value.version == 7
+        assert value.variant == "specified in RFC 4122"
+        assert abs(millis - time.time_ns() // 1_000_000) < 1000
+
+    def test_uuid7_is_time_ordered(self):
+        ids = []
+        for _ in range(50):
+            ids.append(uuid7())
+            time.sleep(0.0005)
+
+        assert ids == sorted(ids)
+        assert [i.hex for i in ids] == sorted(i.hex for i in ids)
+
+    def test_generate_id_setting(self, settings):
+        settings.TIME_ORDERED_IDS = False
+
+        assert generate_id().version == 4
+
+    def test_models_use_time_ordered_ids(self, product_factory):
+        first = product_factory()
+        time.sleep(0.001)
+        second = product_factory()
+
+        ids = list(Product.objects.order_by("id").values_list("id", flat=True))
+
+        assert first.id.version == 7
+        assert ids == [first.id, second.id]
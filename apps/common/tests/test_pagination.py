@@ -0,0 +1,70 @@
+import pytest
+from django.urls.base import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from apps.products.models import Product
+
+pytestmark = pytest.mark.django_db
+
+
+def walk(client, url, params):
+    ids, pages = [], 0
+    data = client.get(url, params).json()
+    while True:
+        pages += 1
+        ids += [row["id"] for row in data["results"]]
+        if not data["next"]:
+            return ids, pages, data
+        data = client.get(data["next"]).json()
+
+
+class TestKeysetPagination:
+    url = reverse("api:products-list")
+
+    def test_page_number_is_default(self, api_client, product_factory):
+        product_factory.create_batch(3)
+
+        resp_data = api_client.get(self.url).json()
+
+        assert resp_data["count"] == 3
+
+    def test_cursor_walks_every_row_once(self, api_client, product_factory):
+        products = product_factory.create_batch(7)
+        # equal timestamps must be tie-broken by id
+        Product.objects.update(created_at=timezone.now())
+        expected = sorted(str(p.id) for p in products)
+
+        ids, pages, last = walk(
+            api_client, self.url, {"cursor": "", "page_size": 3}
+        )
+
+        assert ids == [
+            str(pk) for pk in Product.objects.order_by("id").values_list("id", flat=True)
+        ]
+        assert sorted(ids) == expected
+        assert pages == 3
+        assert "count" not in last
+
+    def test_previous_link(self, api_client, product_factory):
+        product_factory.create_batch(5)
+        first = api_client.get(self.url, {"cursor": "", "page_size": 2}).json()
+        second = api_client.get(first["next"]).json()
+
+        previous = api_client.get(second["previous"]).json()
+
+        assert first["previous"] is None
+        assert previous["results"] == first["results"]
+
+    def test_invalid_cursor(self, api_client):
+        resp = api_client.get(self.url, {"cursor": "not-a-cursor"})
+
+        assert resp.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_ordering_is_rejected_with_cursor(self, api_client, product_factory):
+        product_factory.create_batch(2)
+
+        resp = api_client.get(self.url, {"cursor": "", "ordering": "-rating_average"})
+
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+        assert "ordering" in resp.json()
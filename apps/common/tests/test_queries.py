@@ -0,0 +1,153 @@
+import pytest
+from django.urls.base import reverse
+from rest_framework import serializers, status
+
+from apps.cart.serializers import ShoppingCartSerializer
+from apps.common.queries import QueryPlan
+from apps.finance.models import Transaction
+from apps.invite.models import Invitation
+from apps.orders.serializers import OrderSerializer
+from apps.products.models import Favorite, ProductImage
+from apps.reviews.models import AppReview
+from apps.reviews.serializers import ProductReviewSerializer
+from apps.users.models import Role
+
+pytestmark = pytest.mark.django_db
+
+
+class TestQueryPlan:
+    def test_joins_and_columns(self):
+        plan = QueryPlan.for_serializer(ProductReviewSerializer)
+
+        assert plan.select == ["user", "product"]
+        assert plan.columns == {
+            "id",
+            "user",
+            "user__username",
+            "product",
+            "product__name",
+            "rating",
+            "description",
+        }
+        assert plan.complete
+
+    def test_nested_many_is_prefetched(self):
+        plan = QueryPlan.for_serializer(OrderSerializer)
+
+        assert plan.select == ["delivery_address"]
+        items = plan.prefetch["orderItem"]
+        assert items.select == ["product"]
+        # matched to the order by its foreign key
+        assert "order" in items.columns
+
+    def test_nested_serializer_is_joined(self):
+        plan = QueryPlan.for_serializer(ShoppingCartSerializer)
+
+        items = plan.prefetch["items"]
+        assert items.select == ["product", "product__brand", "product__category"]
+        # the product serializer reads a property
+        assert not items.complete
+
+    def test_method_fields_load_everything(self, product_review):
+        class ReviewSerializer(serializers.ModelSerializer):
+            stars = serializers.SerializerMethodField()
+
+            class Meta:
+                model = ProductReviewSerializer.Meta.model
+                fields = ["id", "stars"]
+
+            def get_stars(self, review):
+                return "*" * review.rating
+
+        queryset = QueryPlan.for_serializer(ReviewSerializer).apply(
+            ProductReviewSerializer.Meta.model.objects.all()
+        )
+
+        assert not queryset.query.deferred_loading[0]
+
+    def test_own_joins_are_kept(self, product_review, django_assert_num_queries):
+        model = ProductReviewSerializer.Meta.model
+        queryset = QueryPlan.for_serializer(ProductReviewSerializer).apply(
+            model.objects.select_related("product__brand")
+        )
+
+        with django_assert_num_queries(1):
+            review = queryset.get()
+            assert review.product.brand.name
+            assert review.user.email
+
+
+@pytest.fixture
+def catalog(
+    request,
+    admin_user,
+    user_factory,
+    product_factory,
+    product_review_factory,
+    inventory_factory,
+    order_item_factory,
+    cart_item_factory,
+    address_factory,
+):
+    size = request.param
+    # every user gets a profile from the post_save signal
+    users = [
+        user_factory(username=f"shopper{i}", email=f"shopper{i}@example.com")
+        for i in range(size)
+    ]
+    for i, (user, product) in enumerate(zip(users, product_factory.create_batch(size))):
+        ProductImage.objects.create(product=product, product_image="")
+        Favorite.objects.create(product=product, user=admin_user)
+        product_review_factory(product=product, user=user)
+        AppReview.objects.create(user=user, rating=4)
+        inventory_factory(product=product)
+        cart_item_factory(cart__user=admin_user, product=product)
+        item = order_item_factory(product=product, order__user=admin_user)
+        Transaction.objects.create(user=admin_user, order=item.order, amount=item.price)
+        Role.objects.create(name=f"role {i}")
+        address_factory(user=admin_user)
+        Invitation.objects.create(inviter=admin_user, email=f"guest{i}@example.com")
+    return size
+
+
+# list endpoints and their query count, whatever the number of rows
+LIST_QUERIES = [
+    ("api:brand-list", 2),
+    ("api:category-list", 2),
+    ("api:products-list", 3),
+    ("api:image-list", 2),
+    ("api:favorite-list", 2),
+    ("api:product_review-list", 2),
+    ("api:app_review-list", 2),
+    ("api:inventory-list", 2),
+    ("api:order:order-list", 2),
+    ("api:order:order_item-list", 1),
+    ("api:order_transaction-list", 2),
+    ("api:Shopping_cart-list", 4),
+    # still under ATOMIC_REQUESTS, the savepoint and its release are counted
+    ("api:role-list", 4),
+    ("api:address-list", 4),
+    ("api:profile-list", 4),
+    ("api:users-list", 4),
+    ("api:invitation", 3),
+]
+
+
+class TestListQueries:
+    @pytest.mark.parametrize("catalog", [1, 5], indirect=True)
+    @pytest.mark.parametrize("url_name, queries", LIST_QUERIES)
+    def test_query_count(
+        self,
+        api_client_auth,
+        admin_user,
+        catalog,
+        url_name,
+        queries,
+        django_assert_num_queries,
+    ):
+        client = api_client_auth(admin_user)
+
+        with django_assert_num_queries(queries):
+            resp = client.get(reverse(url_name))
+
+        assert resp.status_code == status.HTTP_200_OK
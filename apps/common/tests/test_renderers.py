@@ -0,0 +1,125 @@
+import io
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from django.urls.base import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from apps.common import parsers, renderers
+from apps.common.parsers import ORJSONParser
+from apps.common.renderers import ORJSONRenderer
+
+PAYLOADS = [
+    {"id": uuid.uuid4(), "price": "12.50", "tags": ["a", "b"], "stock": None},
+    [Decimal("19.99"), Decimal("0.1"), 4.25, -0.0, True, False],
+    {
+        "created_at": datetime(2024, 1, 2, 3, 4, 5, 678, tzinfo=timezone.utc),
+        "shifted": datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone(timedelta(hours=2))),
+        "naive": datetime(2024, 1, 2, 3, 4, 5),
+        "day": date(2024, 1, 2),
+        "at": time(3, 4, 5),
+        "delay": timedelta(minutes=3),
+    },
+    {"text": 'quote " slash \\ tab \t nl \n ctrl \x01 é 😀 \u2028 \u2029'},
+    {"lazy": gettext_lazy("Not found."), "pairs": ((1, 2), (3, 4))},
+    {"small": 1e-7, "tiny": 0.000015, "large": 1.5e16, "ok": 0.0001},
+    [2.5e20, -0.00002],
+    1e16,
+    {"big": 2**64, "negative": -(2**63) - 1},
+    {1: "non string key"},
+    [],
+]
+
+
+@pytest.fixture
+def without_orjson(monkeypatch):
+    monkeypatch.setattr(renderers, "orjson", None)
+    monkeypatch.setattr(parsers, "orjson", None)
+
+
+class TestORJSONRenderer:
+    @pytest.mark.parametrize("data", PAYLOADS)
+    def test_output_matches_json_renderer(self, data):
+        assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    @pytest.mark.parametrize("data", PAYLOADS)
+    def test_falls_back_without_orjson(self, without_orjson, data):
+        assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    def test_indent_is_rendered_by_json_renderer(self):
+        data = {"a": [1, 2]}
+        media_type = "application/json; indent=4"
+
+        expected = JSONRenderer().render(data, media_type)
+        assert ORJSONRenderer().render(data, media_type) == expected
+        assert b"\n    " in expected
+
+    def test_none_is_empty(self):
+        assert ORJSONRenderer().render(None) == b""
+
+    def test_unknown_type_raises_like_json_renderer(self):
+        with pytest.raises(TypeError):
+            ORJSONRenderer().render({"value": object()})
+
+    @pytest.mark.django_db
+    def test_product_list(self, api_client, product_factory):
+        product_factory.create_batch(3, price=Decimal("10.05"))
+
+        resp = api_client.get(reverse("api:products-list"))
+
+        assert resp.status_code == status.HTTP_200_OK
+        assert isinstance(resp.accepted_renderer, ORJSONRenderer)
+        assert resp.content == JSONRenderer().render(resp.data)
+
+
+class TestORJSONParser:
+    def parse(self, body, **context):
+        return ORJSONParser().parse(io.BytesIO(body), parser_context=context)
+
+    @pytest.mark.parametrize(
+        "body",
+        [
+            b'{"id": 1, "price": "1.50", "items": [1.5, null, true]}',
+            '{"name": "é 😀 \\u2028"}'.encode(),
+            b'{"big": 18446744073709551616, "small": -9223372036854775809}',
+            b'{"a": 1, "a": 2}',
+            b"[]",
+        ],
+    )
+    def test_matches_json_parser(self, body):
+        expected = JSONParser().parse(io.BytesIO(body))
+        assert self.parse(body) == expected
+        assert type(self.parse(body)) is type(expected)
+
+    def test_large_integers_stay_integers(self):
+        assert self.parse(b'{"big": 18446744073709551616}') == {"big": 2**64}
+
+    @pytest.mark.parametrize("body", [b"", b"{", b'{"a": NaN}', b"\xef\xbb\xbf{}"])
+    def test_invalid_body(self, body):
+        with pytest.raises(ParseError):
+            self.parse(body)
+
+    def test_other_encodings(self):
+        body = '{"name": "é"}'.encode("latin-1")
+
+        assert self.parse(body, encoding="latin-1") == {"name": "é"}
+
+    def test_falls_back_without_orjson(self, without_orjson):
+        assert self.parse(b'{"a": [1, 2]}') == {"a": [1, 2]}
+
+    @pytest.mark.django_db
+    def test_json_request(self, api_client_auth, admin_user, brand):
+        resp = api_client_auth(admin_user).patch(
+            reverse("api:brand-detail", args=[brand.id]),
+            {"name": "renamed"},
+            format="json",
+        )
+
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp.json()["name"] == "renamed"
@@ -0,0 +1,111 @@
+import time
+
+import pytest
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.urls.base import reverse
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.brands.models import Brand
+
+pytestmark = pytest.mark.django_db(databases=["default", "replica"])
+
+
+@pytest.fixture(autouse=True)
+def replica(settings):
+    settings.REPLICA_DATABASE = "replica"
+
+
+def brand_names(resp):
+    assert resp.status_code == status.HTTP_200_OK
+    return {b["name"] for b in resp.json()["results"]}
+
+
+class TestReplicaRouting:
+    url = reverse("api:brand-list")
+
+    def test_safe_requests_read_the_replica(self, api_client, brand_factory):
+        brand_factory(name="primary")
+        Brand.objects.using("replica").create(name="replica")
+
+        assert brand_names(api_client.get(self.url)) == {"replica"}
+
+    def test_disabled_without_replica(self, api_client, settings, brand_factory):
+        settings.REPLICA_DATABASE = None
+        brand_factory(name="primary")
+
+        assert brand_names(api_client.get(self.url)) == {"primary"}
+
+    def test_other_views_use_the_primary(self, api_client_auth, user):
+        client = api_client_auth(user)
+
+        with CaptureQueriesContext(connections["replica"]) as ctx:
+            client.get(reverse("api:order:order-list"))
+
+        assert len(ctx.captured_queries) == 0
+
+    def test_writes_go_to_the_primary(self, api_client, admin_user):
+        token = RefreshToken.for_user(admin_user).access_token
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+        resp = api_client.post(self.url, {"name": "new"})
+
+        assert resp.status_code == status.HTTP_201_CREATED
+        assert Brand.objects.using("default").filter(name="new").exists()
+        assert not Brand.objects.using("replica").exists()
+
+    def test_writer_is_pinned_to_the_primary(self, api_client, admin_user):
+        token = RefreshToken.for_user(admin_user).access_token
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        Brand.objects.using("replica").create(name="replica")
+
+        api_client.post(self.url, {"name": "new"})
+
+        # distinct query strings keep the response cache out of the way
+        assert brand_names(api_client.get(self.url, {"page": 1})) == {"new"}
+        api_client.credentials()
+        assert brand_names(api_client.get(self.url, {"search": ""})) == {"replica"}
+
+    def test_pin_expires(self, api_client, admin_user, settings):
+        settings.REPLICA_PIN_SECONDS = 0.01
+        token = RefreshToken.for_user(admin_user).access_token
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        Brand.objects.using("replica").create(name="replica")
+
+        api_client.post(self.url, {"name": "new"})
+        time.sleep(0.05)
+
+        assert brand_names(api_client.get(self.url, {"page": 1})) == {"replica"}
+
+
+class TestReplicaResponseCache:
+    url = reverse("api:brand-list")
+
+    def test_lagging_replica_is_not_cached_after_a_write(
+        self, api_client, brand_factory, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            brand_factory(name="primary")
+
+        first = api_client.get(self.url)
+        second = api_client.get(self.url)
+
+        # the replica has not caught up with the write yet
+        assert brand_names(second) == set()
+        assert first["X-Cache"] == second["X-Cache"] == "MISS"
+
+    def test_replica_is_cached_once_the_pin_window_passed(
+        self, api_client, settings, brand_factory, django_capture_on_commit_callbacks
+    ):
+        settings.REPLICA_PIN_SECONDS = 0.01
+        with django_capture_on_commit_callbacks(execute=True):
+            brand_factory(name="primary")
+        Brand.objects.using("replica").create(name="primary")
+        time.sleep(0.05)
+
+        api_client.get(self.url)
+        resp = api_client.get(self.url)
+
+        assert resp["X-Cache"] == "HIT"
+        assert brand_names(resp) == {"primary"}
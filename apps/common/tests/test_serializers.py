@@ -0,0 +1,129 @@
+import cloudinary
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.urls.base import reverse
+from rest_framework import serializers, status
+
+from apps.brands.models import Brand
+from apps.brands.serializers import BrandSerializer, BrandValuesSerializer
+from apps.common.serializers import ValuesSerializer
+from apps.products.models import Product, ProductCategory, ProductImage
+from apps.products.serializers import (
+    ProductCategorySerializer,
+    ProductCategoryValuesSerializer,
+    ProductImageSerializer,
+    ProductImageValuesSerializer,
+    ProductSerializer,
+    ProductValuesSerializer,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def fast(values_serializer, queryset):
+    return values_serializer(values_serializer.values(queryset)).data
+
+
+def slow(serializer, queryset):
+    return [dict(row) for row in serializer(queryset, many=True).data]
+
+
+class TestValuesSerializer:
+    def test_product(self, product_factory):
+        product_factory.create_batch(3)
+        Product.apply_rating(Product.objects.first().id, 4, 1)
+        queryset = Product.objects.order_by("id")
+
+        assert fast(ProductValuesSerializer, queryset) == slow(
+            ProductSerializer, queryset
+        )
+
+    def test_brand_and_category(self, product_factory):
+        product_factory.create_batch(2, category__description="")
+
+        assert fast(BrandValuesSerializer, Brand.objects.all()) == slow(
+            BrandSerializer, Brand.objects.all()
+        )
+        assert fast(
+            ProductCategoryValuesSerializer, ProductCategory.objects.all()
+        ) == slow(ProductCategorySerializer, ProductCategory.objects.all())
+
+    def test_product_image(self, product, monkeypatch):
+        monkeypatch.setattr(cloudinary.config(), "cloud_name", "demo", raising=False)
+        ProductImage.objects.create(product=product, product_image="sample")
+        ProductImage.objects.create(product=product, product_image="")
+        queryset = ProductImage.objects.all()
+
+        assert fast(ProductImageValuesSerializer, queryset) == slow(
+            ProductImageSerializer, queryset
+        )
+
+    def test_values_are_fetched_once(self, product_factory, django_assert_num_queries):
+        product_factory.create_batch(3)
+        rows = ProductValuesSerializer.values(
+            Product.objects.prefetch_related("brand", "category")
+        )
+
+        # the rows, then the images of every product on the page
+        with django_assert_num_queries(2):
+            ProductValuesSerializer(rows).data
+
+    def test_method_fields_need_a_getter(self):
+        class StarsSerializer(serializers.ModelSerializer):
+            stars = serializers.SerializerMethodField()
+
+            class Meta:
+                model = Product
+                fields = ["id", "stars"]
+
+        class StarsValuesSerializer(ValuesSerializer):
+            serializer_class = StarsSerializer
+
+        with pytest.raises(ImproperlyConfigured):
+            StarsValuesSerializer.get_accessors()
+
+    def test_decimal_and_datetime_fields(self, product):
+        class PriceSerializer(serializers.ModelSerializer):
+            price = serializers.DecimalField(max_digits=10, decimal_places=3)
+
+            class Meta:
+                model = Product
+                fields = ["price", "created_at"]
+
+        class PriceValuesSerializer(ValuesSerializer):
+            serializer_class = PriceSerializer
+
+        queryset = Product.objects.all()
+        assert fast(PriceValuesSerializer, queryset) == slow(PriceSerializer, queryset)
+
+
+class TestValuesListMixin:
+    @pytest.mark.parametrize(
+        "url, params",
+        [
+            (reverse("api:products-list"), {}),
+            (reverse("api:products-list"), {"cursor": "", "page_size": 2}),
+            (reverse("api:brand-list"), {}),
+            (reverse("api:category-list"), {}),
+        ],
+    )
+    def test_schema_is_unchanged(self, api_client, product_factory, url, params):
+        product_factory.create_batch(3)
+
+        resp = api_client.get(url, params)
+
+        assert resp.status_code == status.HTTP_200_OK
+        results = resp.json()["results"]
+        assert results
+        detail = api_client.get(f"{url}{results[0]['id']}/").json()
+        assert results[0] == detail
+
+    def test_keyset_cursor(self, api_client, product_factory):
+        product_factory.create_batch(3)
+        url = reverse("api:products-list")
+
+        first = api_client.get(url, {"cursor": "", "page_size": 2}).json()
+        second = api_client.get(first["next"]).json()
+
+        ids = [p["id"] for p in first["results"] + second["results"]]
+        assert len(set(ids)) == 3
@@ -0,0 +1,55 @@
+import pytest
+from django.db import connection
+from django.urls.base import reverse
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+
+from apps.brands.models import Brand
+from apps.brands.views import BrandView
+
+# real transactions, so the request is the outermost atomic block
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+@pytest.fixture
+def in_atomic_block(monkeypatch):
+    seen = []
+
+    def record(method):
+        def wrapper(self, *args, **kwargs):
+            seen.append(connection.in_atomic_block)
+            return method(self, *args, **kwargs)
+
+        return wrapper
+
+    monkeypatch.setattr(BrandView, "list", record(BrandView.list))
+    monkeypatch.setattr(BrandView, "create", record(BrandView.create))
+    return seen
+
+
+class TestNonAtomicReadsMixin:
+    url = reverse("api:brand-list")
+
+    def test_reads_skip_the_transaction(self, api_client, in_atomic_block):
+        resp = api_client.get(self.url)
+
+        assert resp.status_code == status.HTTP_200_OK
+        assert in_atomic_block == [False]
+
+    def test_writes_are_atomic(self, api_client_auth, admin_user, in_atomic_block):
+        resp = api_client_auth(admin_user).post(self.url, {"name": "new"})
+
+        assert resp.status_code == status.HTTP_201_CREATED
+        assert in_atomic_block == [True]
+
+    def test_failed_writes_roll_back(self, api_client_auth, admin_user, monkeypatch):
+        def perform_create(self, serializer):
+            serializer.save()
+            raise ValidationError("rejected after save")
+
+        monkeypatch.setattr(BrandView, "perform_create", perform_create)
+
+        resp = api_client_auth(admin_user).post(self.url, {"name": "new"})
+
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+        assert not Brand.objects.exists()
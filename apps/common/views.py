@@ -0,0 +1,84 @@
+from django.db import transaction
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from rest_framework.serializers import ModelSerializer
+
+from .queries import QueryPlan
+
+
+class NonAtomicReadsMixin:
+    """
+    Run safe-method requests outside the ATOMIC_REQUESTS transaction.
+
+    The view is excluded from ATOMIC_REQUESTS and unsafe methods are wrapped
+    in `transaction.atomic` here instead, so writes keep their guarantees.
+    Actions listed in `non_atomic_actions` are never wrapped and open their
+    own transactions, e.g. to call a payment gateway between two of them.
+    """
+
+    non_atomic_actions = ()
+
+    @classmethod
+    def as_view(cls, *args, **kwargs):
+        return transaction.non_atomic_requests(super().as_view(*args, **kwargs))
+
+    def is_atomic(self, request):
+        if request.method in SAFE_METHODS:
+            return False
+        action_map = getattr(self, "action_map", {})
+        return action_map.get(request.method.lower()) not in self.non_atomic_actions
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.is_atomic(request):
+            return super().dispatch(request, *args, **kwargs)
+        with transaction.atomic():
+            return super().dispatch(request, *args, **kwargs)
+
+
+class ValuesListMixin:
+    """
+    Serve `list` from `values_serializer_class`, a ValuesSerializer, so list
+    pages are built from `.values()` rows instead of model instances. Every
+    other action keeps `serializer_class`.
+    """
+
+    values_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        serializer_class = self.values_serializer_class
+        if serializer_class is None:
+            return super().list(request, *args, **kwargs)
+
+        # keyset pagination builds its cursors from the ordering columns
+        ordering = getattr(self.paginator, "ordering", ())
+        queryset = serializer_class.values(
+            self.filter_queryset(self.get_queryset()),
+            *[field.lstrip("-") for field in ordering],
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer_class(page).data)
+        return Response(serializer_class(queryset).data)
+
+
+class QueryPlanMixin:
+    """
+    Apply the QueryPlan of the serializer to querysets of safe requests, so
+    list and detail reads join, prefetch and load only what the serializer
+    uses. Writes keep the plain queryset, validation may read any column.
+    """
+
+    def optimize_queryset(self, queryset):
+        serializer_class = self.get_serializer_class()
+        if self.request.method not in SAFE_METHODS or not issubclass(
+            serializer_class, ModelSerializer
+        ):
+            return queryset
+        # keyset pagination reads its ordering columns from the rows
+        ordering = getattr(self.paginator, "ordering", ())
+        return QueryPlan.for_serializer(serializer_class).apply(
+            queryset, *[field.lstrip("-") for field in ordering]
+        )
+
+    def filter_queryset(self, queryset):
+        return self.optimize_queryset(super().filter_queryset(queryset))
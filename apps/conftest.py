@@ -1,8 +1,20 @@
 import pytest
+from django.core.cache import cache
 from pytest_factoryboy import register
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from apps.cart.tests.factories import CartItemFactory, ShoppingCartFactory
 from apps.common.utils import OTPUtils
+from apps.finance.paystack import PaystackUtils
+from apps.finance.stub import PaystackStub
+from apps.inventory.tests.factories import InventoryFactory
+from apps.orders.tests.factories import OrderFactory, OrderItemFactory
+from apps.products.tests.factories import (
+    BrandFactory,
+    ProductCategoryFactory,
+    ProductFactory,
+)
+from apps.reviews.tests.factories import ProductReviewFactory
 from apps.users.models import User
 from apps.users.tests.factories import (
     AddressFactory,
@@ -15,6 +27,15 @@ register(UserFactory)
 register(RoleFactory)
 register(AddressFactory)
 register(ProfileFactory)
+register(BrandFactory)
+register(ProductCategoryFactory)
+register(ProductFactory)
+register(ShoppingCartFactory)
+register(CartItemFactory)
+register(InventoryFactory)
+register(OrderFactory)
+register(OrderItemFactory)
+register(ProductReviewFactory)
 
 
 @pytest.fixture(autouse=True)
@@ -22,6 +43,21 @@ def media_storage(settings, tmpdir):
     settings.MEDIA_ROOT = tmpdir.strpath
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def paystack_stub(settings):
+    """Point PaystackUtils at a local PaystackStub"""
+    with PaystackStub() as stub:
+        settings.PAYSTACK_API_URL = stub.url
+        PaystackUtils.reset()
+        yield stub
+    PaystackUtils.reset()
+
+
 @pytest.fixture()
 def test_email():
     return "test@email.com"
@@ -1,5 +1,6 @@
 from django.contrib import admin
 
-from .models import Transaction
+from .models import PaystackEvent, Transaction
 
 admin.site.register(Transaction)
+admin.site.register(PaystackEvent)
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from apps.finance.stub import PaystackStub
+
+
+class Command(BaseCommand):
+    help = "Serve a local Paystack stub for development and load tests"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8010)
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.0,
+            help="Seconds added to every answer",
+        )
+
+    def handle(self, *args, **options):
+        stub = PaystackStub(options["host"], options["port"], options["latency"])
+        self.stdout.write(f"Paystack stub listening on {stub.url}")
+        self.stdout.write(f"Run the api with PAYSTACK_API_URL={stub.url}")
+        try:
+            stub.server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            stub.server.server_close()
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.2 on 2026-10-18 15:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0004_alter_transaction_options'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='finance_tra_user_id_aba247_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.2 on 2026-10-18 15:15
+
+import apps.common.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0006_time_ordered_ids'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaystackEvent',
+            fields=[
+                ('id', models.UUIDField(default=apps.common.models.generate_id, editable=False, primary_key=True, serialize=False, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='created_at')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='updated at')),
+                ('is_active', models.BooleanField(default=True)),
+                ('event_id', models.CharField(max_length=100, unique=True)),
+                ('event', models.CharField(max_length=50)),
+                ('reference', models.CharField(db_index=True, max_length=100)),
+                ('payload', models.JSONField()),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ('-created_at',),
+            },
+        ),
+    ]
@@ -63,3 +63,20 @@ class Transaction(base_models.BaseModel):
 
     class Meta:
         ordering = ("created_at",)
+        indexes = [models.Index(fields=["user", "created_at", "id"])]
+
+
+class PaystackEvent(base_models.BaseModel):
+    """A webhook event received from paystack, stored once per event id"""
+
+    event_id = models.CharField(max_length=100, unique=True)
+    event = models.CharField(max_length=50)
+    reference = models.CharField(max_length=100, db_index=True)
+    payload = models.JSONField()
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.event} {self.reference}"
+
+    class Meta:
+        ordering = ("-created_at",)
@@ -1,22 +1,217 @@
-from paystackapi.paystack import Paystack
+import hashlib
+import hmac
+import logging
+import random
+import threading
+import time
 
-from config.settings.base import env
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
 
-paystack_secret_key = env("PAYSTACK_SECRET_KEY", default="")
-paystack = Paystack(secret_key=paystack_secret_key)
+logger = logging.getLogger(__name__)
+
+
+class PaystackError(Exception):
+    """Paystack could not be reached or failed to answer in time"""
+
+
+class CircuitOpen(PaystackError):
+    """Calls are short-circuited after repeated gateway failures"""
+
+
+class CircuitBreaker:
+    """
+    Stop calling a failing dependency for `reset_timeout` seconds once
+    `threshold` consecutive calls have failed. After the timeout a single
+    trial call is let through; its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, threshold=5, reset_timeout=30):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        with self.lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self.trial:
+                self.trial = True
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.trial or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self.trial = False
+
+
+class PaystackClient:
+    """
+    Paystack API client sharing one keep-alive connection pool per process.
+
+    Every call is bounded by (connect, read) timeouts. Connection errors,
+    timeouts, 429 and 5xx answers are retried up to `max_retries` times with
+    full jitter backoff, then count as a failure for the circuit breaker.
+    Writes are not repeated after a read timeout.
+    Other answers are returned as decoded JSON, e.g. {"status": False, ...}.
+    """
+
+    retry_statuses = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        secret_key,
+        base_url="https://api.paystack.co",
+        timeout=(3.05, 10),
+        max_retries=2,
+        backoff=0.25,
+        max_backoff=2,
+        pool_size=10,
+        breaker=None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker = breaker or CircuitBreaker()
+
+        self.session = requests.Session()
+        self.session.headers.update({"Authorization": f"Bearer {secret_key}"})
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            settings.PAYSTACK_SECRET_KEY,
+            base_url=settings.PAYSTACK_API_URL,
+            timeout=(settings.PAYSTACK_CONNECT_TIMEOUT, settings.PAYSTACK_READ_TIMEOUT),
+            max_retries=settings.PAYSTACK_MAX_RETRIES,
+            backoff=settings.PAYSTACK_RETRY_BACKOFF,
+            pool_size=settings.PAYSTACK_POOL_SIZE,
+            breaker=CircuitBreaker(
+                settings.PAYSTACK_CIRCUIT_THRESHOLD, settings.PAYSTACK_CIRCUIT_RESET
+            ),
+        )
+
+    def close(self):
+        self.session.close()
+
+    def sleep(self, attempt):
+        time.sleep(
+            random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+        )
+
+    def request(self, method, path, **kwargs):
+        if not self.breaker.allow():
+            raise CircuitOpen("Paystack is unavailable")
+
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.sleep(attempt - 1)
+            try:
+                response = self.session.request(
+                    method, url, timeout=self.timeout, **kwargs
+                )
+            except requests.RequestException as e:
+                error = e
+                # a read timeout may follow a processed write, only repeat reads
+                if method != "GET" and not isinstance(e, requests.ConnectionError):
+                    break
+                continue
+            if response.status_code in self.retry_statuses:
+                error = f"HTTP {response.status_code}"
+                continue
+
+            self.breaker.record_success()
+            try:
+                return response.json()
+            except ValueError:
+                return {"status": False, "message": response.text}
+
+        self.breaker.record_failure()
+        logger.error(f"Paystack {method} {path} failed: {error}")
+        raise PaystackError(str(error))
+
+    def initialize_transaction(self, amount, email, callback_url, reference):
+        return self.request(
+            "POST",
+            "/transaction/initialize",
+            json={
+                "amount": amount,
+                "email": email,
+                "callback_url": callback_url,
+                "reference": reference,
+            },
+        )
+
+    def verify_transaction(self, ref):
+        return self.request("GET", f"/transaction/verify/{ref}")
 
 
 class PaystackUtils:
-    paystack = paystack
+    _client = None
+    _lock = threading.Lock()
 
-    @staticmethod
-    def initialize_transaction(amount, email, callback_url, reference):
-        response = paystack.transaction.initialize(
+    @classmethod
+    def client(cls) -> PaystackClient:
+        if cls._client is None:
+            with cls._lock:
+                if cls._client is None:
+                    cls._client = PaystackClient.from_settings()
+        return cls._client
+
+    @classmethod
+    def reset(cls):
+        """Drop the shared client, e.g. after changing PAYSTACK_* settings"""
+        with cls._lock:
+            if cls._client is not None:
+                cls._client.close()
+            cls._client = None
+
+    @classmethod
+    def initialize_transaction(cls, amount, email, callback_url, reference):
+        return cls.client().initialize_transaction(
             amount=amount, email=email, callback_url=callback_url, reference=reference
         )
-        return response
+
+    @classmethod
+    def verify_transaction(cls, ref):
+        return cls.client().verify_transaction(ref)
 
     @staticmethod
-    def verify_transaction(ref):
-        response = paystack.transaction.verify(ref)
-        return response
+    def sign(payload: bytes) -> str:
+        """HMAC SHA512 of a webhook body, as sent in x-paystack-signature"""
+        key = settings.PAYSTACK_SECRET_KEY.encode()
+        return hmac.new(key, payload, hashlib.sha512).hexdigest()
+
+    @classmethod
+    def verify_signature(cls, payload: bytes, signature: str) -> bool:
+        if not settings.PAYSTACK_SECRET_KEY or not signature:
+            return False
+        return hmac.compare_digest(cls.sign(payload), signature)
@@ -0,0 +1,145 @@
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately, avoid delayed ACK stalls
+    disable_nagle_algorithm = True
+    server: "StubServer"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def handle_request(self):
+        stub = self.server.stub
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+
+        with self.server.lock:
+            stub.requests.append((self.command, self.path))
+            failure = stub.failures.pop(0) if stub.failures else None
+        if stub.latency:
+            time.sleep(stub.latency)
+        if failure:
+            return self.send_json(failure, {"status": False, "message": "Stub error"})
+
+        if self.command == "POST" and self.path == "/transaction/initialize":
+            return self.send_json(*stub.initialize(body))
+        match = re.fullmatch(r"/transaction/verify/(?P<ref>[^/?]+)", self.path)
+        if self.command == "GET" and match:
+            return self.send_json(*stub.verify(match["ref"]))
+        self.send_json(404, {"status": False, "message": "Not found"})
+
+    do_GET = handle_request
+    do_POST = handle_request
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, stub):
+        super().__init__(address, StubHandler)
+        self.stub = stub
+        self.lock = threading.Lock()
+        self.connections = 0
+
+
+class PaystackStub:
+    """
+    Local stand-in for the Paystack transaction API, for tests and load runs.
+
+    Point PAYSTACK_API_URL at `url`. Initialized transactions verify as
+    "success" unless their entry in `transactions` is changed. `fail(*statuses)`
+    queues error answers and `latency` delays every answer. `event()` builds
+    the matching webhook body.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0):
+        self.latency = latency
+        self.transactions = {}
+        self.requests = []
+        self.failures = []
+        self.server = StubServer((host, port), self)
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def connections(self):
+        return self.server.connections
+
+    def fail(self, *statuses):
+        self.failures.extend(statuses)
+
+    def initialize(self, body):
+        reference = body.get("reference")
+        if reference in self.transactions:
+            return 400, {"status": False, "message": "Duplicate Transaction Reference"}
+
+        self.transactions[reference] = {
+            "id": len(self.transactions) + 1,
+            "reference": reference,
+            "amount": body.get("amount"),
+            "status": "success",
+            "channel": "card",
+            "customer": {"email": body.get("email")},
+        }
+        return 200, {
+            "status": True,
+            "message": "Authorization URL created",
+            "data": {
+                "authorization_url": f"{self.url}/checkout/{reference}",
+                "access_code": reference,
+                "reference": reference,
+            },
+        }
+
+    def verify(self, reference):
+        if reference not in self.transactions:
+            return 400, {"status": False, "message": "Transaction reference not found"}
+        return 200, {
+            "status": True,
+            "message": "Verification successful",
+            "data": self.transactions[reference],
+        }
+
+    def event(self, reference, event="charge.success"):
+        """Webhook body paystack would send for an initialized transaction"""
+        return {"event": event, "data": self.transactions[reference]}
+
+    def start(self):
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, args=(0.05,), daemon=True
+        )
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
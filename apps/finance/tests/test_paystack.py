@@ -0,0 +1,136 @@
+import time
+
+import pytest
+
+from apps.finance.paystack import (
+    CircuitBreaker,
+    CircuitOpen,
+    PaystackClient,
+    PaystackError,
+    PaystackUtils,
+)
+from apps.finance.stub import PaystackStub
+
+
+@pytest.fixture
+def stub():
+    with PaystackStub() as stub:
+        yield stub
+
+
+@pytest.fixture
+def client(stub):
+    client = PaystackClient("sk_test", base_url=stub.url, backoff=0, timeout=(1, 0.5))
+    yield client
+    client.close()
+
+
+def initialize(client, reference="ref-1"):
+    return client.initialize_transaction(
+        amount=1000,
+        email="a@a.com",
+        callback_url="http://testserver/verify",
+        reference=reference,
+    )
+
+
+class TestPaystackClient:
+    def test_initialize_and_verify(self, client, stub):
+        resp = initialize(client)
+
+        assert resp["status"] is True
+        assert resp["data"]["reference"] == "ref-1"
+        assert client.verify_transaction("ref-1")["data"]["status"] == "success"
+
+    def test_gateway_errors_are_returned(self, client):
+        initialize(client)
+
+        assert initialize(client)["status"] is False
+        assert client.verify_transaction("unknown")["status"] is False
+
+    def test_connections_are_reused(self, client, stub):
+        for i in range(10):
+            initialize(client, f"ref-{i}")
+
+        assert stub.connections == 1
+
+    def test_server_errors_are_retried(self, client, stub):
+        stub.fail(502, 503)
+
+        assert initialize(client)["status"] is True
+        assert len(stub.requests) == 3
+
+    def test_retries_are_bounded(self, client, stub):
+        stub.fail(500, 500, 500, 500)
+
+        with pytest.raises(PaystackError):
+            initialize(client)
+        assert len(stub.requests) == 3
+
+    def test_read_timeout(self, client, stub):
+        stub.latency = 1
+
+        start = time.monotonic()
+        with pytest.raises(PaystackError):
+            client.verify_transaction("ref-1")
+
+        # reads are retried, each attempt bounded by the read timeout
+        assert len(stub.requests) == 3
+        assert time.monotonic() - start < 2.5
+
+    def test_writes_are_not_repeated_after_timeout(self, client, stub):
+        stub.latency = 1
+
+        with pytest.raises(PaystackError):
+            initialize(client)
+
+        assert len(stub.requests) == 1
+
+    def test_circuit_opens_after_failures(self, stub):
+        breaker = CircuitBreaker(threshold=2, reset_timeout=60)
+        client = PaystackClient(
+            "sk_test", base_url=stub.url, max_retries=0, breaker=breaker
+        )
+        stub.fail(500, 500)
+
+        for _ in range(2):
+            with pytest.raises(PaystackError):
+                initialize(client)
+        with pytest.raises(CircuitOpen):
+            initialize(client)
+
+        assert breaker.state == "open"
+        assert len(stub.requests) == 2
+
+
+class TestCircuitBreaker:
+    def test_half_open_allows_one_trial(self):
+        breaker = CircuitBreaker(threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+
+        assert not breaker.allow()
+        time.sleep(0.06)
+        assert breaker.state == "half-open"
+        assert breaker.allow()
+        assert not breaker.allow()
+
+        breaker.record_success()
+        assert breaker.state == "closed"
+
+    def test_failed_trial_reopens(self):
+        breaker = CircuitBreaker(threshold=3, reset_timeout=0.05)
+        for _ in range(3):
+            breaker.record_failure()
+        time.sleep(0.06)
+
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == "open"
+
+
+class TestPaystackUtils:
+    def test_shared_client_uses_settings(self, paystack_stub):
+        client = PaystackUtils.client()
+
+        assert client.base_url == paystack_stub.url
+        assert PaystackUtils.client() is client
@@ -0,0 +1,110 @@
+import json
+
+import pytest
+from django.urls.base import reverse
+from rest_framework import status
+
+from apps.finance.models import PaystackEvent, Transaction
+from apps.finance.paystack import PaystackUtils
+from apps.orders.models import Order
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def secret_key(settings):
+    settings.PAYSTACK_SECRET_KEY = "sk_test"
+
+
+def charge(order, charge_id=1, amount=None):
+    return {
+        "event": "charge.success",
+        "data": {
+            "id": charge_id,
+            "status": "success",
+            "reference": str(order.id),
+            "amount": int(order.total_cost * 100) if amount is None else amount,
+            "channel": "card",
+        },
+    }
+
+
+class TestPaystackWebhook:
+    url = reverse("api:paystack_webhook")
+
+    def post(self, client, body, signature=None):
+        payload = json.dumps(body).encode()
+        return client.post(
+            self.url,
+            payload,
+            content_type="application/json",
+            HTTP_X_PAYSTACK_SIGNATURE=signature or PaystackUtils.sign(payload),
+        )
+
+    def test_charge_success_completes_order(self, api_client, order_factory):
+        order = order_factory(total_cost=60)
+
+        resp = self.post(api_client, charge(order))
+
+        assert resp.status_code == status.HTTP_200_OK
+        order.refresh_from_db()
+        assert order.status == Order.Order_Status.PAYMENT_COMPLETE
+        assert order.ordered
+        transaction = Transaction.objects.get(order=order)
+        assert transaction.status == Transaction.Transaction_Status.PAID
+        assert PaystackEvent.objects.get().processed_at is not None
+
+    def test_invalid_signature(self, api_client, order_factory):
+        order = order_factory()
+
+        resp = self.post(api_client, charge(order), signature="forged")
+
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+        assert not PaystackEvent.objects.exists()
+        order.refresh_from_db()
+        assert order.status == Order.Order_Status.PENDING
+
+    def test_duplicate_delivery_is_absorbed(
+        self, api_client, order_factory, django_assert_num_queries
+    ):
+        order = order_factory()
+        self.post(api_client, charge(order))
+
+        # the event id lookup, inside the request savepoint
+        with django_assert_num_queries(3):
+            resp = self.post(api_client, charge(order))
+
+        assert resp.status_code == status.HTTP_200_OK
+        assert PaystackEvent.objects.count() == 1
+        assert Transaction.objects.filter(order=order).count() == 1
+
+    def test_amount_mismatch_is_ignored(self, api_client, order_factory):
+        order = order_factory(total_cost=60)
+
+        resp = self.post(api_client, charge(order, amount=100))
+
+        assert resp.status_code == status.HTTP_200_OK
+        order.refresh_from_db()
+        assert order.status == Order.Order_Status.PENDING
+
+    def test_other_events_are_recorded(self, api_client):
+        body = {"event": "transfer.success", "data": {"id": 7, "reference": "x"}}
+
+        resp = self.post(api_client, body)
+
+        assert resp.status_code == status.HTTP_200_OK
+        assert PaystackEvent.objects.get().event == "transfer.success"
+
+    def test_verify_after_webhook_skips_gateway(
+        self, api_client_auth, user, address_factory, cart_item_factory, paystack_stub
+    ):
+        address_factory(user=user)
+        cart_item_factory(cart__user=user)
+        client = api_client_auth(user)
+        order_id = client.post(reverse("api:order:order-checkout")).json()["order_id"]
+
+        self.post(client, paystack_stub.event(order_id))
+        resp = client.get(reverse("api:order:payment_verify"), {"reference": order_id})
+
+        assert resp.status_code == status.HTTP_200_OK
+        assert [method for method, _ in paystack_stub.requests] == ["POST"]
@@ -1,9 +1,12 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 
-from .views import Transactions
+from .views import PaystackWebhook, Transactions
 
 router = DefaultRouter()
 
 router.register("", Transactions, basename="order_transaction")
 
-urlpatterns = router.urls
+urlpatterns = [
+    path("paystack/webhook/", PaystackWebhook.as_view(), name="paystack_webhook"),
+] + router.urls
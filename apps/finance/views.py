@@ -1,13 +1,36 @@
-from rest_framework import mixins
+import json
+import logging
+
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from rest_framework import mixins, status
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.viewsets import GenericViewSet
 
-from .models import Transaction
+from apps.common.pagination import KeysetPagination
+from apps.common.views import NonAtomicReadsMixin, QueryPlanMixin
+from apps.orders.models import Order
+from apps.orders.utils import OrderUtils
+
+from .models import PaystackEvent, Transaction
+from .paystack import PaystackUtils
 from .serializers import TransactionSerializer
 
+logger = logging.getLogger(__name__)
 
-class Transactions(mixins.ListModelMixin, mixins.RetrieveModelMixin, GenericViewSet):
+
+class Transactions(
+    NonAtomicReadsMixin,
+    QueryPlanMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    GenericViewSet,
+):
     queryset = Transaction.objects.all()
     serializer_class = TransactionSerializer
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         user = self.request.user
@@ -16,3 +39,70 @@ class Transactions(mixins.ListModelMixin, mixins.RetrieveModelMixin, GenericView
         if user.is_authenticated:
             return Transaction.objects.filter(user=user)
         return Transaction.objects.none()
+
+
+class PaystackWebhook(APIView):
+    """
+    Receive paystack events.
+
+    The signature is checked against the raw body with the secret key, so no
+    call back to paystack is needed. Each event is stored once, a redelivered
+    event only costs a lookup on the unique event id.
+    """
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        payload = request.body
+        signature = request.headers.get("x-paystack-signature")
+        if not PaystackUtils.verify_signature(payload, signature):
+            return Response(
+                {"detail": "Invalid signature"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            body = json.loads(payload)
+            event, data = body["event"], body["data"]
+            # paystack events carry no id of their own, one per event and charge
+            event_id = f"{event}:{data['id']}"
+        except (ValueError, KeyError, TypeError):
+            return Response(
+                {"detail": "Invalid payload"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        record, created = PaystackEvent.objects.get_or_create(
+            event_id=event_id,
+            defaults={
+                "event": event,
+                "reference": data.get("reference") or "",
+                "payload": body,
+            },
+        )
+        if not created:
+            return Response(status=status.HTTP_200_OK)
+
+        if event == "charge.success":
+            self.charge_success(data)
+
+        record.processed_at = timezone.now()
+        record.save(update_fields=["processed_at", "updated_at"])
+        return Response(status=status.HTTP_200_OK)
+
+    def charge_success(self, data):
+        reference = data.get("reference")
+        try:
+            order = Order.objects.select_related("user", "delivery_address").get(
+                id=reference
+            )
+        except (Order.DoesNotExist, ValidationError):
+            logger.warning(f"Paystack charge for unknown order {reference}")
+            return
+
+        if data.get("amount") != int(order.total_cost * 100):
+            logger.warning(f"Paystack charge amount mismatch for order {reference}")
+            return
+
+        OrderUtils.complete_payment(
+            order, payment_method=OrderUtils.payment_method(data.get("channel"))
+        )
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from apps.inventory.utils import StockUtils
+
+
+class Command(BaseCommand):
+    help = "Cancel expired pending orders and return their reserved stock"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ttl",
+            type=int,
+            default=None,
+            help="Reservation lifetime in seconds. Defaults to STOCK_RESERVATION_TTL",
+        )
+
+    def handle(self, *args, **options):
+        count = StockUtils.release_expired_orders(ttl=options["ttl"])
+        self.stdout.write(self.style.SUCCESS(f"Released {count} expired order(s)"))
@@ -0,0 +1,15 @@
+import factory
+from factory.django import DjangoModelFactory
+
+from apps.inventory.models import Inventory
+from apps.products.tests.factories import ProductFactory
+
+
+class InventoryFactory(DjangoModelFactory):
+    product = factory.SubFactory(ProductFactory)
+    quantity = 10
+    price = factory.LazyAttribute(lambda o: o.product.price)
+    original_price = factory.LazyAttribute(lambda o: o.product.price)
+
+    class Meta:
+        model = Inventory
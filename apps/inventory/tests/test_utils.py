@@ -0,0 +1,110 @@
+import threading
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.utils import timezone
+
+from apps.inventory.models import Inventory
+from apps.inventory.utils import InsufficientStock, StockUtils
+from apps.orders.models import Order, OrderItem
+
+pytestmark = pytest.mark.django_db
+
+
+def reload(inventory):
+    inventory.refresh_from_db()
+    return inventory.quantity
+
+
+class TestStockUtils:
+    def test_reserve(self, inventory_factory):
+        first = inventory_factory(quantity=5)
+        second = inventory_factory(quantity=3)
+
+        StockUtils.reserve({first.product_id: 2, second.product_id: 3})
+
+        assert reload(first) == 3
+        assert reload(second) == 0
+
+    def test_reserve_insufficient_stock_takes_nothing(self, inventory_factory):
+        first = inventory_factory(quantity=5)
+        second = inventory_factory(quantity=1)
+
+        with pytest.raises(InsufficientStock):
+            StockUtils.reserve({first.product_id: 2, second.product_id: 2})
+
+        assert reload(first) == 5
+        assert reload(second) == 1
+
+    def test_release(self, inventory_factory):
+        inventory = inventory_factory(quantity=1)
+
+        StockUtils.release({inventory.product_id: 4})
+
+        assert reload(inventory) == 5
+
+    def test_release_expired_orders(self, user, address_factory, inventory_factory):
+        inventory = inventory_factory(quantity=0)
+        address = address_factory(user=user)
+        expired, fresh = [
+            Order.objects.create(
+                user=user,
+                delivery_cost=10,
+                total_cost=20,
+                delivery_address=address,
+                status=Order.Order_Status.PENDING,
+            )
+            for _ in range(2)
+        ]
+        for order in (expired, fresh):
+            OrderItem.objects.create(
+                order=order, product=inventory.product, price=10, quantity=2
+            )
+        Order.objects.filter(id=expired.id).update(
+            created_at=timezone.now() - timedelta(hours=1)
+        )
+
+        call_command("release_expired_reservations", ttl=60)
+
+        expired.refresh_from_db()
+        fresh.refresh_from_db()
+        assert expired.status == Order.Order_Status.CANCELLED
+        assert fresh.status == Order.Order_Status.PENDING
+        assert reload(inventory) == 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_reservations_do_not_oversell(inventory_factory):
+    inventory = inventory_factory(quantity=5)
+    lines = {inventory.product_id: 1}
+    results = []
+    barrier = threading.Barrier(20)
+
+    def buy():
+        barrier.wait()
+        try:
+            while True:
+                try:
+                    StockUtils.reserve(lines)
+                    results.append(True)
+                    break
+                except OperationalError:
+                    # sqlite reports a locked table instead of waiting
+                    continue
+                except InsufficientStock:
+                    results.append(False)
+                    break
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=buy) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results.count(True) == 5
+    assert results.count(False) == 15
+    assert Inventory.objects.get(id=inventory.id).quantity == 0
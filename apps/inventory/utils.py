@@ -0,0 +1,107 @@
+import operator
+from datetime import timedelta
+from functools import reduce
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Q, Sum, Value, When
+from django.utils import timezone
+
+from .models import Inventory
+
+
+class InsufficientStock(Exception):
+    pass
+
+
+class StockUtils:
+    @classmethod
+    def _quantity_case(cls, lines: dict):
+        return Case(
+            *[When(product_id=pk, then=Value(qty)) for pk, qty in lines.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+
+    @classmethod
+    def reserve(cls, lines: dict):
+        """Take stock for every line in a single conditional UPDATE
+
+        Params:
+            lines: mapping of product id to quantity
+
+        Raises:
+            InsufficientStock: when any product does not have enough units.
+            Nothing is decremented in that case.
+        """
+        if not lines:
+            return
+
+        condition = reduce(
+            operator.or_,
+            [Q(product_id=pk, quantity__gte=qty) for pk, qty in lines.items()],
+        )
+        with transaction.atomic():
+            updated = Inventory.objects.filter(condition).update(
+                quantity=F("quantity") - cls._quantity_case(lines),
+                updated_at=timezone.now(),
+            )
+            if updated != len(lines):
+                # roll back the savepoint so partial decrements are undone
+                raise InsufficientStock
+
+    @classmethod
+    def release(cls, lines: dict):
+        """Return stock for every line in a single UPDATE"""
+        if not lines:
+            return 0
+
+        return Inventory.objects.filter(product_id__in=lines.keys()).update(
+            quantity=F("quantity") + cls._quantity_case(lines),
+            updated_at=timezone.now(),
+        )
+
+    @classmethod
+    def release_expired_orders(cls, ttl: int = None):
+        """Cancel pending orders older than ttl seconds and return their stock
+
+        Returns:
+            count: number of orders cancelled
+        """
+        # avoid a circular import, orders depends on inventory at checkout
+        from apps.orders.models import Order
+
+        ttl = settings.STOCK_RESERVATION_TTL if ttl is None else ttl
+        cutoff = timezone.now() - timedelta(seconds=ttl)
+
+        with transaction.atomic():
+            order_ids = list(
+                Order.objects.select_for_update()
+                .filter(status=Order.Order_Status.PENDING, created_at__lt=cutoff)
+                .values_list("id", flat=True)
+            )
+            return cls.cancel_orders(order_ids)
+
+    @classmethod
+    def cancel_orders(cls, order_ids):
+        """Cancel the given orders and return the stock held by their lines
+
+        Returns:
+            count: number of orders cancelled
+        """
+        from apps.orders.models import Order, OrderItem
+
+        if not order_ids:
+            return 0
+
+        with transaction.atomic():
+            lines = dict(
+                OrderItem.objects.filter(order_id__in=order_ids)
+                .values("product_id")
+                .annotate(total=Sum("quantity"))
+                .values_list("product_id", "total")
+            )
+            cls.release(lines)
+            return Order.objects.filter(id__in=order_ids).update(
+                status=Order.Order_Status.CANCELLED, updated_at=timezone.now()
+            )
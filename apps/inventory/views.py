@@ -1,11 +1,13 @@
 from rest_framework.permissions import IsAdminUser
 from rest_framework.viewsets import ReadOnlyModelViewSet
 
+from apps.common.views import NonAtomicReadsMixin, QueryPlanMixin
+
 from .models import Inventory
 from .serializers import InventorySerializer
 
 
-class InventoryView(ReadOnlyModelViewSet):
+class InventoryView(NonAtomicReadsMixin, QueryPlanMixin, ReadOnlyModelViewSet):
     queryset = Inventory.objects.all()
     serializer_class = InventorySerializer
     permission_classes = [IsAdminUser]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.2 on 2026-10-18 15:05
+
+import apps.common.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('invite', '0002_remove_invitation_referral_code'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='invitation',
+            name='id',
+            field=models.UUIDField(default=apps.common.models.generate_id, editable=False, primary_key=True, serialize=False, unique=True),
+        ),
+    ]
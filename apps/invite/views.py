@@ -3,12 +3,14 @@ from rest_framework.generics import CreateAPIView, ListAPIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from apps.common.views import QueryPlanMixin
+
 from .models import Invitation
 from .serializers import InvitationSerializer
 
 
-class InvitationCreateListView(CreateAPIView, ListAPIView):
-    queryset = Invitation.objects.all().prefetch_related("inviter")
+class InvitationCreateListView(QueryPlanMixin, CreateAPIView, ListAPIView):
+    queryset = Invitation.objects.all()
     serializer_class = InvitationSerializer
     permission_classes = [IsAuthenticated]
 
@@ -32,6 +34,6 @@ class InvitationCreateListView(CreateAPIView, ListAPIView):
         """
         Handle GET requests to list existing Invitations.
         """
-        queryset = self.get_queryset()
+        queryset = self.filter_queryset(self.get_queryset())
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from apps.orders.utils import PaymentReconciler
+
+
+class Command(BaseCommand):
+    help = "Verify pending orders against paystack and apply the results"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500)
+        parser.add_argument(
+            "--workers", type=int, default=8, help="Concurrent paystack calls"
+        )
+        parser.add_argument(
+            "--min-age",
+            type=int,
+            default=600,
+            help="Skip orders placed less than this many seconds ago",
+        )
+
+    def handle(self, *args, **options):
+        reconciler = PaymentReconciler(
+            chunk_size=options["chunk_size"],
+            workers=options["workers"],
+            min_age=options["min_age"],
+        )
+        stats = reconciler.run()
+
+        rate = stats["checked"] / reconciler.duration if reconciler.duration else 0
+        self.stdout.write(
+            f"Checked {stats['checked']} order(s) in {reconciler.duration:.1f}s "
+            f"({rate:.0f} orders/s)"
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{stats['paid']} paid, {stats['failed']} failed, "
+                f"{stats['unpaid']} unpaid, {stats['errors']} errors"
+            )
+        )
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.2 on 2026-10-18 15:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_alter_order_options'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['user', 'order_date', 'id'], name='orders_orde_user_id_039fad_idx'),
+        ),
+    ]
@@ -48,6 +48,7 @@ class Order(base_models.BaseModel):
 
     class Meta:
         ordering = ("created_at",)
+        indexes = [models.Index(fields=["user", "order_date", "id"])]
 
 
 class OrderItem(base_models.BaseModel):
@@ -4,13 +4,18 @@ from .models import Order, OrderItem
 
 
 class OrderItemSerializer(serializers.ModelSerializer):
+    product_name = serializers.CharField(source="product.name", read_only=True)
+
     class Meta:
         model = OrderItem
-        fields = ["id", "product", "price", "quantity", "order"]
+        fields = ["id", "product", "product_name", "price", "quantity", "order"]
 
 
 class OrderSerializer(serializers.ModelSerializer):
-    items = OrderItemSerializer(many=True, read_only=True, source="orderitem_set")
+    items = OrderItemSerializer(many=True, read_only=True, source="orderItem")
+    address_name = serializers.CharField(
+        source="delivery_address.address_name", read_only=True
+    )
 
     class Meta:
         model = Order
@@ -0,0 +1,29 @@
+import factory
+from factory.django import DjangoModelFactory
+
+from apps.orders.models import Order, OrderItem
+from apps.products.tests.factories import ProductFactory
+from apps.users.tests.factories import AddressFactory, UserFactory
+
+
+class OrderFactory(DjangoModelFactory):
+    user = factory.SubFactory(UserFactory)
+    delivery_address = factory.SubFactory(
+        AddressFactory, user=factory.SelfAttribute("..user")
+    )
+    status = Order.Order_Status.PENDING
+    delivery_cost = 10
+    total_cost = 10
+
+    class Meta:
+        model = Order
+
+
+class OrderItemFactory(DjangoModelFactory):
+    order = factory.SubFactory(OrderFactory)
+    product = factory.SubFactory(ProductFactory)
+    quantity = 1
+    price = factory.LazyAttribute(lambda o: o.product.price * o.quantity)
+
+    class Meta:
+        model = OrderItem
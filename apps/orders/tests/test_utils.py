@@ -0,0 +1,105 @@
+import pytest
+from django.core.management import call_command
+
+from apps.cart.models import ShoppingCart
+from apps.common.models import EmailOutbox
+from apps.finance.models import Transaction
+from apps.finance.paystack import PaystackUtils
+from apps.orders.models import Order
+from apps.orders.utils import OrderUtils, PaymentReconciler
+
+pytestmark = pytest.mark.django_db
+
+
+def initialize(order):
+    PaystackUtils.initialize_transaction(
+        amount=int(order.total_cost * 100),
+        email=order.user.email,
+        callback_url="http://testserver/verify",
+        reference=str(order.id),
+    )
+
+
+class TestCompletePayment:
+    def test_pending_order_is_completed(self, order_factory, cart_item_factory):
+        order = order_factory()
+        cart_item_factory(cart__user=order.user)
+
+        assert OrderUtils.complete_payment(order)
+        assert not OrderUtils.complete_payment(order)
+
+        order.refresh_from_db()
+        assert order.status == Order.Order_Status.PAYMENT_COMPLETE
+        assert Transaction.objects.filter(order=order).count() == 1
+        assert not ShoppingCart.objects.exists()
+
+    def test_cancelled_order_is_flagged_for_refund(self, order_factory, caplog):
+        order = order_factory(status=Order.Order_Status.CANCELLED)
+
+        assert not OrderUtils.complete_payment(order)
+
+        order.refresh_from_db()
+        assert order.status == Order.Order_Status.CANCELLED
+        assert not order.ordered
+        transaction = Transaction.objects.get(order=order)
+        assert transaction.status == Transaction.Transaction_Status.PAID
+        assert f"cancelled order {order.id}" in caplog.text
+
+
+class TestPaymentReconciler:
+    def test_pending_orders_are_reconciled(
+        self, paystack_stub, order_factory, order_item_factory, inventory_factory
+    ):
+        paid = order_factory.create_batch(3)
+        failed = order_item_factory(quantity=2).order
+        inventory = inventory_factory(
+            product=failed.orderItem.get().product, quantity=5
+        )
+        abandoned = order_factory()
+        unknown = order_factory()
+        for order in paid + [failed, abandoned]:
+            initialize(order)
+        paystack_stub.transactions[str(failed.id)]["status"] = "failed"
+        paystack_stub.transactions[str(abandoned.id)]["status"] = "abandoned"
+
+        stats = PaymentReconciler(chunk_size=2, workers=4, min_age=0).run()
+
+        assert stats == dict(checked=6, paid=3, failed=1, unpaid=2, errors=0)
+        for order in paid:
+            order.refresh_from_db()
+            assert order.status == Order.Order_Status.PAYMENT_COMPLETE
+        assert Transaction.objects.filter(order__in=paid).count() == 3
+        assert EmailOutbox.objects.count() == 3
+        assert Order.objects.get(id=failed.id).status == Order.Order_Status.CANCELLED
+        inventory.refresh_from_db()
+        assert inventory.quantity == 7
+        for order in (abandoned, unknown):
+            assert Order.objects.get(id=order.id).status == Order.Order_Status.PENDING
+
+    def test_gateway_errors_are_counted(self, paystack_stub, order_factory):
+        order = order_factory()
+        initialize(order)
+        paystack_stub.fail(500, 500, 500)
+
+        stats = PaymentReconciler(workers=1, min_age=0).run()
+
+        assert stats["errors"] == 1
+        order.refresh_from_db()
+        assert order.status == Order.Order_Status.PENDING
+
+    def test_recent_orders_are_skipped(self, paystack_stub, order_factory):
+        initialize(order_factory())
+
+        stats = PaymentReconciler(min_age=600).run()
+
+        assert stats["checked"] == 0
+        assert paystack_stub.requests == [("POST", "/transaction/initialize")]
+
+    def test_command(self, paystack_stub, order_factory, capsys):
+        initialize(order_factory())
+
+        call_command("reconcile_payments", "--min-age", "0")
+
+        out = capsys.readouterr().out
+        assert "Checked 1 order(s)" in out
+        assert "1 paid, 0 failed, 0 unpaid, 0 errors" in out
@@ -0,0 +1,235 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+from django.urls.base import reverse
+from rest_framework import status
+
+from apps.cart.models import CartItem, ShoppingCart
+from apps.finance.models import Transaction
+from apps.finance.paystack import PaystackUtils
+from apps.orders.models import Order, OrderItem
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def paystack_initialize(monkeypatch):
+    def initialize_transaction(amount, email, callback_url, reference):
+        return {
+            "status": True,
+            "data": {"authorization_url": f"https://paystack.test/{reference}"},
+        }
+
+    monkeypatch.setattr(
+        PaystackUtils, "initialize_transaction", staticmethod(initialize_transaction)
+    )
+
+
+class TestCheckout:
+    def checkout(self, client):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = client.post(reverse("api:order:order-checkout"))
+        return resp, len(ctx.captured_queries)
+
+    def test_checkout_empty_cart(self, api_client_auth, user):
+        client = api_client_auth(user)
+
+        resp, _ = self.checkout(client)
+
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_checkout_creates_order_lines(
+        self,
+        api_client_auth,
+        user,
+        address_factory,
+        cart_item_factory,
+        shopping_cart_factory,
+        paystack_initialize,
+    ):
+        address_factory(user=user)
+        cart = shopping_cart_factory(user=user)
+        items = cart_item_factory.create_batch(3, cart=cart, quantity=2)
+        client = api_client_auth(user)
+
+        resp, _ = self.checkout(client)
+        resp_data = resp.json()
+
+        assert resp.status_code == status.HTTP_200_OK
+        order = Order.objects.get(id=resp_data["order_id"])
+        assert order.status == Order.Order_Status.PENDING
+        assert order.total_cost == sum(i.product.price * 2 for i in items) + 10
+        assert OrderItem.objects.filter(order=order).count() == 3
+
+    def test_checkout_query_count_is_constant(
+        self,
+        api_client_auth,
+        user_factory,
+        address_factory,
+        cart_item_factory,
+        shopping_cart_factory,
+        paystack_initialize,
+    ):
+        counts = []
+        for lines in (1, 10, 50):
+            user = user_factory()
+            address_factory(user=user)
+            cart = shopping_cart_factory(user=user)
+            cart_item_factory.create_batch(lines, cart=cart)
+            client = api_client_auth(user)
+
+            resp, num_queries = self.checkout(client)
+
+            assert resp.status_code == status.HTTP_200_OK
+            counts.append(num_queries)
+
+        assert len(set(counts)) == 1
+
+    def test_checkout_reserves_stock(
+        self,
+        api_client_auth,
+        user,
+        address_factory,
+        cart_item_factory,
+        shopping_cart_factory,
+        inventory_factory,
+        paystack_initialize,
+    ):
+        address_factory(user=user)
+        inventory = inventory_factory(quantity=5)
+        cart = shopping_cart_factory(user=user)
+        cart_item_factory(cart=cart, product=inventory.product, quantity=3)
+        client = api_client_auth(user)
+
+        resp, _ = self.checkout(client)
+
+        assert resp.status_code == status.HTTP_200_OK
+        inventory.refresh_from_db()
+        assert inventory.quantity == 2
+
+    def test_checkout_out_of_stock(
+        self,
+        api_client_auth,
+        user,
+        address_factory,
+        cart_item_factory,
+        shopping_cart_factory,
+        inventory_factory,
+        paystack_initialize,
+    ):
+        address_factory(user=user)
+        inventory = inventory_factory(quantity=2)
+        cart = shopping_cart_factory(user=user)
+        cart_item_factory(cart=cart, product=inventory.product, quantity=3)
+        client = api_client_auth(user)
+
+        resp, _ = self.checkout(client)
+
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+        assert not Order.objects.filter(user=user).exists()
+        inventory.refresh_from_db()
+        assert inventory.quantity == 2
+
+
+class TestOrderHistory:
+    @pytest.mark.parametrize("num_orders", [1, 10, 100])
+    def test_list_query_count(
+        self,
+        api_client_auth,
+        user,
+        order_factory,
+        order_item_factory,
+        django_assert_num_queries,
+        num_orders,
+    ):
+        for order in order_factory.create_batch(num_orders, user=user):
+            order_item_factory.create_batch(2, order=order)
+        client = api_client_auth(user)
+
+        # orders with addresses + items with products, outside a transaction
+        with django_assert_num_queries(2):
+            resp = client.get(reverse("api:order:order-list"), {"page_size": 100})
+
+        resp_data = resp.json()
+        assert resp.status_code == status.HTTP_200_OK
+        assert len(resp_data["results"]) == num_orders
+        assert len(resp_data["results"][0]["items"]) == 2
+        assert resp_data["results"][0]["items"][0]["product_name"]
+
+    def test_list_cursor_pagination(self, api_client_auth, user, order_factory):
+        orders = order_factory.create_batch(5, user=user)
+        client = api_client_auth(user)
+
+        resp = client.get(reverse("api:order:order-list"), {"page_size": 3})
+        first_page = resp.json()
+        resp = client.get(first_page["next"])
+        second_page = resp.json()
+
+        ids = [o["id"] for o in first_page["results"] + second_page["results"]]
+        assert ids == [str(o.id) for o in reversed(orders)]
+        assert second_page["next"] is None
+
+
+class TestPaystackCheckout:
+    @pytest.fixture
+    def client(self, api_client_auth, user, address_factory, cart_item_factory):
+        address_factory(user=user)
+        cart_item_factory(cart__user=user, quantity=2)
+        return api_client_auth(user)
+
+    def test_checkout_runs_outside_request_transaction(self):
+        view = resolve(reverse("api:order:order-checkout")).func
+
+        assert "default" in view._non_atomic_requests
+
+    def test_checkout_and_verify(self, client, paystack_stub):
+        resp = client.post(reverse("api:order:order-checkout"))
+        order_id = resp.json()["order_id"]
+
+        assert resp.status_code == status.HTTP_200_OK
+        assert order_id in paystack_stub.transactions
+
+        resp = client.get(reverse("api:order:payment_verify"), {"reference": order_id})
+
+        assert resp.status_code == status.HTTP_200_OK
+        order = Order.objects.get(id=order_id)
+        assert order.status == Order.Order_Status.PAYMENT_COMPLETE
+        assert Transaction.objects.filter(order=order).exists()
+
+    def test_checkout_charges_the_cart_lines(self, client, user, paystack_stub):
+        line = CartItem.objects.get(cart__user=user)
+        ShoppingCart.objects.update(subtotal=1)
+
+        order_id = client.post(reverse("api:order:order-checkout")).json()["order_id"]
+
+        order = Order.objects.get(id=order_id)
+        assert order.total_cost == line.price + order.delivery_cost
+        assert paystack_stub.transactions[order_id]["amount"] == int(
+            order.total_cost * 100
+        )
+        assert ShoppingCart.objects.get().subtotal == line.price
+
+    def test_verify_cancelled_order(self, client, paystack_stub):
+        order_id = client.post(reverse("api:order:order-checkout")).json()["order_id"]
+        Order.objects.filter(id=order_id).update(status=Order.Order_Status.CANCELLED)
+
+        resp = client.get(reverse("api:order:payment_verify"), {"reference": order_id})
+
+        assert resp.status_code == status.HTTP_409_CONFLICT
+        assert Order.objects.get(id=order_id).status == Order.Order_Status.CANCELLED
+        assert CartItem.objects.exists()
+
+    def test_checkout_gateway_down(
+        self, client, user, paystack_stub, inventory_factory
+    ):
+        paystack_stub.fail(503, 503, 503)
+        product = CartItem.objects.get(cart__user=user).product
+        inventory = inventory_factory(product=product, quantity=5)
+
+        resp = client.post(reverse("api:order:order-checkout"))
+
+        assert resp.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert not Order.objects.exists()
+        inventory.refresh_from_db()
+        assert inventory.quantity == 5
@@ -15,7 +15,7 @@ urlpatterns = [
     path("", include(router.urls)),
     path(
         "payment/verify/",
-        OrderViewSet.as_view({"get": "payment/verify"}),
+        OrderViewSet.as_view({"get": "payment_verify"}),
         name="payment_verify",
     ),
 ]
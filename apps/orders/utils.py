@@ -0,0 +1,284 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.cart.models import ShoppingCart
+from apps.common.email import send_email_template
+from apps.common.models import EmailOutbox
+from apps.finance.models import Transaction
+from apps.finance.paystack import CircuitOpen, PaystackError, PaystackUtils
+from apps.inventory.utils import StockUtils
+from apps.orders.models import Order
+from apps.users.models import Profile
+
+logger = logging.getLogger(__name__)
+
+ORDER_CONFIRMATION_TEMPLATE = "d-f28075a5e4074706b817fe32b6260506"
+
+
+class OrderUtils:
+    # statuses an order can only reach after being paid for
+    paid_statuses = (
+        Order.Order_Status.PAYMENT_COMPLETE,
+        Order.Order_Status.IN_DELIVERY,
+        Order.Order_Status.COMPLETE,
+    )
+    # paystack payment channels
+    payment_methods = {
+        "card": Transaction.Payment_Method.CARD,
+        "mobile_money": Transaction.Payment_Method.MOMO,
+    }
+
+    @classmethod
+    def is_paid(cls, order_id):
+        return Order.objects.filter(id=order_id, status__in=cls.paid_statuses).exists()
+
+    @classmethod
+    def payment_method(cls, channel):
+        return cls.payment_methods.get(channel, Transaction.Payment_Method.CARD)
+
+    @classmethod
+    def confirmation_email(cls, order: Order):
+        """Recipient, template id and merge data of the order confirmation"""
+        email = order.user.email
+        return (
+            email,
+            ORDER_CONFIRMATION_TEMPLATE,
+            {
+                email: {
+                    "order_id": str(order.id),
+                    "address": str(order.delivery_address),
+                }
+            },
+        )
+
+    @classmethod
+    def credit_referrer(cls, order: Order):
+        if order.total_cost < 50:
+            return
+
+        user_profile = Profile.objects.filter(user=order.user).first()
+        if user_profile:
+            try:
+                referrer = user_profile.referrer
+                if referrer:
+                    referrer.profile.update_referral(+5)
+                    referrer.save()
+
+            except Profile.DoesNotExist:
+                pass
+
+    @classmethod
+    def flag_refund(cls, order: Order, payment_method):
+        """Record a payment received for a cancelled order, to be refunded"""
+        Transaction.objects.get_or_create(
+            order=order,
+            defaults={
+                "user_id": order.user_id,
+                "amount": order.total_cost,
+                "status": Transaction.Transaction_Status.PAID,
+                "payment_method": payment_method,
+            },
+        )
+        logger.error(f"Payment received for cancelled order {order.id}, refund it")
+
+    @classmethod
+    def complete_payment(
+        cls, order: Order, payment_method=Transaction.Payment_Method.CARD
+    ) -> bool:
+        """
+        Mark a pending order paid, record its transaction, empty the cart and
+        notify the customer. Safe to call more than once per order.
+
+        A payment arriving after `release_expired_reservations` cancelled the
+        order does not revive it, its stock may be sold already. The payment
+        is recorded against the cancelled order to be refunded.
+
+        Returns:
+            False if the order had already been paid for or was cancelled
+        """
+        updated = Order.objects.filter(
+            id=order.id, status=Order.Order_Status.PENDING
+        ).update(
+            status=Order.Order_Status.PAYMENT_COMPLETE,
+            ordered=True,
+            updated_at=timezone.now(),
+        )
+        if not updated:
+            if Order.objects.filter(
+                id=order.id, status=Order.Order_Status.CANCELLED
+            ).exists():
+                cls.flag_refund(order, payment_method)
+            return False
+
+        order.refresh_from_db()
+        Transaction.objects.get_or_create(
+            order=order,
+            defaults={
+                "user": order.user,
+                "amount": order.total_cost,
+                "status": Transaction.Transaction_Status.PAID,
+                "payment_method": payment_method,
+            },
+        )
+
+        ShoppingCart.objects.filter(user=order.user).delete()
+        cls.credit_referrer(order)
+        send_email_template(*cls.confirmation_email(order))
+        return True
+
+
+class PaymentReconciler:
+    """
+    Verify pending orders against paystack and apply the outcome.
+
+    Orders are read in (created_at, id) keyset chunks. Each chunk is verified
+    concurrently by a bounded thread pool, which only talks to paystack; the
+    results are then written with bulk updates from the calling thread.
+
+    Paid orders complete like in `OrderUtils.complete_payment`, without
+    emptying the customer's current cart. Failed or reversed charges cancel
+    the order and return its stock. Anything else is left pending for
+    `release_expired_reservations`.
+    """
+
+    failed_statuses = ("failed", "reversed")
+
+    def __init__(self, chunk_size=500, workers=8, min_age=600):
+        self.chunk_size = chunk_size
+        self.workers = workers
+        # younger orders may still be on the payment page
+        self.min_age = min_age
+        self.stats = dict(checked=0, paid=0, failed=0, unpaid=0, errors=0)
+        self.duration = 0.0
+
+    @staticmethod
+    def verify(reference):
+        try:
+            return PaystackUtils.verify_transaction(reference)
+        except CircuitOpen:
+            raise
+        except PaystackError:
+            return None
+
+    def chunks(self):
+        cutoff = timezone.now() - timedelta(seconds=self.min_age)
+        queryset = (
+            Order.objects.filter(
+                status=Order.Order_Status.PENDING, created_at__lt=cutoff
+            )
+            .select_related("user", "delivery_address")
+            .order_by("created_at", "id")
+        )
+        last = None
+        while True:
+            chunk = queryset
+            if last is not None:
+                chunk = chunk.filter(
+                    Q(created_at__gt=last.created_at)
+                    | Q(created_at=last.created_at, id__gt=last.id)
+                )
+            orders = list(chunk[: self.chunk_size])
+            if not orders:
+                return
+            yield orders
+            last = orders[-1]
+
+    def run(self):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for orders in self.chunks():
+                try:
+                    responses = list(
+                        executor.map(self.verify, [str(o.id) for o in orders])
+                    )
+                except CircuitOpen:
+                    logger.error("Paystack circuit open, reconciliation stopped")
+                    self.stats["errors"] += len(orders)
+                    break
+                self.apply(orders, responses)
+        self.duration = time.perf_counter() - start
+        return self.stats
+
+    def classify(self, order, response):
+        if response is None:
+            return "errors"
+        if not response["status"]:
+            # paystack never saw the reference, the customer did not pay
+            return "unpaid"
+
+        data = response["data"]
+        if data["status"] == "success":
+            if data.get("amount") != int(order.total_cost * 100):
+                logger.warning(f"Paystack charge amount mismatch for order {order.id}")
+                return "errors"
+            return "paid"
+        if data["status"] in self.failed_statuses:
+            return "failed"
+        return "unpaid"
+
+    def apply(self, orders, responses):
+        outcome = {key: [] for key in self.stats}
+        for order, response in zip(orders, responses):
+            outcome[self.classify(order, response)].append((order, response))
+
+        with transaction.atomic():
+            # skip orders completed by the webhook while paystack was queried
+            pending = set(
+                Order.objects.select_for_update()
+                .filter(
+                    id__in=[o.id for o in orders], status=Order.Order_Status.PENDING
+                )
+                .values_list("id", flat=True)
+            )
+            paid = [(o, r) for o, r in outcome["paid"] if o.id in pending]
+            failed = [o.id for o, _ in outcome["failed"] if o.id in pending]
+
+            self.complete(paid)
+            StockUtils.cancel_orders(failed)
+
+        self.stats["checked"] += len(orders)
+        self.stats["paid"] += len(paid)
+        self.stats["failed"] += len(failed)
+        self.stats["unpaid"] += len(outcome["unpaid"])
+        self.stats["errors"] += len(outcome["errors"])
+
+    def complete(self, paid):
+        if not paid:
+            return
+
+        Order.objects.filter(id__in=[o.id for o, _ in paid]).update(
+            status=Order.Order_Status.PAYMENT_COMPLETE,
+            ordered=True,
+            updated_at=timezone.now(),
+        )
+        Transaction.objects.bulk_create(
+            [
+                Transaction(
+                    user_id=order.user_id,
+                    order=order,
+                    amount=order.total_cost,
+                    status=Transaction.Transaction_Status.PAID,
+                    payment_method=OrderUtils.payment_method(
+                        response["data"].get("channel")
+                    ),
+                )
+                for order, response in paid
+            ],
+            ignore_conflicts=True,
+        )
+        EmailOutbox.objects.bulk_create(
+            [
+                EmailOutbox(email=email, template_id=template_id, merge_data=data)
+                for email, template_id, data in (
+                    OrderUtils.confirmation_email(order) for order, _ in paid
+                )
+            ]
+        )
+        for order, _ in paid:
+            OrderUtils.credit_referrer(order)
@@ -1,4 +1,8 @@
+import logging
 import time
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
 from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
@@ -8,20 +12,29 @@ from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
 from apps.cart.models import CartItem, ShoppingCart
-from apps.finance.models import Transaction
-from apps.finance.paystack import PaystackUtils
+from apps.common.pagination import OrderDatePagination
+from apps.common.views import NonAtomicReadsMixin, QueryPlanMixin
+from apps.finance.paystack import PaystackError, PaystackUtils
+from apps.inventory.utils import InsufficientStock, StockUtils
 from apps.orders.models import Order, OrderItem
 from apps.orders.serializers import OrderItemSerializer, OrderSerializer
-from apps.users.models import Address, Profile
-from apps.common.email import send_email_template
+from apps.orders.utils import OrderUtils
+from apps.users.models import Address
+
+logger = logging.getLogger(__name__)
 
 
-class OrderViewSet(ModelViewSet):
+class OrderViewSet(NonAtomicReadsMixin, QueryPlanMixin, ModelViewSet):
     serializer_class = OrderSerializer
+    pagination_class = OrderDatePagination
+    ordering_fields = ["order_date"]
+    ordering = ["-order_date"]
 
     http_method_names = [
         m for m in ModelViewSet.http_method_names if m not in ["put", "patch"]
     ]
+    # actions calling paystack manage their own transactions
+    non_atomic_actions = ("checkout", "payment_verify")
 
     def get_queryset(self):
         user = self.request.user
@@ -30,46 +43,66 @@ class OrderViewSet(ModelViewSet):
         return Order.objects.none()
 
     @action(detail=False, methods=["post"], url_path="checkout")
-    @transaction.atomic
     def checkout(self, request):
-        cart = ShoppingCart.objects.filter(user=request.user).first()
-        if not cart:
-            return Response(
-                {"detail": "Cart is empty"}, status=status.HTTP_400_BAD_REQUEST
+        with transaction.atomic():
+            # Read the cart once; totals and order lines are built from this list
+            cart_items = list(
+                CartItem.objects.filter(cart__user=request.user).select_related(
+                    "cart", "product", "product__inventory"
+                )
             )
+            if not cart_items:
+                return Response(
+                    {"detail": "Cart is empty"}, status=status.HTTP_400_BAD_REQUEST
+                )
 
-        shopping_items = cart.items.count()
-        if shopping_items == 0:
-            return Response(
-                {"detail": "Add items to cart"}, status=status.HTTP_400_BAD_REQUEST
-            )
+            # charged from the same lines the order items are built from
+            total_amount = sum(item.price or 0 for item in cart_items)
+            cart = cart_items[0].cart
+            if cart.subtotal != total_amount:
+                logger.warning(f"Cart {cart.pk} subtotal drifted from its lines")
+                ShoppingCart.recalculate([cart.pk])
+            delivery_cost = 10
+            total_cost = total_amount + delivery_cost
+            user_address = Address.objects.filter(user=request.user).first()
+            if not user_address:
+                return Response(
+                    {"detail": "Please add a delivery address"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
 
-        cart_items = CartItem.objects.filter(cart=cart.id).prefetch_related("product")
+            # Only products tracked in inventory hold stock
+            stock = defaultdict(int)
+            for cart_item in cart_items:
+                if hasattr(cart_item.product, "inventory"):
+                    stock[cart_item.product_id] += cart_item.quantity
 
-        total_amount = sum(item.product.price * item.quantity for item in cart_items)
-        delivery_cost = 10
-        total_cost = total_amount + delivery_cost
-        user_address = Address.objects.filter(user=request.user).first()
-        if not user_address:
-            return Response(
-                {"detail": "Please add a delivery address"},
-                status=status.HTTP_400_BAD_REQUEST,
+            try:
+                StockUtils.reserve(stock)
+            except InsufficientStock:
+                return Response(
+                    {"detail": "Some items in your cart are out of stock"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            order = Order.objects.create(
+                user=request.user,
+                delivery_cost=delivery_cost,
+                total_cost=total_cost,
+                delivery_address=user_address,
+                status="PE",
             )
 
-        order = Order.objects.create(
-            user=request.user,
-            delivery_cost=delivery_cost,
-            total_cost=total_cost,
-            delivery_address=user_address,
-            status="PE",
-        )
-
-        for cart_item in cart_items:
-            OrderItem.objects.create(
-                order=order,
-                product=cart_item.product,
-                quantity=cart_item.quantity,
-                price=cart_item.price,
+            OrderItem.objects.bulk_create(
+                [
+                    OrderItem(
+                        order=order,
+                        product=cart_item.product,
+                        quantity=cart_item.quantity,
+                        price=cart_item.price,
+                    )
+                    for cart_item in cart_items
+                ]
             )
 
         serializer = self.get_serializer(order)  # noqa
@@ -77,14 +110,19 @@ class OrderViewSet(ModelViewSet):
         kobo_amount = int(total_cost * 100)
         callback_url = request.build_absolute_uri(reverse("api:order:payment_verify"))
 
-        payment_response = PaystackUtils.initialize_transaction(
-            amount=kobo_amount,
-            email=request.user.email,
-            callback_url=callback_url,
-            reference=str(order.id),
-        )
+        # The order is committed before paystack is called so no transaction
+        # or row lock is held while waiting on the gateway
+        try:
+            payment_response = PaystackUtils.initialize_transaction(
+                amount=kobo_amount,
+                email=request.user.email,
+                callback_url=callback_url,
+                reference=str(order.id),
+            )
+        except PaystackError:
+            payment_response = None
 
-        if payment_response["status"]:
+        if payment_response and payment_response["status"]:
             return Response(
                 {
                     "order_id": order.id,
@@ -92,7 +130,14 @@ class OrderViewSet(ModelViewSet):
                 }
             )
         else:
-            order.delete()
+            with transaction.atomic():
+                order.delete()
+                StockUtils.release(stock)
+            if payment_response is None:
+                return Response(
+                    {"detail": "Payment service unavailable, try again later"},
+                    status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                )
             return Response({"details": "Failed to initialize payment"})
 
     @action(
@@ -109,43 +154,37 @@ class OrderViewSet(ModelViewSet):
                 {"detail": " No reference provided"}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        response = PaystackUtils.verify_transaction(reference)
+        # the paystack webhook usually confirms the payment before the
+        # customer is redirected here, no need to ask paystack again
+        try:
+            if OrderUtils.is_paid(reference):
+                return Response(
+                    {"detail": "Payment successful"}, status=status.HTTP_200_OK
+                )
+        except ValidationError:
+            return Response(
+                {"detail": "Invalid reference"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            response = PaystackUtils.verify_transaction(reference)
+        except PaystackError:
+            return Response(
+                {"detail": "Payment service unavailable, try again later"},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
 
         if response["status"]:
             if response["data"]["status"] == "success":
                 order = get_object_or_404(Order, id=reference)
-                order.status = "PC"
-                order.ordered = True
-                order.save()
-
-                Transaction.objects.create(
-                    user=request.user,
-                    order=order,
-                    amount=order.total_cost,
-                    status="PA",
-                    payment_method="CD",
-                )
-
-                ShoppingCart.objects.filter(user=request.user).delete()
-
-                if order.total_cost >= 50:
-                    user_profile = Profile.objects.get(user=request.user)
-                    if user_profile:
-                        try:
-                            referrer = user_profile.referrer
-                            if referrer:
-                                referrer.profile.update_referral(+5)
-                                referrer.save()
-
-                        except Profile.DoesNotExist:
-                            pass
-
-                email = order.user.email
-                send_email_template(email, "d-f28075a5e4074706b817fe32b6260506", {email: {
-                    "order_id": order.id,
-                    "address": order.delivery_address,
-                }})
-
+                with transaction.atomic():
+                    completed = OrderUtils.complete_payment(order)
+
+                if not completed and not OrderUtils.is_paid(reference):
+                    return Response(
+                        {"detail": "Order was cancelled, payment will be refunded"},
+                        status=status.HTTP_409_CONFLICT,
+                    )
                 return Response(
                     {"detail": "Payment successful"}, status=status.HTTP_200_OK
                 )
@@ -162,7 +201,7 @@ class OrderViewSet(ModelViewSet):
             )
 
 
-class OrderItemViewset(ModelViewSet):
+class OrderItemViewset(NonAtomicReadsMixin, QueryPlanMixin, ModelViewSet):
     queryset = OrderItem.objects.all()
     serializer_class = OrderItemSerializer
 
@@ -174,8 +213,8 @@ class OrderItemViewset(ModelViewSet):
 
     def list(self, request, *args, **kwargs):
         order_id = self.request.query_params.get("order_id")
-        queryset = self.get_queryset()
+        queryset = self.filter_queryset(self.get_queryset())
         if order_id:
-            queryset = self.queryset.filter(order_id=order_id)
+            queryset = queryset.filter(order_id=order_id)
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.products.search import ProductSearch
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text product search index"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            ProductSearch.rebuild()
+        self.stdout.write(self.style.SUCCESS("Product search index rebuilt"))
@@ -0,0 +1,61 @@
+from django.db import migrations
+
+SEARCH_TABLE = "products_product_search"
+
+
+def create_search_table(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(
+            f"CREATE TABLE {SEARCH_TABLE} ("
+            "product_id uuid PRIMARY KEY "
+            "REFERENCES products_product (id) ON DELETE CASCADE "
+            "DEFERRABLE INITIALLY DEFERRED, "
+            "document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX {SEARCH_TABLE}_document_idx "
+            f"ON {SEARCH_TABLE} USING gin (document)"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {SEARCH_TABLE} (product_id, document) "
+            "SELECT p.id, "
+            "setweight(to_tsvector('english', p.name), 'A') "
+            "|| setweight(to_tsvector('english', coalesce(b.name, '')), 'B') "
+            "|| setweight(to_tsvector('english', coalesce(c.name, '')), 'B') "
+            "|| setweight(to_tsvector('english', p.description), 'C') "
+            "|| setweight(to_tsvector('english', p.specification), 'D') "
+            "FROM products_product p "
+            "JOIN brands_brand b ON b.id = p.brand_id "
+            "JOIN products_productcategory c ON c.id = p.category_id"
+        )
+    elif vendor == "sqlite":
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5("
+            "product_id UNINDEXED, name, brand, category, description, specification, "
+            "tokenize = 'porter unicode61')"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {SEARCH_TABLE} "
+            "SELECT p.id, p.name, b.name, c.name, p.description, p.specification "
+            "FROM products_product p "
+            "JOIN brands_brand b ON b.id = p.brand_id "
+            "JOIN products_productcategory c ON c.id = p.category_id"
+        )
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor in ("postgresql", "sqlite"):
+        schema_editor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('brands', '0002_alter_brand_options'),
+        ('products', '0009_alter_productimage_product_image'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
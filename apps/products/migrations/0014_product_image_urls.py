@@ -0,0 +1,57 @@
+# Generated by Django 4.2.2 on 2026-10-18 15:44
+
+import cloudinary
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# PRODUCT_IMAGE_VARIANTS when the urls were introduced
+VARIANTS = {
+    'thumbnail': {'width': 150, 'height': 150, 'crop': 'fill'},
+    'small': {'width': 480, 'crop': 'limit'},
+    'medium': {'width': 960, 'crop': 'limit'},
+    'large': {'width': 1600, 'crop': 'limit'},
+}
+
+
+def backfill_image_urls(apps, schema_editor):
+    # without a cloud the urls can't be built, they are stored on the next save
+    if not cloudinary.config().cloud_name:
+        return
+
+    ProductImage = apps.get_model('products', 'ProductImage')
+    field = ProductImage._meta.get_field('product_image')
+    images = list(ProductImage.objects.exclude(product_image=''))
+    for image in images:
+        resource = field.to_python(image.product_image)
+        image.img_url = resource.url
+        image.img_variants = {
+            name: resource.build_url(**options) for name, options in VARIANTS.items()
+        }
+    ProductImage.objects.bulk_update(images, ['img_url', 'img_variants'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0013_product_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productimage',
+            name='img_url',
+            field=models.URLField(blank=True, editable=False, max_length=500, null=True),
+        ),
+        migrations.AddField(
+            model_name='productimage',
+            name='img_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='productimage',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='images', to='products.product'),
+        ),
+        migrations.RunPython(backfill_image_urls, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,13 @@
 from cloudinary.models import CloudinaryField
+from django.conf import settings
 from django.db import models
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.dispatch import receiver
 
 from apps.brands.models import Brand
 from apps.common import models as base_models
+from apps.common.cache import ResponseCache
 from apps.users.models import User
 
 
@@ -25,6 +30,15 @@ class Product(base_models.BaseModel):
     price = models.DecimalField(max_digits=10, decimal_places=2)
     brand = models.ForeignKey(Brand, on_delete=models.CASCADE)
     category = models.ForeignKey(ProductCategory, on_delete=models.CASCADE)
+    # review aggregates, maintained by apps.reviews signals
+    review_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_average = models.FloatField(default=0, db_index=True)
+    rating_1_count = models.PositiveIntegerField(default=0)
+    rating_2_count = models.PositiveIntegerField(default=0)
+    rating_3_count = models.PositiveIntegerField(default=0)
+    rating_4_count = models.PositiveIntegerField(default=0)
+    rating_5_count = models.PositiveIntegerField(default=0)
 
     class Meta:
         ordering = (
@@ -32,19 +46,93 @@ class Product(base_models.BaseModel):
             "updated_at",
             "created_at",
         )
+        indexes = [models.Index(fields=["created_at", "id"])]
+
+    # written by apply_rating only, see save
+    rating_fields = (
+        "review_count",
+        "rating_sum",
+        "rating_average",
+        *(f"rating_{star}_count" for star in range(1, 6)),
+    )
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # saving an existing product leaves the review aggregates alone, they
+        # may have moved since it was read
+        if not (self._state.adding or kwargs.get("force_insert")) and (
+            kwargs.get("update_fields") is None
+        ):
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.rating_fields
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remember the stored price so saves can reprice cart lines
+        instance._stored_price = instance.__dict__.get("price")
+        return instance
+
+    @property
+    def rating_histogram(self):
+        return {str(star): getattr(self, f"rating_{star}_count") for star in range(1, 6)}
+
+    @classmethod
+    def apply_rating(cls, product_id, rating, step):
+        """
+        Add (step=1) or remove (step=-1) one rating from a product's aggregates
+        in a single UPDATE
+        """
+        count = F("review_count") + step
+        total = F("rating_sum") + rating * step
+        star = f"rating_{rating}_count"
+        return cls.objects.filter(pk=product_id).update(
+            review_count=count,
+            rating_sum=total,
+            rating_average=Coalesce(
+                Cast(total, FloatField()) / NullIf(count, 0), Value(0.0)
+            ),
+            **{star: F(star) + step},
+        )
+
 
 class ProductImage(base_models.BaseModel):
-    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="images"
+    )
     # product_image = models.ImageField(upload_to="Product_Img")
     product_image = CloudinaryField("image")
+    # urls built once the image is saved, see store_image_urls
+    img_url = models.URLField(max_length=500, null=True, blank=True, editable=False)
+    img_variants = models.JSONField(default=dict, blank=True, editable=False)
 
     class Meta:
         ordering = ("created_at",)
 
+    def build_urls(self):
+        """
+        (url, variants) of the image, variants holds a url per entry of
+        PRODUCT_IMAGE_VARIANTS
+        """
+        field = self._meta.get_field("product_image")
+        image = field.to_python(self.product_image)
+        if not image:
+            return None, {}
+        variants = {
+            name: image.build_url(**options)
+            for name, options in settings.PRODUCT_IMAGE_VARIANTS.items()
+        }
+        return image.url, variants
+
 
 class Favorite(base_models.BaseModel):
     product = models.ForeignKey(
@@ -57,3 +145,59 @@ class Favorite(base_models.BaseModel):
 
     def __str__(self):
         return f"{self.user.username} added {self.product} to favorites"
+
+
+# SIGNALS
+# ---------------------------------------------------
+@receiver(models.signals.post_save, sender=ProductCategory)
+@receiver(models.signals.post_delete, sender=ProductCategory)
+@receiver(models.signals.post_save, sender=Product)
+@receiver(models.signals.post_delete, sender=Product)
+@receiver(models.signals.post_save, sender=ProductImage)
+@receiver(models.signals.post_delete, sender=ProductImage)
+def invalidate_catalog_cache(sender, **kwargs):
+    ResponseCache.invalidate("catalog")
+
+
+@receiver(models.signals.post_save, sender=ProductImage)
+def store_image_urls(sender, instance, raw=False, **kwargs):
+    # the image is only uploaded by the field's pre_save, so its urls can only
+    # be built once the row is written
+    if raw:
+        return
+    url, variants = instance.build_urls()
+    if (url, variants) != (instance.img_url, instance.img_variants):
+        instance.img_url, instance.img_variants = url, variants
+        ProductImage.objects.filter(pk=instance.pk).update(
+            img_url=url, img_variants=variants
+        )
+
+
+@receiver(models.signals.post_save, sender=Product)
+def index_product(sender, instance, **kwargs):
+    from .search import ProductSearch
+
+    ProductSearch.index([instance.pk])
+
+
+@receiver(models.signals.post_delete, sender=Product)
+def unindex_product(sender, instance, **kwargs):
+    from .search import ProductSearch
+
+    ProductSearch.remove([instance.pk])
+
+
+@receiver(models.signals.post_save, sender=Brand)
+def reindex_brand_products(sender, instance, created, **kwargs):
+    from .search import ProductSearch
+
+    if not created:
+        ProductSearch.index(instance.product_set.values_list("id", flat=True))
+
+
+@receiver(models.signals.post_save, sender=ProductCategory)
+def reindex_category_products(sender, instance, created, **kwargs):
+    from .search import ProductSearch
+
+    if not created:
+        ProductSearch.index(instance.product_set.values_list("id", flat=True))
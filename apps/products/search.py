@@ -0,0 +1,151 @@
+import re
+
+from django.db import connection
+
+from .models import Product
+
+SEARCH_TABLE = "products_product_search"
+
+# Postgres: one weighted tsvector per product, GIN indexed
+PG_DOCUMENT = """
+    setweight(to_tsvector('english', p.name), 'A')
+    || setweight(to_tsvector('english', coalesce(b.name, '')), 'B')
+    || setweight(to_tsvector('english', coalesce(c.name, '')), 'B')
+    || setweight(to_tsvector('english', p.description), 'C')
+    || setweight(to_tsvector('english', p.specification), 'D')
+"""
+PG_SOURCE = """
+    FROM products_product p
+    JOIN brands_brand b ON b.id = p.brand_id
+    JOIN products_productcategory c ON c.id = p.category_id
+"""
+
+# SQLite: FTS5 table, bm25 weights follow the column order
+# (product_id, name, brand, category, description, specification)
+SQLITE_WEIGHTS = "0.0, 10.0, 5.0, 5.0, 2.0, 1.0"
+SQLITE_SOURCE = """
+    SELECT p.id, p.name, b.name, c.name, p.description, p.specification
+    FROM products_product p
+    JOIN brands_brand b ON b.id = p.brand_id
+    JOIN products_productcategory c ON c.id = p.category_id
+"""
+
+
+class ProductSearch:
+    """
+    Full-text product index.
+
+    Uses a tsvector table on Postgres and an FTS5 table on SQLite. Other
+    databases fall back to a LIKE scan over the product name.
+    """
+
+    chunk_size = 1000
+
+    @classmethod
+    def is_supported(cls):
+        return connection.vendor in ("postgresql", "sqlite")
+
+    @classmethod
+    def _db_ids(cls, ids):
+        field = Product._meta.pk
+        return [field.get_db_prep_value(pk, connection) for pk in ids]
+
+    @classmethod
+    def _to_python(cls, ids):
+        return [Product._meta.pk.to_python(pk) for pk in ids]
+
+    @classmethod
+    def index(cls, ids):
+        """Add or refresh the index entries of the given products"""
+        if not cls.is_supported():
+            return
+
+        ids = list(ids)
+        for start in range(0, len(ids), cls.chunk_size):
+            end = start + cls.chunk_size
+            chunk = cls._db_ids(ids[start:end])
+            placeholders = ", ".join(["%s"] * len(chunk))
+            with connection.cursor() as cursor:
+                if connection.vendor == "postgresql":
+                    cursor.execute(
+                        f"INSERT INTO {SEARCH_TABLE} (product_id, document) "
+                        f"SELECT p.id, {PG_DOCUMENT} {PG_SOURCE} "
+                        f"WHERE p.id IN ({placeholders}) "
+                        "ON CONFLICT (product_id) DO UPDATE "
+                        "SET document = EXCLUDED.document",
+                        chunk,
+                    )
+                else:
+                    cursor.execute(
+                        f"DELETE FROM {SEARCH_TABLE} "
+                        f"WHERE product_id IN ({placeholders})",
+                        chunk,
+                    )
+                    cursor.execute(
+                        f"INSERT INTO {SEARCH_TABLE} "
+                        f"{SQLITE_SOURCE} WHERE p.id IN ({placeholders})",
+                        chunk,
+                    )
+
+    @classmethod
+    def remove(cls, ids):
+        if not cls.is_supported():
+            return
+
+        chunk = cls._db_ids(ids)
+        placeholders = ", ".join(["%s"] * len(chunk))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {SEARCH_TABLE} WHERE product_id IN ({placeholders})",
+                chunk,
+            )
+
+    @classmethod
+    def rebuild(cls):
+        """Reindex the whole catalog in one pass"""
+        if not cls.is_supported():
+            return
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+            if connection.vendor == "postgresql":
+                cursor.execute(
+                    f"INSERT INTO {SEARCH_TABLE} (product_id, document) "
+                    f"SELECT p.id, {PG_DOCUMENT} {PG_SOURCE}"
+                )
+            else:
+                cursor.execute(f"INSERT INTO {SEARCH_TABLE} {SQLITE_SOURCE}")
+
+    @classmethod
+    def search(cls, query: str, limit: int = 100):
+        """Return product ids matching query, best match first"""
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return []
+
+        if not cls.is_supported():
+            return list(
+                Product.objects.filter(name__icontains=" ".join(terms)).values_list(
+                    "id", flat=True
+                )[:limit]
+            )
+
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute(
+                    f"SELECT product_id FROM {SEARCH_TABLE}, "
+                    "plainto_tsquery('english', %s) query "
+                    "WHERE document @@ query "
+                    "ORDER BY ts_rank_cd(document, query) DESC LIMIT %s",
+                    [" ".join(terms), limit],
+                )
+            else:
+                # quote every term so user input is never parsed as FTS syntax
+                match = " ".join(f'"{term}"' for term in terms)
+                cursor.execute(
+                    f"SELECT product_id FROM {SEARCH_TABLE} "
+                    f"WHERE {SEARCH_TABLE} MATCH %s "
+                    f"ORDER BY bm25({SEARCH_TABLE}, {SQLITE_WEIGHTS}) LIMIT %s",
+                    [match, limit],
+                )
+            return cls._to_python(row[0] for row in cursor.fetchall())
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 
 from ..brands.models import Brand
+from ..common.serializers import ValuesSerializer
 from ..users.models import User
 from .models import Favorite, Product, ProductCategory, ProductImage
 
@@ -11,6 +12,12 @@ class ProductCategorySerializer(serializers.ModelSerializer):
         fields = ["id", "name", "description"]
 
 
+class GalleryImageSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ProductImage
+        fields = ["id", "img_url", "img_variants"]
+
+
 class ProductSerializer(serializers.ModelSerializer):
     brand = serializers.PrimaryKeyRelatedField(queryset=Brand.objects.all())
     category = serializers.PrimaryKeyRelatedField(
@@ -18,6 +25,10 @@ class ProductSerializer(serializers.ModelSerializer):
     )
     brand_name = serializers.CharField(source="brand.name", read_only=True)
     category_name = serializers.CharField(source="category.name", read_only=True)
+    rating_histogram = serializers.DictField(
+        child=serializers.IntegerField(), read_only=True
+    )
+    images = GalleryImageSerializer(many=True, read_only=True)
 
     class Meta:
         model = Product
@@ -31,22 +42,73 @@ class ProductSerializer(serializers.ModelSerializer):
             "brand_name",
             "category",
             "category_name",
+            "review_count",
+            "rating_average",
+            "rating_histogram",
+            "images",
         ]
+        read_only_fields = ["review_count", "rating_average"]
+
+
+class ProductCategoryValuesSerializer(ValuesSerializer):
+    serializer_class = ProductCategorySerializer
+
+
+class GalleryImageValuesSerializer(ValuesSerializer):
+    serializer_class = GalleryImageSerializer
+
+    @classmethod
+    def by_product(cls, product_ids):
+        """{product id: [image, ...]} for `product_ids`, in one query"""
+        serializer = cls(())
+        queryset = ProductImage.objects.filter(product_id__in=product_ids)
+        images = {}
+        for row in cls.values(queryset, "product"):
+            images.setdefault(row["product"], []).append(
+                serializer.to_representation(row)
+            )
+        return images
+
+
+class ProductValuesSerializer(ValuesSerializer):
+    serializer_class = ProductSerializer
+    histogram = [(str(star), f"rating_{star}_count") for star in range(1, 6)]
+    extra_values = [column for _, column in histogram]
+
+    @property
+    def data(self):
+        # the galleries of the whole page are loaded together
+        self.rows = list(self.rows)
+        self.images = GalleryImageValuesSerializer.by_product(
+            [row["id"] for row in self.rows]
+        )
+        return super().data
+
+    def get_rating_histogram(self, row):
+        return {star: row[column] for star, column in self.histogram}
+
+    def get_images(self, row):
+        return self.images.get(row["id"], [])
 
 
 class ProductImageSerializer(serializers.ModelSerializer):
     product = serializers.PrimaryKeyRelatedField(queryset=Product.objects.all())
     product_name = serializers.CharField(source="product.name", read_only=True)
-    img_url = serializers.SerializerMethodField()
 
     class Meta:
         model = ProductImage
-        fields = ["id", "product", "product_name", "product_image", "img_url"]
+        fields = [
+            "id",
+            "product",
+            "product_name",
+            "product_image",
+            "img_url",
+            "img_variants",
+        ]
+
 
-    def get_img_url(self, obj):
-        if obj.product_image:
-            return obj.product_image.url
-        return None
+class ProductImageValuesSerializer(ValuesSerializer):
+    serializer_class = ProductImageSerializer
 
 
 class FavoriteSerializer(serializers.ModelSerializer):
@@ -61,7 +123,9 @@ class FavoriteSerializer(serializers.ModelSerializer):
         request = self.context.get("request")
         user = request.user
 
-        if Favorite.objects.filter(user=user, product=validated_data["product"]).exists():
+        if Favorite.objects.filter(
+            user=user, product=validated_data["product"]
+        ).exists():
             raise serializers.ValidationError("Product already added to favorites")
 
         favorite = Favorite.objects.create(user=user, product=validated_data["product"])
@@ -0,0 +1,33 @@
+import factory
+from factory import Faker
+from factory.django import DjangoModelFactory
+
+from apps.brands.models import Brand
+from apps.products.models import Product, ProductCategory
+
+
+class BrandFactory(DjangoModelFactory):
+    name = factory.Sequence(lambda n: f"brand-{n}")
+
+    class Meta:
+        model = Brand
+        django_get_or_create = ("name",)
+
+
+class ProductCategoryFactory(DjangoModelFactory):
+    name = Faker("word")
+
+    class Meta:
+        model = ProductCategory
+
+
+class ProductFactory(DjangoModelFactory):
+    name = Faker("word")
+    description = Faker("sentence")
+    specification = Faker("sentence")
+    price = Faker("pydecimal", left_digits=3, right_digits=2, positive=True)
+    brand = factory.SubFactory(BrandFactory)
+    category = factory.SubFactory(ProductCategoryFactory)
+
+    class Meta:
+        model = Product
@@ -0,0 +1,230 @@
+import cloudinary
+import pytest
+from django.core.management import call_command
+from django.urls.base import reverse
+from rest_framework import status
+
+from apps.common.cache import ResponseCache
+from apps.products.models import ProductImage
+
+pytestmark = pytest.mark.django_db
+
+
+class TestCatalogCache:
+    def test_list_is_cached(self, api_client, product_factory):
+        product_factory.create_batch(2)
+        url = reverse("api:products-list")
+
+        first = api_client.get(url)
+        second = api_client.get(url)
+
+        assert first.status_code == status.HTTP_200_OK
+        assert first["X-Cache"] == "MISS"
+        assert second["X-Cache"] == "HIT"
+        assert second.json() == first.json()
+        assert ResponseCache.stats("catalog") == {"hits": 1, "misses": 1}
+
+    def test_query_params_are_part_of_key(self, api_client, product_factory):
+        product_factory.create_batch(3)
+        url = reverse("api:products-list")
+
+        api_client.get(url, {"page": 1})
+        resp = api_client.get(url, {"page": 1, "search": "x"})
+
+        assert resp["X-Cache"] == "MISS"
+
+        resp = api_client.get(url + "?search=x&page=1")
+
+        assert resp["X-Cache"] == "HIT"
+
+    def test_product_save_invalidates(
+        self, api_client, product_factory, django_capture_on_commit_callbacks
+    ):
+        product = product_factory()
+        url = reverse("api:products-detail", args=(product.id,))
+        api_client.get(url)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            product.name = "renamed"
+            product.save()
+        resp = api_client.get(url)
+
+        assert resp["X-Cache"] == "MISS"
+        assert resp.json()["name"] == "renamed"
+
+    def test_brand_delete_invalidates_products(
+        self,
+        api_client,
+        product_factory,
+        brand_factory,
+        django_capture_on_commit_callbacks,
+    ):
+        product_factory()
+        url = reverse("api:products-list")
+        api_client.get(url)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            brand_factory().delete()
+        resp = api_client.get(url)
+
+        assert resp["X-Cache"] == "MISS"
+
+    def test_invalidation_waits_for_commit(
+        self, api_client, product, django_capture_on_commit_callbacks
+    ):
+        url = reverse("api:products-detail", args=(product.id,))
+        version = ResponseCache.get_version("catalog")
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            product.name = "renamed"
+            product.save()
+            # a read before the commit is cached under the old version
+            assert ResponseCache.get_version("catalog") == version
+            assert api_client.get(url)["X-Cache"] == "MISS"
+
+        for callback in callbacks:
+            callback()
+
+        assert ResponseCache.get_version("catalog") != version
+        assert api_client.get(url)["X-Cache"] == "MISS"
+
+    def test_writes_are_not_cached(self, api_client_auth, admin_user, brand_factory):
+        client = api_client_auth(admin_user)
+
+        resp = client.post(reverse("api:brand-list"), {"name": "new brand"})
+
+        assert resp.status_code == status.HTTP_201_CREATED
+        assert "X-Cache" not in resp
+
+    def test_cache_stats_command(self, api_client, capsys):
+        api_client.get(reverse("api:category-list"))
+
+        call_command("cache_stats")
+
+        assert "0 hits, 1 misses" in capsys.readouterr().out
+
+
+class TestProductSearch:
+    url = reverse("api:products-search")
+
+    def test_search_ranks_name_matches_first(self, api_client, product_factory):
+        in_description = product_factory(name="case", description="laptop sleeve")
+        in_name = product_factory(name="laptop", description="light")
+        product_factory(name="mouse", description="wireless")
+
+        resp = api_client.get(self.url, {"q": "laptop"})
+        resp_data = resp.json()
+
+        assert resp.status_code == status.HTTP_200_OK
+        assert [p["id"] for p in resp_data["results"]] == [
+            str(in_name.id),
+            str(in_description.id),
+        ]
+
+    def test_search_matches_brand_and_category(
+        self, api_client, product_factory, brand_factory
+    ):
+        product = product_factory(brand=brand_factory(name="Acme"))
+
+        resp = api_client.get(self.url, {"q": "acme"})
+
+        assert [p["id"] for p in resp.json()["results"]] == [str(product.id)]
+
+    def test_index_follows_updates(self, api_client, product_factory):
+        product = product_factory(name="phone")
+
+        product.name = "tablet"
+        product.save()
+        product.brand.name = "Globex"
+        product.brand.save()
+
+        assert api_client.get(self.url, {"q": "phone"}).json()["results"] == []
+        assert len(api_client.get(self.url, {"q": "tablet"}).json()["results"]) == 1
+        assert len(api_client.get(self.url, {"q": "globex"}).json()["results"]) == 1
+
+    def test_deleted_products_are_removed(self, api_client, product_factory):
+        product = product_factory(name="phone")
+
+        product.delete()
+
+        assert api_client.get(self.url, {"q": "phone"}).json()["results"] == []
+
+    def test_search_syntax_is_escaped(self, api_client, product_factory):
+        product_factory(name="phone")
+
+        resp = api_client.get(self.url, {"q": 'phone" OR NEAR(*'})
+
+        assert resp.status_code == status.HTTP_200_OK
+
+    def test_search_requires_query(self, api_client):
+        resp = api_client.get(self.url)
+
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_rebuild_command(self, api_client, product_factory):
+        product_factory(name="phone")
+
+        call_command("rebuild_product_search")
+
+        assert len(api_client.get(self.url, {"q": "phone"}).json()["results"]) == 1
+
+
+class TestProductImages:
+    @pytest.fixture(autouse=True)
+    def cloud_name(self, monkeypatch):
+        monkeypatch.setattr(cloudinary.config(), "cloud_name", "demo", raising=False)
+
+    def test_urls_are_stored_on_save(self, product, settings):
+        image = ProductImage.objects.create(product=product, product_image="sample")
+        image.refresh_from_db()
+
+        assert image.img_url.endswith("/image/upload/sample")
+        assert set(image.img_variants) == set(settings.PRODUCT_IMAGE_VARIANTS)
+        assert "c_fill,h_150,w_150" in image.img_variants["thumbnail"]
+
+        image.product_image = "other"
+        image.save()
+        image.refresh_from_db()
+
+        assert image.img_url.endswith("/image/upload/other")
+
+    def test_missing_image_has_no_urls(self, product):
+        image = ProductImage.objects.create(product=product, product_image="")
+        image.refresh_from_db()
+
+        assert image.img_url is None
+        assert image.img_variants == {}
+
+    def test_product_embeds_images(self, api_client, product_factory):
+        first, second = product_factory.create_batch(2)
+        images = [
+            ProductImage.objects.create(product=first, product_image=name)
+            for name in ["front", "back"]
+        ]
+
+        products = {
+            p["id"]: p
+            for p in api_client.get(reverse("api:products-list")).json()["results"]
+        }
+        detail = api_client.get(reverse("api:products-detail", args=(first.id,))).json()
+
+        assert [i["id"] for i in detail["images"]] == [str(i.id) for i in images]
+        assert detail["images"][0]["img_url"] == images[0].img_url
+        assert products[str(first.id)]["images"] == detail["images"]
+        assert products[str(second.id)]["images"] == []
+
+    @pytest.mark.parametrize("per_product", [1, 4])
+    def test_images_are_prefetched(
+        self, api_client, product_factory, per_product, django_assert_num_queries
+    ):
+        for product in product_factory.create_batch(3):
+            for i in range(per_product):
+                ProductImage.objects.create(product=product, product_image=f"img{i}")
+        product = product_factory()
+
+        # count, rows and the images of the page
+        with django_assert_num_queries(3):
+            api_client.get(reverse("api:products-list"))
+        # product and its images
+        with django_assert_num_queries(2):
+            api_client.get(reverse("api:products-detail", args=(product.id,)))
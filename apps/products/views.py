@@ -1,19 +1,40 @@
+from django.conf import settings
+from rest_framework import status
+from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
+from apps.common.cache import CachedResponseMixin
+from apps.common.pagination import KeysetPagination
+from apps.common.views import NonAtomicReadsMixin, QueryPlanMixin, ValuesListMixin
+
 from .models import Favorite, Product, ProductCategory, ProductImage
+from .search import ProductSearch
 from .serializers import (
     FavoriteSerializer,
     ProductCategorySerializer,
+    ProductCategoryValuesSerializer,
     ProductImageSerializer,
+    ProductImageValuesSerializer,
     ProductSerializer,
+    ProductValuesSerializer,
 )
 
 
-class ProductCategoryView(ModelViewSet):
+class ProductCategoryView(
+    NonAtomicReadsMixin,
+    CachedResponseMixin,
+    QueryPlanMixin,
+    ValuesListMixin,
+    ModelViewSet,
+):
     queryset = ProductCategory.objects.all()
     serializer_class = ProductCategorySerializer
+    values_serializer_class = ProductCategoryValuesSerializer
     permission_classes = [AllowAny]
+    cache_namespace = "catalog"
+    use_replica = True
 
     http_method_names = [m for m in ModelViewSet.http_method_names if m not in ["put"]]
 
@@ -23,10 +44,20 @@ class ProductCategoryView(ModelViewSet):
         return super().get_permissions()
 
 
-class ProductView(ModelViewSet):
-    queryset = Product.objects.all().prefetch_related("brand", "category")
+class ProductView(
+    NonAtomicReadsMixin,
+    CachedResponseMixin,
+    QueryPlanMixin,
+    ValuesListMixin,
+    ModelViewSet,
+):
+    queryset = Product.objects.all()
     serializer_class = ProductSerializer
+    values_serializer_class = ProductValuesSerializer
     permission_classes = [AllowAny]
+    pagination_class = KeysetPagination
+    cache_namespace = "catalog"
+    use_replica = True
 
     http_method_names = [m for m in ModelViewSet.http_method_names if m not in ["put"]]
 
@@ -35,11 +66,39 @@ class ProductView(ModelViewSet):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-
-class ProductImageView(ModelViewSet):
-    queryset = ProductImage.objects.all().prefetch_related("product")
+    @action(detail=False, methods=["get"], url_path="search")
+    def search(self, request):
+        """
+        Ranked full-text search over name, description, specification,
+        brand and category. Pass the search terms in `q`.
+        """
+        return self.cached_response(self._search, request)
+
+    def _search(self, request):
+        query = request.query_params.get("q", "")
+        if not query.strip():
+            return Response(
+                {"detail": "No search query provided"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        ids = ProductSearch.search(query, limit=settings.PRODUCT_SEARCH_LIMIT)
+        products = self.optimize_queryset(self.get_queryset()).in_bulk(ids)
+        results = [products[pk] for pk in ids if pk in products]
+
+        page = self.paginate_queryset(results)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class ProductImageView(
+    NonAtomicReadsMixin, QueryPlanMixin, ValuesListMixin, ModelViewSet
+):
+    queryset = ProductImage.objects.all()
     serializer_class = ProductImageSerializer
+    values_serializer_class = ProductImageValuesSerializer
     permission_classes = [AllowAny]
+    use_replica = True
 
     http_method_names = [m for m in ModelViewSet.http_method_names if m not in ["put"]]
 
@@ -49,7 +108,7 @@ class ProductImageView(ModelViewSet):
         return super().get_permissions()
 
 
-class FavoriteView(ModelViewSet):
+class FavoriteView(NonAtomicReadsMixin, QueryPlanMixin, ModelViewSet):
     queryset = Favorite.objects.all()
     serializer_class = FavoriteSerializer
     permission_classes = [IsAuthenticated]
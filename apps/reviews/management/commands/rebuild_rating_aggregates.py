@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import (
+    Count,
+    FloatField,
+    IntegerField,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Cast, Coalesce
+
+from apps.common.cache import ResponseCache
+from apps.products.models import Product
+from apps.reviews.models import ProductReview
+
+
+def aggregate(expression, output_field=IntegerField()):
+    reviews = (
+        ProductReview.objects.filter(product=OuterRef("pk"))
+        .order_by()
+        .values("product")
+        .annotate(value=expression)
+        .values("value")
+    )
+    return Coalesce(
+        Subquery(reviews, output_field=output_field),
+        Value(0),
+        output_field=output_field,
+    )
+
+
+class Command(BaseCommand):
+    help = "Recompute review count, rating sum and histogram of every product"
+
+    def handle(self, *args, **options):
+        stars = {
+            f"rating_{star}_count": aggregate(Count("id", filter=Q(rating=star)))
+            for star in range(1, 6)
+        }
+        with transaction.atomic():
+            updated = Product.objects.update(
+                review_count=aggregate(Count("id")),
+                rating_sum=aggregate(Sum("rating")),
+                rating_average=aggregate(
+                    Cast(Sum("rating"), FloatField()) / Count("id"), FloatField()
+                ),
+                **stars,
+            )
+        ResponseCache.invalidate("catalog")
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt ratings of {updated} products"))
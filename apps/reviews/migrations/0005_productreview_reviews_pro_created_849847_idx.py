@@ -0,0 +1,17 @@
+# Generated by Django 4.2.2 on 2026-10-18 15:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_alter_productreview_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='productreview',
+            index=models.Index(fields=['created_at', 'id'], name='reviews_pro_created_849847_idx'),
+        ),
+    ]
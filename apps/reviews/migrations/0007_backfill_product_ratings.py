@@ -0,0 +1,56 @@
+from django.db import migrations
+from django.db.models import (
+    Count,
+    FloatField,
+    IntegerField,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Cast, Coalesce
+
+
+def backfill_ratings(apps, schema_editor):
+    Product = apps.get_model("products", "Product")
+    ProductReview = apps.get_model("reviews", "ProductReview")
+
+    def aggregate(expression, output_field=IntegerField()):
+        reviews = (
+            ProductReview.objects.filter(product=OuterRef("pk"))
+            .order_by()
+            .values("product")
+            .annotate(value=expression)
+            .values("value")
+        )
+        return Coalesce(
+            Subquery(reviews, output_field=output_field),
+            Value(0),
+            output_field=output_field,
+        )
+
+    stars = {
+        f"rating_{star}_count": aggregate(Count("id", filter=Q(rating=star)))
+        for star in range(1, 6)
+    }
+    Product.objects.update(
+        review_count=aggregate(Count("id")),
+        rating_sum=aggregate(Sum("rating")),
+        rating_average=aggregate(
+            Cast(Sum("rating"), FloatField()) / Count("id"), FloatField()
+        ),
+        **stars,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0013_product_rating_aggregates'),
+        ('reviews', '0006_time_ordered_ids'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_ratings, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,9 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.dispatch import receiver
 
 from apps.common import models as base_models
+from apps.common.cache import ResponseCache
 
 from ..products.models import Product
 from ..users.models import User
@@ -17,12 +19,20 @@ class ProductReview(base_models.BaseModel):
 
     class Meta:
         ordering = ("created_at",)
+        indexes = [models.Index(fields=["created_at", "id"])]
 
     def __str__(self):
         return (
             f"{self.user.username} gave {self.product.name} a ratings of {self.rating}"
         )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remember the stored rating so updates can move the product aggregates
+        instance._stored_rating = (instance.product_id, instance.rating)
+        return instance
+
 
 class AppReview(base_models.BaseModel):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -37,3 +47,30 @@ class AppReview(base_models.BaseModel):
 
     def __str__(self):
         return f"{self.user.username} gave a ratings of {self.rating}"
+
+
+# SIGNALS
+# ---------------------------------------------------
+@receiver(models.signals.post_save, sender=ProductReview)
+def add_product_rating(sender, instance, created, **kwargs):
+    stored = getattr(instance, "_stored_rating", None)
+    current = (instance.product_id, instance.rating)
+    if stored == current:
+        return
+
+    if stored and not created:
+        Product.apply_rating(*stored, step=-1)
+    Product.apply_rating(*current, step=1)
+    instance._stored_rating = current
+    ResponseCache.invalidate("catalog")
+
+
+@receiver(models.signals.post_delete, sender=ProductReview)
+def remove_product_rating(sender, instance, origin=None, **kwargs):
+    deleted = origin.model if isinstance(origin, models.QuerySet) else type(origin)
+    # reviews cascading from anything but their user go with their product
+    if origin is not None and deleted not in (ProductReview, User):
+        return
+    stored = getattr(instance, "_stored_rating", None)
+    Product.apply_rating(*(stored or (instance.product_id, instance.rating)), step=-1)
+    ResponseCache.invalidate("catalog")
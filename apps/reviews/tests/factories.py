@@ -0,0 +1,15 @@
+import factory
+from factory.django import DjangoModelFactory
+
+from apps.products.tests.factories import ProductFactory
+from apps.reviews.models import ProductReview
+from apps.users.tests.factories import UserFactory
+
+
+class ProductReviewFactory(DjangoModelFactory):
+    product = factory.SubFactory(ProductFactory)
+    user = factory.SubFactory(UserFactory)
+    rating = 5
+
+    class Meta:
+        model = ProductReview
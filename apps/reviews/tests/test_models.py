@@ -0,0 +1,114 @@
+import pytest
+from django.core.management import call_command
+from django.urls.base import reverse
+
+from apps.products.models import Product
+from apps.reviews.models import ProductReview
+
+pytestmark = pytest.mark.django_db
+
+
+def aggregates(product):
+    product = Product.objects.get(pk=product.pk)
+    return product.review_count, product.rating_sum, product.rating_histogram
+
+
+class TestRatingAggregates:
+    def test_create(self, product, product_review_factory):
+        product_review_factory(product=product, rating=5)
+        product_review_factory(product=product, rating=2)
+
+        count, total, histogram = aggregates(product)
+
+        assert (count, total) == (2, 7)
+        assert histogram == {"1": 0, "2": 1, "3": 0, "4": 0, "5": 1}
+        assert Product.objects.get(pk=product.pk).rating_average == 3.5
+
+    def test_update_moves_rating(self, product, product_review_factory):
+        product_review_factory(product=product, rating=5)
+        review = ProductReview.objects.get()
+
+        review.rating = 1
+        review.save()
+        review.save()
+
+        count, total, histogram = aggregates(product)
+        assert (count, total) == (1, 1)
+        assert histogram["1"] == 1
+        assert histogram["5"] == 0
+
+    def test_delete(self, product, product_review_factory):
+        review = product_review_factory(product=product, rating=4)
+        product_review_factory(product=product, rating=2)
+
+        review.delete()
+
+        count, total, histogram = aggregates(product)
+        assert (count, total) == (1, 2)
+        assert histogram["4"] == 0
+        assert Product.objects.get(pk=product.pk).rating_average == 2
+
+    def test_delete_last_review(self, product, product_review_factory):
+        product_review_factory(product=product, rating=4).delete()
+
+        assert aggregates(product)[:2] == (0, 0)
+        assert Product.objects.get(pk=product.pk).rating_average == 0
+
+    def test_product_save_keeps_concurrent_ratings(
+        self, product, product_review_factory
+    ):
+        stale = Product.objects.get(pk=product.pk)
+        product_review_factory(product=product, rating=5)
+
+        stale.name = "renamed"
+        stale.save()
+
+        assert aggregates(product)[:2] == (1, 5)
+        assert Product.objects.get(pk=product.pk).name == "renamed"
+
+    def test_product_delete_skips_aggregates(
+        self,
+        product,
+        user_factory,
+        product_review_factory,
+        django_assert_max_num_queries,
+    ):
+        for i in range(20):
+            user = user_factory(username=f"reviewer{i}", email=f"r{i}@example.com")
+            product_review_factory(product=product, user=user, rating=3)
+
+        # no aggregate update per deleted review
+        with django_assert_max_num_queries(10):
+            product.delete()
+
+        assert not ProductReview.objects.exists()
+
+    def test_rebuild_command(self, product_factory, product_review_factory):
+        product, unrated = product_factory.create_batch(2)
+        product_review_factory(product=product, rating=3)
+        product_review_factory(product=product, rating=4)
+        Product.objects.update(review_count=0, rating_sum=0, rating_3_count=0)
+
+        call_command("rebuild_rating_aggregates")
+
+        count, total, histogram = aggregates(product)
+        assert (count, total) == (2, 7)
+        assert histogram["3"] == histogram["4"] == 1
+        assert Product.objects.get(pk=product.pk).rating_average == 3.5
+        assert aggregates(unrated)[:2] == (0, 0)
+
+    def test_product_list_exposes_and_orders_by_rating(
+        self, api_client, product_factory, product_review_factory
+    ):
+        low, high = product_factory.create_batch(2)
+        product_review_factory(product=low, rating=1)
+        product_review_factory(product=high, rating=5)
+
+        resp = api_client.get(
+            reverse("api:products-list"), {"ordering": "-rating_average"}
+        )
+        results = resp.json()["results"]
+
+        assert [p["id"] for p in results] == [str(high.id), str(low.id)]
+        assert results[0]["review_count"] == 1
+        assert results[0]["rating_histogram"]["5"] == 1
@@ -2,14 +2,19 @@ from rest_framework.exceptions import PermissionDenied
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.viewsets import ModelViewSet
 
+from apps.common.pagination import KeysetPagination
+from apps.common.views import NonAtomicReadsMixin, QueryPlanMixin
+
 from .models import AppReview, ProductReview
 from .serializers import AppReviewSerializer, ProductReviewSerializer
 
 
-class ProductReviewView(ModelViewSet):
-    queryset = ProductReview.objects.all().prefetch_related("user", "product")
+class ProductReviewView(NonAtomicReadsMixin, QueryPlanMixin, ModelViewSet):
+    queryset = ProductReview.objects.all()
     serializer_class = ProductReviewSerializer
     permission_classes = [AllowAny]
+    pagination_class = KeysetPagination
+    use_replica = True
 
     http_method_names = [
         m for m in ModelViewSet.http_method_names if m not in ["put", "patch"]
@@ -36,10 +41,11 @@ class ProductReviewView(ModelViewSet):
         return super().get_permissions()
 
 
-class AppReviewView(ModelViewSet):
-    queryset = AppReview.objects.all().prefetch_related("user")
+class AppReviewView(NonAtomicReadsMixin, QueryPlanMixin, ModelViewSet):
+    queryset = AppReview.objects.all()
     serializer_class = AppReviewSerializer
     permission_classes = [AllowAny]
+    use_replica = True
 
     http_method_names = [
         m for m in ModelViewSet.http_method_names if m not in ["put", "patch"]
@@ -0,0 +1,74 @@
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication loading the user from a short-lived cache entry instead
+    of the database on every request.
+
+    Only the `cached_fields` read by authentication, permissions and most
+    views are cached, the password hash and `otp_secret` stay out of the
+    shared cache. Other fields of the returned `User` are deferred and load
+    from the database when first read. Entries expire after
+    AUTH_USER_CACHE_TIMEOUT seconds and are dropped once a save or delete of
+    the user commits.
+    """
+
+    cached_fields = (
+        "id",
+        "email",
+        "username",
+        "member_type",
+        "is_active",
+        "is_staff",
+        "is_superuser",
+        "is_verified",
+        "deleted",
+    )
+
+    @staticmethod
+    def cache_key(user_id):
+        return f"auth:user:{user_id}"
+
+    @classmethod
+    def invalidate(cls, user_id):
+        # a request between the write and its commit would cache the old row
+        transaction.on_commit(partial(cache.delete, cls.cache_key(user_id)))
+
+    @classmethod
+    def to_cache(cls, user):
+        return {name: getattr(user, name) for name in cls.cached_fields}
+
+    @classmethod
+    def from_cache(cls, data):
+        model = get_user_model()
+        # from_db takes the loaded columns in the model's field order
+        names = [f.attname for f in model._meta.concrete_fields if f.attname in data]
+        return model.from_db(DEFAULT_DB_ALIAS, names, [data[name] for name in names])
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        key = self.cache_key(user_id)
+        data = cache.get(key)
+        if data is None:
+            user = super().get_user(validated_token)
+            cache.set(key, self.to_cache(user), settings.AUTH_USER_CACHE_TIMEOUT)
+            return user
+
+        user = self.from_cache(data)
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
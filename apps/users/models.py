@@ -164,3 +164,15 @@ def create_profile(sender, instance, created, **kwargs):
     if created:
         role, _ = Role.objects.get_or_create(name=const.USER_ROLE)
         Profile.objects.create(user=instance, role=role)
+
+
+@receiver(models.signals.post_save, sender=User)
+@receiver(models.signals.post_delete, sender=User)
+def invalidate_auth_cache(sender, instance, update_fields=None, **kwargs):
+    # a stale last_login does not matter to authentication, skip logins
+    if update_fields and set(update_fields) == {"last_login"}:
+        return
+
+    from apps.users.authentication import CachedJWTAuthentication
+
+    CachedJWTAuthentication.invalidate(instance.pk)
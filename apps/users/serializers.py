@@ -293,6 +293,8 @@ class ProfileSerializer(serializers.ModelSerializer):
             "phone_number",
             "profile_image",
         )
+        # read by the method fields
+        select_related = ("user", "role", "address")
 
     def get_email(self, profile) -> str:
         return profile.user.email if profile.user else ""
@@ -0,0 +1,89 @@
+import pytest
+from django.contrib.auth.models import update_last_login
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls.base import reverse
+from rest_framework import status
+
+from apps.users.authentication import CachedJWTAuthentication
+
+pytestmark = pytest.mark.django_db
+
+
+class TestCachedJWTAuthentication:
+    url = reverse("api:order:order-list")
+
+    @pytest.fixture
+    def client(self, api_client, token):
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {token['access']}")
+        return api_client
+
+    def user_queries(self, client):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = client.get(self.url)
+        assert resp.status_code == status.HTTP_200_OK
+        return [q for q in ctx.captured_queries if 'FROM "users_user"' in q["sql"]]
+
+    def test_user_is_loaded_once(self, client):
+        assert len(self.user_queries(client)) == 1
+        assert self.user_queries(client) == []
+
+    def test_save_invalidates(self, client, user, django_capture_on_commit_callbacks):
+        client.get(self.url)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            user.is_active = False
+            user.save()
+        resp = client.get(self.url)
+
+        assert resp.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_delete_invalidates(self, client, user, django_capture_on_commit_callbacks):
+        client.get(self.url)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            user.delete()
+        resp = client.get(self.url)
+
+        assert resp.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_invalidation_waits_for_commit(
+        self, client, user, django_capture_on_commit_callbacks
+    ):
+        client.get(self.url)
+        key = CachedJWTAuthentication.cache_key(user.id)
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            user.is_staff = True
+            user.save()
+            assert cache.get(key) is not None
+
+        for callback in callbacks:
+            callback()
+        assert cache.get(key) is None
+
+    def test_secrets_are_not_cached(self, client, user, test_password):
+        user.otp_secret = "secret"
+        user.save()
+        client.get(self.url)
+
+        data = cache.get(CachedJWTAuthentication.cache_key(user.id))
+
+        assert set(data) == set(CachedJWTAuthentication.cached_fields)
+        cached = CachedJWTAuthentication.from_cache(data)
+        assert (cached.pk, cached.email, cached.is_staff) == (
+            user.pk,
+            user.email,
+            user.is_staff,
+        )
+        # read from the database on demand
+        assert cached.otp_secret == "secret"
+        assert cached.check_password(test_password)
+
+    def test_login_keeps_cache(self, client, user):
+        client.get(self.url)
+
+        update_last_login(None, user)
+
+        assert cache.get(CachedJWTAuthentication.cache_key(user.id)) is not None
@@ -1,5 +1,6 @@
 import pytest
 from django.core import mail
+from django.core.management import call_command
 from django.urls.base import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
@@ -119,6 +120,7 @@ class TestAuthView:
 
         resp = api_client.post(url, data={"email": user.email})
         resp_data = resp.json()
+        call_command("send_queued_emails")
 
         assert resp.status_code == status.HTTP_200_OK
         assert "token" in resp_data
@@ -1,12 +1,13 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
-from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from rest_framework_simplejwt.views import TokenRefreshView
 
 from .views import (
     AddressView,
     ChangePasswordView,
     EmailVerification,
     ForgotPasswordView,
+    LoginView,
     OTPVerifyView,
     ProfileView,
     ResetPasswordView,
@@ -28,7 +29,7 @@ urlpatterns = [
     path("auth/signup/", SignUpView.as_view(), name="signup"),
     path("auth/verify-otp/", OTPVerifyView.as_view(), name="verify-otp"),
     path("auth/verify-email/", EmailVerification.as_view(), name="email-verify"),
-    path("auth/login/", TokenObtainPairView.as_view(), name="token-obtain"),
+    path("auth/login/", LoginView.as_view(), name="token-obtain"),
     path("auth/refresh-token/", TokenRefreshView.as_view(), name="token-refresh"),
     path("auth/forget-password/", ForgotPasswordView.as_view(), name="forget-password"),
     path("auth/reset-password/", ResetPasswordView.as_view(), name="reset-password"),
@@ -5,15 +5,20 @@ from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.generics import CreateAPIView
 from rest_framework.mixins import ListModelMixin, RetrieveModelMixin, UpdateModelMixin
-from rest_framework.parsers import FormParser, MultiPartParser, JSONParser
+from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.viewsets import GenericViewSet, ModelViewSet
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.views import TokenObtainPairView
 import logging
 
+from apps.cart.guest import GuestCart
 from apps.common.email import send_email, send_email_template
+from apps.common.parsers import ORJSONParser
 from apps.common.utils import OTPUtils
+from apps.common.views import QueryPlanMixin
 
 from .models import Address, Profile, Role
 from .serializers import (
@@ -45,7 +50,13 @@ forget_password_schema = openapi.Schema(
 )
 
 
-class UserView(RetrieveModelMixin, UpdateModelMixin, ListModelMixin, GenericViewSet):
+class UserView(
+    QueryPlanMixin,
+    RetrieveModelMixin,
+    UpdateModelMixin,
+    ListModelMixin,
+    GenericViewSet,
+):
     """
     User viewset
     """
@@ -87,6 +98,21 @@ class SignUpView(CreateAPIView):
         return Response(response_serializer.data, status=status.HTTP_201_CREATED)
 
 
+class LoginView(TokenObtainPairView):
+    """TokenObtainPairView moving the guest cart of the request into the user's cart"""
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        try:
+            serializer.is_valid(raise_exception=True)
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+
+        response = Response(serializer.validated_data, status=status.HTTP_200_OK)
+        GuestCart.merge(request, response, serializer.user)
+        return response
+
+
 class ForgotPasswordView(CreateAPIView):
     serializer_class = ForgotPasswordSerializer
     permission_classes = [AllowAny]
@@ -120,7 +146,7 @@ class ChangePasswordView(CreateAPIView):
     permission_classes = [IsAuthenticated]
 
 
-class RoleView(ModelViewSet):
+class RoleView(QueryPlanMixin, ModelViewSet):
     queryset = Role.objects.all()
     serializer_class = RoleSerializer
     permission_classes = [AllowAny]
@@ -133,7 +159,7 @@ class RoleView(ModelViewSet):
         return super().get_permissions()
 
 
-class AddressView(ModelViewSet):
+class AddressView(QueryPlanMixin, ModelViewSet):
     queryset = Address.objects.all()
     serializer_class = AddressSerializer
 
@@ -151,11 +177,11 @@ class AddressView(ModelViewSet):
         serializer.save(user=self.request.user)
 
 
-class ProfileView(ModelViewSet):
-    queryset = Profile.objects.all().prefetch_related("user", "role")
+class ProfileView(QueryPlanMixin, ModelViewSet):
+    queryset = Profile.objects.all()
     serializer_class = ProfileSerializer
     filterset_fields = ("user", "role")
-    parser_classes = (FormParser, MultiPartParser, JSONParser)
+    parser_classes = (FormParser, MultiPartParser, ORJSONParser)
 
     http_method_names = [m for m in ModelViewSet.http_method_names if m not in ["put"]]
 
@@ -0,0 +1,33 @@
+import pytest
+from django.urls.base import reverse
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.users.authentication import CachedJWTAuthentication
+from apps.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+REQUESTS = 500
+
+
+@pytest.mark.parametrize(
+    "backend", [JWTAuthentication, CachedJWTAuthentication], ids=lambda b: b.__name__
+)
+def test_authenticated_requests(bench, monkeypatch, backend):
+    monkeypatch.setattr(APIView, "authentication_classes", [backend])
+    user = UserFactory()
+    client = APIClient()
+    token = RefreshToken.for_user(user).access_token
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    url = reverse("api:order:order-list")
+
+    def run():
+        for _ in range(REQUESTS):
+            client.get(url)
+
+    bench.measure(
+        f"{REQUESTS} order list requests, {backend.__name__}", run, ops=REQUESTS
+    )
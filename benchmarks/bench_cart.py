@@ -0,0 +1,51 @@
+import pytest
+from django.urls.base import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.cart.models import CartItem
+from apps.products.models import Product
+from apps.users.tests.factories import UserFactory
+
+from .catalog import build_catalog
+
+# real BEGIN/COMMIT per request, as in production
+pytestmark = pytest.mark.django_db(transaction=True)
+
+LINES = 50
+
+
+@pytest.fixture
+def client():
+    user = UserFactory()
+    client = APIClient()
+    token = RefreshToken.for_user(user).access_token
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+def test_restore_basket(bench, client):
+    build_catalog(LINES)
+    products = list(Product.objects.values_list("id", flat=True)[:LINES])
+    add_url = reverse("api:Shopping_cart-add-to-cart")
+    batch_url = reverse("api:Shopping_cart-batch")
+    operations = [
+        {"op": "add", "product": str(product), "quantity": 2} for product in products
+    ]
+
+    def single():
+        CartItem.objects.all().delete()
+        for product in products:
+            client.post(add_url, {"product": product, "quantity": 2})
+
+    def batch():
+        CartItem.objects.all().delete()
+        client.post(batch_url, {"operations": operations}, format="json")
+
+    single()
+    assert CartItem.objects.count() == LINES
+    batch()
+    assert CartItem.objects.count() == LINES
+
+    bench.measure(f"{LINES} lines, one /cart/add/ call each", single, ops=LINES)
+    bench.measure(f"{LINES} lines, one /cart/batch/ call", batch, ops=LINES)
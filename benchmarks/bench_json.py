@@ -0,0 +1,42 @@
+import io
+
+import pytest
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from apps.common.parsers import ORJSONParser
+from apps.common.renderers import ORJSONRenderer
+from apps.products.models import Product
+from apps.products.serializers import ProductSerializer
+
+from .catalog import build_catalog
+
+pytestmark = pytest.mark.django_db
+
+PAGE_SIZE = 1000
+
+
+def test_product_page_rendering(bench):
+    build_catalog(PAGE_SIZE)
+    products = Product.objects.select_related("brand", "category")[:PAGE_SIZE]
+    page = {
+        "next": None,
+        "previous": None,
+        "results": ProductSerializer(products, many=True).data,
+    }
+
+    content = JSONRenderer().render(page)
+    assert ORJSONRenderer().render(page) == content
+
+    for renderer in (JSONRenderer(), ORJSONRenderer()):
+        bench.measure(
+            f"render {PAGE_SIZE} products with {type(renderer).__name__}",
+            lambda: renderer.render(page),
+            repeat=20,
+        )
+    for parser in (JSONParser(), ORJSONParser()):
+        bench.measure(
+            f"parse {PAGE_SIZE} products with {type(parser).__name__}",
+            lambda: parser.parse(io.BytesIO(content)),
+            repeat=20,
+        )
@@ -0,0 +1,29 @@
+import pytest
+from django.urls import resolve
+from django.urls.base import reverse
+from rest_framework.test import APIClient
+
+from .catalog import build_catalog
+
+# real BEGIN/COMMIT instead of savepoints inside the test transaction
+pytestmark = pytest.mark.django_db(transaction=True)
+
+REQUESTS = 300
+
+
+@pytest.mark.parametrize("atomic", [True, False], ids=["atomic", "non-atomic"])
+def test_list_throughput(bench, monkeypatch, settings, atomic):
+    # measure the database work, not the response cache
+    settings.RESPONSE_CACHE_TIMEOUT = 0
+    build_catalog(100)
+    client = APIClient()
+    url = reverse("api:products-list")
+    if atomic:
+        monkeypatch.setattr(resolve(url).func, "_non_atomic_requests", set())
+
+    def run():
+        for _ in range(REQUESTS):
+            client.get(url)
+
+    label = "atomic" if atomic else "non-atomic"
+    bench.measure(f"{REQUESTS} product list requests, {label}", run, ops=REQUESTS)
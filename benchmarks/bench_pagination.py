@@ -0,0 +1,49 @@
+import pytest
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.common.pagination import KeysetPagination
+from apps.products.models import Product
+
+from .catalog import build_catalog
+
+pytestmark = pytest.mark.django_db
+
+PAGE_SIZE = 25
+PAGE = 1000
+
+
+def paginate(params):
+    request = Request(APIRequestFactory().get("/api/products/", params))
+    paginator = KeysetPagination()
+    rows = paginator.paginate_queryset(Product.objects.all(), request)
+    # build links too, the page number class counts rows for them
+    paginator.get_next_link()
+    return rows
+
+
+def test_deep_page_latency(bench):
+    build_catalog(PAGE * PAGE_SIZE + PAGE_SIZE)
+
+    # cursor pointing at the last row of page 999
+    paginator = KeysetPagination()
+    paginator.fields = ["created_at", "id"]
+    anchor = Product.objects.order_by("created_at", "id")[
+        (PAGE - 1) * PAGE_SIZE - 1
+    ]
+    cursor = paginator.encode_cursor(anchor, reverse=False)
+
+    offset_rows = paginate({"page": PAGE, "page_size": PAGE_SIZE})
+    keyset_rows = paginate({"cursor": cursor, "page_size": PAGE_SIZE})
+    assert len(offset_rows) == len(keyset_rows) == PAGE_SIZE
+
+    bench.measure(
+        f"page {PAGE} with COUNT + OFFSET",
+        lambda: paginate({"page": PAGE, "page_size": PAGE_SIZE}),
+        repeat=10,
+    )
+    bench.measure(
+        f"page {PAGE} with keyset cursor",
+        lambda: paginate({"cursor": cursor, "page_size": PAGE_SIZE}),
+        repeat=10,
+    )
@@ -0,0 +1,28 @@
+import requests
+
+from apps.finance.paystack import PaystackClient
+from apps.finance.stub import PaystackStub
+
+CALLS = 200
+
+
+def test_pooled_client_latency(bench):
+    with PaystackStub() as stub:
+        client = PaystackClient("sk_test", base_url=stub.url)
+        client.initialize_transaction(1000, "a@a.com", "http://testserver", "ref")
+        url = f"{stub.url}/transaction/verify/ref"
+
+        def per_call_connection():
+            # what the paystackapi SDK did: a new connection for every call
+            for _ in range(CALLS):
+                requests.get(url, headers={"Authorization": "Bearer sk_test"}).json()
+
+        def pooled():
+            for _ in range(CALLS):
+                client.verify_transaction("ref")
+
+        bench.measure(
+            f"{CALLS} verify calls, new connection each", per_call_connection, ops=CALLS
+        )
+        bench.measure(f"{CALLS} verify calls, keep-alive pool", pooled, ops=CALLS)
+        client.close()
@@ -0,0 +1,33 @@
+import sqlite3
+import uuid
+
+from apps.common.models import uuid7
+
+ROWS = 300_000
+BATCH = 5_000
+
+
+def insert_rows(path, generator):
+    db = sqlite3.connect(path)
+    db.execute(
+        "CREATE TABLE item (id char(32) PRIMARY KEY, cart_id char(32), quantity int)"
+    )
+    cart = uuid.uuid4().hex
+    for _ in range(ROWS // BATCH):
+        db.executemany(
+            "INSERT INTO item VALUES (?, ?, 1)",
+            [(generator().hex, cart) for _ in range(BATCH)],
+        )
+        db.commit()
+    db.close()
+
+
+def test_insert_throughput(bench, tmp_path):
+    """Inserts into a file-backed SQLite table keyed like BaseModel"""
+    for name, generator in [("uuid4", uuid.uuid4), ("uuid7", uuid7)]:
+        bench.measure(
+            f"insert {ROWS} rows keyed by {name}",
+            lambda: insert_rows(tmp_path / f"{uuid.uuid4()}.db", generator),
+            repeat=3,
+            ops=ROWS,
+        )
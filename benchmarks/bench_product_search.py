@@ -0,0 +1,50 @@
+import time
+
+import pytest
+from django.db.models import Q
+
+from apps.products.models import Product
+from apps.products.search import ProductSearch
+
+from .catalog import build_catalog
+
+pytestmark = pytest.mark.django_db
+
+CATALOG_SIZE = 100_000
+QUERIES = ["laptop", "wireless keyboard", "gaming pro headset"]
+
+
+def like_scan(query):
+    """What SearchFilter does over the same fields"""
+    condition = Q()
+    for term in query.split():
+        condition &= (
+            Q(name__icontains=term)
+            | Q(description__icontains=term)
+            | Q(specification__icontains=term)
+            | Q(brand__name__icontains=term)
+            | Q(category__name__icontains=term)
+        )
+    return list(Product.objects.filter(condition).values_list("id", flat=True)[:100])
+
+
+def test_product_search(bench):
+    build_catalog(CATALOG_SIZE)
+
+    start = time.perf_counter()
+    ProductSearch.rebuild()
+    bench.report(f"rebuild index ({CATALOG_SIZE} products)", time.perf_counter() - start)
+
+    for query in QUERIES:
+        bench.measure(f"LIKE scan     '{query}'", lambda: like_scan(query))
+        bench.measure(
+            f"ranked search '{query}'", lambda: ProductSearch.search(query, limit=100)
+        )
+
+    ids = list(Product.objects.values_list("id", flat=True)[:1000])
+    bench.measure(
+        "incremental index (1000 products)",
+        lambda: ProductSearch.index(ids),
+        repeat=3,
+        ops=len(ids),
+    )
@@ -0,0 +1,51 @@
+import pytest
+
+from apps.finance.paystack import PaystackUtils
+from apps.finance.stub import PaystackStub
+from apps.orders.models import Order
+from apps.orders.utils import PaymentReconciler
+from apps.users.tests.factories import AddressFactory
+
+pytestmark = pytest.mark.django_db
+
+ORDERS = 400
+# round trip to paystack from the api servers
+LATENCY = 0.02
+
+
+def pending_orders(stub, count):
+    address = AddressFactory()
+    orders = Order.objects.bulk_create(
+        [
+            Order(
+                user=address.user,
+                delivery_address=address,
+                status=Order.Order_Status.PENDING,
+                delivery_cost=10,
+                total_cost=10,
+            )
+            for _ in range(count)
+        ]
+    )
+    for order in orders:
+        stub.initialize({"reference": str(order.id), "amount": 1000})
+
+
+@pytest.mark.parametrize("workers", [1, 16])
+def test_reconcile_throughput(bench, settings, workers):
+    with PaystackStub(latency=LATENCY) as stub:
+        settings.PAYSTACK_API_URL = stub.url
+        settings.PAYSTACK_POOL_SIZE = workers
+        PaystackUtils.reset()
+        pending_orders(stub, ORDERS)
+
+        reconciler = PaymentReconciler(chunk_size=100, workers=workers, min_age=0)
+        stats = reconciler.run()
+
+        assert stats["paid"] == ORDERS
+        bench.report(
+            f"reconcile {ORDERS} orders, {workers} worker(s)",
+            reconciler.duration,
+            ops=ORDERS,
+        )
+    PaystackUtils.reset()
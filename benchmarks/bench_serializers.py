@@ -0,0 +1,74 @@
+import cloudinary
+import pytest
+
+from apps.brands.models import Brand
+from apps.brands.serializers import BrandSerializer, BrandValuesSerializer
+from apps.products.models import Product, ProductCategory, ProductImage
+from apps.products.serializers import (
+    ProductCategorySerializer,
+    ProductCategoryValuesSerializer,
+    ProductImageSerializer,
+    ProductImageValuesSerializer,
+    ProductSerializer,
+    ProductValuesSerializer,
+)
+
+from .catalog import build_catalog
+
+pytestmark = pytest.mark.django_db
+
+# (label, model serializer, values serializer, queryset the viewset lists)
+SERIALIZERS = [
+    (
+        "product",
+        ProductSerializer,
+        ProductValuesSerializer,
+        lambda: Product.objects.prefetch_related("brand", "category"),
+    ),
+    (
+        "product image",
+        ProductImageSerializer,
+        ProductImageValuesSerializer,
+        lambda: ProductImage.objects.prefetch_related("product"),
+    ),
+    ("brand", BrandSerializer, BrandValuesSerializer, lambda: Brand.objects.all()),
+    (
+        "category",
+        ProductCategorySerializer,
+        ProductCategoryValuesSerializer,
+        lambda: ProductCategory.objects.all(),
+    ),
+]
+
+
+@pytest.fixture
+def catalog(monkeypatch):
+    monkeypatch.setattr(cloudinary.config(), "cloud_name", "demo", raising=False)
+    build_catalog(1000)
+    ProductImage.objects.bulk_create(
+        [
+            ProductImage(product=product, product_image=f"products/{product.id}")
+            for product in Product.objects.all()
+        ]
+    )
+    # build_catalog makes 50 brands and 20 categories, pad them to 1000 rows
+    Brand.objects.bulk_create([Brand(name=f"extra brand {i}") for i in range(950)])
+    ProductCategory.objects.bulk_create(
+        [ProductCategory(name=f"extra category {i}") for i in range(980)]
+    )
+
+
+@pytest.mark.parametrize("rows", [20, 100, 1000])
+@pytest.mark.parametrize("label, serializer, values_serializer, queryset", SERIALIZERS)
+def test_list_serialization(
+    bench, catalog, rows, label, serializer, values_serializer, queryset
+):
+    slow = lambda: serializer(queryset()[:rows], many=True).data  # noqa: E731
+    fast = lambda: values_serializer(  # noqa: E731
+        values_serializer.values(queryset()[:rows])
+    ).data
+
+    assert [dict(row) for row in slow()] == fast()
+
+    bench.measure(f"{label} x{rows} ModelSerializer", slow, repeat=10)
+    bench.measure(f"{label} x{rows} ValuesSerializer", fast, repeat=10)
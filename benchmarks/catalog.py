@@ -0,0 +1,40 @@
+import random
+from decimal import Decimal
+
+from apps.brands.models import Brand
+from apps.products.models import Product, ProductCategory
+
+WORDS = (
+    "laptop phone tablet monitor keyboard mouse charger cable speaker headset "
+    "camera lens tripod router printer scanner watch band case sleeve stand "
+    "wireless portable compact gaming office studio pro mini max ultra"
+).split()
+
+
+def sentence(rng, length):
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+def build_catalog(size, seed=0):
+    """Bulk insert a synthetic catalog of `size` products"""
+    rng = random.Random(seed)
+    brands = Brand.objects.bulk_create(
+        [Brand(name=f"brand {i} {rng.choice(WORDS)}") for i in range(50)]
+    )
+    categories = ProductCategory.objects.bulk_create(
+        [ProductCategory(name=f"{rng.choice(WORDS)} {i}") for i in range(20)]
+    )
+    Product.objects.bulk_create(
+        [
+            Product(
+                name=sentence(rng, 3),
+                description=sentence(rng, 20),
+                specification=sentence(rng, 10),
+                price=Decimal(rng.randint(100, 100000)) / 100,
+                brand=rng.choice(brands),
+                category=rng.choice(categories),
+            )
+            for _ in range(size)
+        ],
+        batch_size=2000,
+    )
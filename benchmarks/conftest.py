@@ -0,0 +1,40 @@
+"""
+Benchmarks run against the test database and are not collected by the default
+test run. Run them explicitly, e.g.
+
+    pytest benchmarks/bench_product_search.py
+"""
+import statistics
+import time
+
+import pytest
+
+
+class Bench:
+    def __init__(self, config):
+        self.terminal = config.pluginmanager.get_plugin("terminalreporter")
+        self.capture = config.pluginmanager.get_plugin("capturemanager")
+
+    def report(self, label, seconds, ops=None):
+        line = f"{label:<50} {seconds * 1000:10.2f} ms"
+        if ops:
+            line += f" {ops / seconds:12.0f} ops/s"
+        with self.capture.global_and_fixture_disabled():
+            self.terminal.ensure_newline()
+            self.terminal.write_line(line)
+
+    def measure(self, label, func, repeat=5, ops=None):
+        """Run func repeat times and report the median duration"""
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        median = statistics.median(timings)
+        self.report(label, median, ops=ops)
+        return median
+
+
+@pytest.fixture
+def bench(request):
+    return Bench(request.config)
@@ -14,6 +14,7 @@ from datetime import timedelta
 from pathlib import Path
 
 import environ
+from corsheaders.defaults import default_headers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -60,6 +61,7 @@ THIRD_PARTY_APPS = [
 ]
 
 LOCAL_APPS = [
+    "apps.common.apps.CommonConfig",
     "apps.users.apps.UsersConfig",
     "apps.brands.apps.BrandsConfig",
     "apps.products.apps.ProductsConfig",
@@ -74,6 +76,7 @@ LOCAL_APPS = [
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    "apps.common.middleware.QueryTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -81,6 +84,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "apps.common.middleware.ReplicaMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -112,11 +116,26 @@ WSGI_APPLICATION = "config.wsgi.application"
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 DATABASES = {"default": env.db("DATABASE_URL", default="sqlite:///db.sqlite3")}
 DATABASES["default"]["ATOMIC_REQUESTS"] = True
+# optional read replica for safe catalog requests, see ReplicaMiddleware
+if env("DATABASE_REPLICA_URL", default=""):
+    DATABASES["replica"] = env.db("DATABASE_REPLICA_URL")
+REPLICA_DATABASE = "replica" if "replica" in DATABASES else None
+# seconds a client reads from the primary after writing, and replica reads
+# are kept out of the response cache after an invalidation
+REPLICA_PIN_SECONDS = env.int("REPLICA_PIN_SECONDS", default=10)
+DATABASE_ROUTERS = ["apps.common.routers.ReplicaRouter"]
 
 
 AUTH_USER_MODEL = "users.User"
 
 
+# Primary keys
+# ---------------------------------
+# New rows get time-ordered UUIDv7 keys, which insert at the end of the primary
+# key index instead of at random positions. Existing ids are left untouched.
+TIME_ORDERED_IDS = env.bool("TIME_ORDERED_IDS", default=True)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -188,8 +207,17 @@ LOGGING = {
 REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 25,
+    "DEFAULT_RENDERER_CLASSES": (
+        "apps.common.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "apps.common.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "apps.users.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
     "DEFAULT_FILTER_BACKENDS": [
@@ -213,6 +241,8 @@ SIMPLE_JWT = {
     "TOKEN_OBTAIN_SERIALIZER": "rest_framework_simplejwt.serializers.TokenObtainPairSerializer",
     "UPDATE_LAST_LOGIN": True,
 }
+# seconds an authenticated user is served from the cache, saves drop it earlier
+AUTH_USER_CACHE_TIMEOUT = env.int("AUTH_USER_CACHE_TIMEOUT", default=60)
 
 
 # CORS
@@ -223,6 +253,9 @@ CORS_ALLOW_ALL_ORIGINS = env.bool("CORS_ALLOW_ALL_ORIGINS", default=False)
 CORS_ALLOWED_ORIGIN_REGEXES = [
     # r"^https://\w+\.example\.com$",
 ]
+# guest cart token, see apps.cart.guest.CacheGuestCartStore
+CORS_ALLOW_HEADERS = (*default_headers, "x-cart-token")
+CORS_EXPOSE_HEADERS = ["X-Cart-Token"]
 
 
 #  django-yasg settins
@@ -257,7 +290,56 @@ SWAGGER_SETTINGS = {
 ADMIN_URL = "admin/"
 
 
+# PAYSTACK
+# ------------------------------------------------------------------------------
+PAYSTACK_SECRET_KEY = env("PAYSTACK_SECRET_KEY", default="")
+PAYSTACK_API_URL = env("PAYSTACK_API_URL", default="https://api.paystack.co")
+# seconds, the read timeout bounds how long checkout can wait on paystack
+PAYSTACK_CONNECT_TIMEOUT = 3.05
+PAYSTACK_READ_TIMEOUT = env.float("PAYSTACK_READ_TIMEOUT", default=10)
+PAYSTACK_MAX_RETRIES = 2
+# base of the jittered exponential backoff between retries, in seconds
+PAYSTACK_RETRY_BACKOFF = 0.25
+# keep-alive connections kept per process
+PAYSTACK_POOL_SIZE = 10
+# consecutive failures before calls are short-circuited, and for how long
+PAYSTACK_CIRCUIT_THRESHOLD = 5
+PAYSTACK_CIRCUIT_RESET = 30
+
+
 # Your stuff...
 # ------------------------------------------------------------------------------
 # this is the default life span of short code (5mins)
 CODE_LIFE_SPAN = 60 * 5
+# stock held by a pending order is returned after this many seconds (30mins)
+STOCK_RESERVATION_TTL = env.int("STOCK_RESERVATION_TTL", default=60 * 30)
+# lifetime of cached catalog responses, invalidated early on catalog changes (15mins)
+RESPONSE_CACHE_TIMEOUT = env.int("RESPONSE_CACHE_TIMEOUT", default=60 * 15)
+# maximum number of ranked matches returned by product search
+PRODUCT_SEARCH_LIMIT = 500
+# responsive variants stored with every product image, as cloudinary url options
+PRODUCT_IMAGE_VARIANTS = {
+    "thumbnail": {"width": 150, "height": 150, "crop": "fill"},
+    "small": {"width": 480, "crop": "limit"},
+    "medium": {"width": 960, "crop": "limit"},
+    "large": {"width": 1600, "crop": "limit"},
+}
+# maximum number of operations in one cart batch request, and of products in a
+# guest cart
+CART_BATCH_LIMIT = 100
+# where carts of anonymous users are kept, see apps.cart.guest
+GUEST_CART_STORE = env(
+    "GUEST_CART_STORE", default="apps.cart.guest.CacheGuestCartStore"
+)
+GUEST_CART_TIMEOUT = env.int("GUEST_CART_TIMEOUT", default=60 * 60 * 24 * 7)
+# share of requests measured by QueryTimingMiddleware, between 0 and 1
+QUERY_TIMING_SAMPLE_RATE = env.float("QUERY_TIMING_SAMPLE_RATE", default=1.0)
+
+# email outbox, drained by the send_queued_emails command
+EMAIL_OUTBOX_BATCH_SIZE = 500
+# sendgrid accepts up to 1000 personalizations per request
+EMAIL_OUTBOX_MAX_RECIPIENTS = 1000
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+# retries wait 1min, 2mins, 4mins... up to an hour
+EMAIL_OUTBOX_RETRY_DELAY = 60
+EMAIL_OUTBOX_MAX_RETRY_DELAY = 60 * 60
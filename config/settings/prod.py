@@ -14,6 +14,7 @@ ALLOWED_HOSTS = env.list("DJANGO_ALLOWED_HOSTS", default=["example.com"])
 # MIDDLEWARE
 # ----------------------------------------------------------------------------
 MIDDLEWARE = [
+    "apps.common.middleware.QueryTimingMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -23,6 +24,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "apps.common.middleware.ReplicaMiddleware",
 ]
 
 
@@ -30,12 +32,24 @@ MIDDLEWARE = [
 # ------------------------------------------------------------------------------
 DATABASES["default"] = env.db("DATABASE_URL", default="")  # noqa F405
 DATABASES["default"]["ATOMIC_REQUESTS"] = True  # noqa F405
-DATABASES["default"]["CONN_MAX_AGE"] = env.int("CONN_MAX_AGE", default=60)  # noqa F405
+# primary and optional replica
+for db in DATABASES.values():  # noqa F405
+    db["CONN_MAX_AGE"] = env.int("CONN_MAX_AGE", default=60)
 
 # CACHES
 # ------------------------------------------------------------------------------
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": env("REDIS_URL"),
+    }
+}
 
 
+# QUERY TIMING
+# ------------------------------------------------------------------------------
+QUERY_TIMING_SAMPLE_RATE = env.float("QUERY_TIMING_SAMPLE_RATE", default=0.1)
+
 # SECURITY
 # ------------------------------------------------------------------------------
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
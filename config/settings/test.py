@@ -1,3 +1,7 @@
+import os
+import tempfile
+from pathlib import Path
+
 from .base import *  # noqa
 from .base import env
 
@@ -11,6 +15,34 @@ SECRET_KEY = env(
 # https://docs.djangoproject.com/en/dev/ref/settings/#test-runner
 TEST_RUNNER = "django.test.runner.DiscoverRunner"
 
+# DATABASES
+# ------------------------------------------------------------------------------
+# SQLite test databases live on disk, so threaded tests wait on each other's
+# write locks instead of failing as they do on a shared in-memory database.
+# The file is named per process so concurrent runs keep apart, and is removed
+# at the end of the run as long as --reuse-db is not passed.
+if DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3":  # noqa F405
+    DATABASES["default"]["TEST"] = {  # noqa F405
+        "NAME": str(
+            Path(tempfile.gettempdir()) / f"ecommerce_test_{os.getpid()}.sqlite3"
+        )
+    }
+# stand-in replica, enabled per test by setting REPLICA_DATABASE
+DATABASES["replica"] = {  # noqa F405
+    "ENGINE": "django.db.backends.sqlite3",
+    "NAME": "replica.sqlite3",
+}
+REPLICA_DATABASE = None
+
+# CACHES
+# ------------------------------------------------------------------------------
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "",
+    }
+}
+
 # PASSWORDS
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#password-hashers
@@ -32,6 +64,13 @@ TEMPLATES[-1]["OPTIONS"]["loaders"] = [  # type: ignore[index] # noqa F405
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#email-backend
 EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+FROM_EMAIL = "no-reply@example.com"
+
+# PAYSTACK
+# ------------------------------------------------------------------------------
+# tests run the gateway against apps.finance.stub.PaystackStub
+PAYSTACK_API_URL = "http://paystack.invalid"
+PAYSTACK_RETRY_BACKOFF = 0
 
 # Your stuff...
 # ------------------------------------------------------------------------------